@@ -1,3 +1,5 @@
+import gc
+
 from django_topics.models import Topic as DjangoTopic
 
 def init_sentry_from_settings():
@@ -39,15 +41,33 @@ def init_library_cache():
     library.init_shared_cache()
 
     if not settings.DISABLE_AUTOCOMPLETER:
-        logger.info("Initializing Full Auto Completer")
-        library.build_full_auto_completer()
+        if settings.AUTOCOMPLETER_STORE_PATH:
+            logger.info("Loading Auto Completer store")
+            library.load_auto_completer_store(settings.AUTOCOMPLETER_STORE_PATH)
+
+        # Auto completers mapped from the store, or already loaded from a library snapshot (see sefaria/model/__init__.py), aren't rebuilt
+        loaded = library.snapshot_components | library.mapped_components
+        if "full_auto_completer" not in loaded:
+            logger.info("Initializing Full Auto Completer")
+            library.build_full_auto_completer()
+
+        if "lexicon_auto_completer" not in loaded:
+            logger.info("Initializing Lexicon Auto Completers")
+            library.build_lexicon_auto_completers()
 
+        if "cross_lexicon_auto_completer" not in loaded:
+            logger.info("Initializing Cross Lexicon Auto Completer")
+            library.build_cross_lexicon_auto_completer()
 
-        logger.info("Initializing Lexicon Auto Completers")
-        library.build_lexicon_auto_completers()
+        if settings.AUTOCOMPLETER_STORE_PATH and not library.mapped_components:
+            # Map the store just written, so that this process shares its pages too
+            logger.info("Writing Auto Completer store")
+            library.dump_auto_completer_store(settings.AUTOCOMPLETER_STORE_PATH)
+            library.load_auto_completer_store(settings.AUTOCOMPLETER_STORE_PATH)
 
-        logger.info("Initializing Cross Lexicon Auto Completer")
-        library.build_cross_lexicon_auto_completer()
+    if settings.LIBRARY_SNAPSHOT_PATH and not library.snapshot_components:
+        logger.info("Writing library snapshot")
+        library.dump_snapshot(settings.LIBRARY_SNAPSHOT_PATH)
 
 
     if settings.ENABLE_LINKER:
@@ -61,3 +81,37 @@ def init_library_cache():
     if server_coordinator:
         server_coordinator.connect()
     logger.info("Initialization Complete")
+
+
+def init_library_cache_before_fork():
+    """
+    Startup mode for pre-forking servers (gunicorn with `preload_app`).  Fully initializes the library in the parent,
+    then freezes every object it made, so that workers share its memory pages rather than each copying them.
+    Workers must call `after_fork()`.
+    https://docs.python.org/3/library/gc.html#gc.freeze
+    """
+    import structlog
+    logger = structlog.get_logger(__name__)
+    from sefaria.model.text import library
+
+    # Collections in the parent would leave freed holes scattered through pages that will be shared
+    gc.disable()
+    init_library_cache()
+    logger.info("Preparing library for fork")
+    library.prepare_for_fork()
+    gc.collect()
+    gc.freeze()
+    logger.info("Froze objects before fork", frozen=gc.get_freeze_count())
+
+
+def after_fork():
+    """
+    Counterpart of `init_library_cache_before_fork()`, to be called early in each worker.
+    Frozen objects stay out of the worker's collections, so they aren't written to by the collector.
+    Also starts the worker's check for sampling profiler requests.
+    """
+    gc.enable()
+    from django.conf import settings
+    if settings.SAMPLING_PROFILER_POLL_SECONDS:
+        from sefaria.system.sampling_profiler import poll_remote_config
+        poll_remote_config(settings.SAMPLING_PROFILER_POLL_SECONDS)
@@ -267,6 +267,26 @@ class ApiTest(SefariaTestCase):
         self.assertTrue(len(data) > 20)
 
 
+class QueryBudgetTest(SefariaTestCase):
+    """
+    Tests that hot API views stay within the Mongo query budgets they declare with `@query_budget`
+    """
+
+    def test_texts_api(self):
+        response = tutils.assert_within_query_budget(c, '/api/texts/Genesis.1')
+        self.assertEqual(200, response.status_code)
+        tutils.assert_within_query_budget(c, '/api/texts/Rashi_on_Genesis.2.3')
+
+    def test_related_api(self):
+        response = tutils.assert_within_query_budget(c, '/api/related/Genesis.1.1')
+        self.assertEqual(200, response.status_code)
+        tutils.assert_within_query_budget(c, '/api/related/Shabbat.22a')
+
+    def test_topics_api(self):
+        response = tutils.assert_within_query_budget(c, '/api/topics/shabbat?with_links=1&annotate_links=1&with_refs=1')
+        self.assertEqual(200, response.status_code)
+
+
 class LoginTest(SefariaTestCase):
     def setUp(self):
         self.make_test_user()
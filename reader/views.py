@@ -76,7 +76,7 @@ from sefaria.settings import STATIC_URL, USE_VARNISH, USE_NODE, NODE_HOST, MULTI
     CHATBOT_API_BASE_URL, CELERY_ENABLED, APP_VERSION
 from sefaria.site.site_settings import SITE_SETTINGS
 from sefaria.system.multiserver.coordinator import server_coordinator
-from sefaria.system.decorators import catch_error_as_json, sanitize_get_params, json_response_decorator
+from sefaria.system.decorators import catch_error_as_json, sanitize_get_params, json_response_decorator, query_budget
 from sefaria.system.exceptions import InputError, PartialRefInputError, BookNameError, NoVersionFoundError, DictionaryEntryNotFoundError
 from sefaria.system.cache import django_cache
 from reader.models import user_has_experiments, UserExperimentSettings, _set_user_experiments
@@ -1692,6 +1692,7 @@ def modify_bulk_text_api(request, title):
 
 @catch_error_as_json
 @csrf_exempt
+@query_budget(20)
 def texts_api(request, tref):
     oref = Ref.instantiate_ref_with_legacy_parse_fallback(tref)
     tref = oref.url()
@@ -2559,6 +2560,7 @@ def all_notes_api(request):
 
 
 @catch_error_as_json
+@query_budget(40)
 def related_api(request, tref):
     """
     Single API to bundle available content related to `tref`.
@@ -3643,6 +3645,7 @@ def delete_topic(request, topic):
         return jsonResponse({"error": "This API only accepts DELETE requests."})
 
 @catch_error_as_json
+@query_budget(25)
 def topics_api(request, topic, v2=False):
     """
     API to get data or edit data for an existing topic
@@ -1,5 +1,9 @@
 CURRENT_LINKER_VERSION = "feature.linker.current_version"
 REF_CACHE_LIMIT_KEY = "feature.text.ref_cache_limit"
+LINK_INTERVAL_LOOKUP_KEY = "feature.links.interval_lookup"
+LINK_INTERVAL_HOT_BOOKS_KEY = "feature.links.interval_hot_books"
+TITLE_SCANNER_KEY = "feature.linker.title_scanner"
+SAMPLING_PROFILER_KEY = "feature.profiler.sampling"
 ENABLE_WEBPAGES = "feature.webpages.enable"
 CLIENT_REMOTE_CONFIG_JSON = "feature.client.remote_config_json"
 EXPIRE_LEGACY_COOKIES = "feature.cookies.expire_legacy"
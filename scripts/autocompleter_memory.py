@@ -0,0 +1,74 @@
+"""
+Reports the memory the autocompleters cost a set of worker processes, held per process as built (or loaded from a
+library snapshot) and memory mapped from the autocompleter store.  See Library.dump_auto_completer_store().
+
+Each worker is forked from a parent that has only the index maps, makes its autocompleters one way or the other, and
+reports the growth of its proportional set size (PSS) - its private memory plus its share of the pages it shares with
+the other workers.  The sum over the workers is what the autocompleters cost the machine.  Linux only.
+
+Usage:
+    python scripts/autocompleter_memory.py --workers 8 --store /tmp/autocompleter_store
+"""
+import argparse
+import multiprocessing
+import tempfile
+
+import django
+django.setup()
+from sefaria.model import *
+
+
+def pss_kb():
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            if line.startswith("Pss:"):
+                return int(line.split()[1])
+    return 0
+
+
+def build(_):
+    before = pss_kb()
+    library.build_full_auto_completer()
+    library.build_lexicon_auto_completers()
+    library.build_cross_lexicon_auto_completer()
+    return pss_kb() - before
+
+
+def load_store(store):
+    before = pss_kb()
+    library.load_auto_completer_store(store)
+    # Look something up, as a worker does once it serves requests
+    for ac in list(library._full_auto_completer.values()) + [library._cross_lexicon_auto_completer]:
+        ac.complete("a", 10)
+    return pss_kb() - before
+
+
+def dump_store(store):
+    build(None)
+    return library.dump_auto_completer_store(store)
+
+
+def run(workers, f, arg):
+    with multiprocessing.get_context("fork").Pool(workers) as pool:
+        return pool.map(f, [arg] * workers, chunksize=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--store", default=None, help="Autocompleter store directory.  Defaults to a temporary one")
+    args = parser.parse_args()
+    store = args.store or tempfile.mkdtemp()
+
+    library.get_toc_tree()
+    built = run(args.workers, build, None)
+    print("Built per process:  {:>9,} KB total, {:>9,} KB per worker".format(sum(built), sum(built) // args.workers))
+
+    # Written in a worker, so that the parent doesn't hold autocompleters that the next workers would inherit
+    run(1, dump_store, store)
+    mapped = run(args.workers, load_store, store)
+    print("Memory mapped:      {:>9,} KB total, {:>9,} KB per worker".format(sum(mapped), sum(mapped) // args.workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Compares JaggedIntArray with NumpyJaggedIntArray on the operations behind version state refreshes and next/prev
+section navigation, on count arrays shaped like Talmud and Shulchan Arukh texts.
+
+The arrays are random, with about one empty amud/seif in ten:
+    talmud          a tractate - amud, segment
+    talmud-comm     a commentary on a tractate - amud, segment, comment
+    sa              Shulchan Arukh, Orach Chayim - siman, seif
+    sa-comm         a commentary on Orach Chayim - siman, seif, comment
+Times are the best of --repeat runs, in milliseconds.  "encode" and "decode" are the conversions from and to the
+nested lists that are stored.
+
+Usage:
+    python scripts/benchmark_jagged_array.py
+    python scripts/benchmark_jagged_array.py --repeat 20 --scale 5
+"""
+import argparse
+import random
+import timeit
+
+from sefaria.datatype.jagged_array import JaggedIntArray
+from sefaria.datatype.numpy_jagged_array import NumpyJaggedIntArray
+
+
+def counts(rand, lengths):
+    """
+    :param lengths: list of (min, max) lengths at each depth
+    """
+    low, high = lengths[0]
+    if len(lengths) == 1:
+        return [int(rand.random() > 0.1) for _ in range(rand.randint(low, high))]
+    return [counts(rand, lengths[1:]) if rand.random() > 0.1 else [] for _ in range(rand.randint(low, high))]
+
+
+def shapes(scale):
+    return {
+        "talmud": [(300 * scale, 300 * scale), (5, 40)],
+        "talmud-comm": [(300 * scale, 300 * scale), (5, 40), (0, 4)],
+        "sa": [(700 * scale, 700 * scale), (1, 20)],
+        "sa-comm": [(700 * scale, 700 * scale), (1, 20), (0, 3)],
+    }
+
+
+def operations(cls, store, other):
+    a, b = cls(store), cls(other)
+    middle = [len(store) // 2]
+    return {
+        "encode": lambda: cls(store),
+        "decode": lambda: cls(store).array() if cls is JaggedIntArray else a._to_list(),
+        "add": lambda: a + b,
+        "mask": lambda: a.mask(),
+        "zero_mask": lambda: a.zero_mask(),
+        "depth_sum": lambda: [a.depth_sum(d) for d in range(a.get_depth())],
+        "element_count": lambda: a._reinit() or a.element_count(),
+        "next_index": lambda: a.next_index(list(middle)),
+        "prev_index": lambda: a.prev_index(list(middle)),
+        # What _set_node_state() does for two languages
+        "node_state": lambda: [(x + a.zero_mask()).array() for x in (a, b)] + [x.depth_sum(d) for x in (a, b) for d in range(2)],
+    }
+
+
+def best(f, repeat):
+    return min(timeit.repeat(f, number=1, repeat=repeat)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--scale", type=int, default=1, help="Multiply the number of amudim/simanim")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rand = random.Random(args.seed)
+    for name, lengths in shapes(args.scale).items():
+        store, other = counts(rand, lengths), counts(rand, lengths)
+        print("{} ({:,} values)".format(name, JaggedIntArray(store).element_count()))
+        lists = operations(JaggedIntArray, store, other)
+        arrays = operations(NumpyJaggedIntArray, store, other)
+        for op in lists:
+            list_ms, numpy_ms = best(lists[op], args.repeat), best(arrays[op], args.repeat)
+            print("  {:<14} {:>9.3f} ms lists {:>9.3f} ms numpy {:>7.1f}x".format(op, list_ms, numpy_ms, list_ms / numpy_ms))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Reports the runtime and peak memory of the PageRank step of `update_pagesheetrank()`.
+
+Builds the link graph from the full links collection (or a random graph with --synthetic), then runs
+sparse power iteration on it.  Peak memory is measured with tracemalloc, so it covers Python and NumPy allocations.
+SciPy's sparse matrices are NumPy arrays, so they're included.
+
+Usage:
+    python scripts/benchmark_pagerank.py
+    python scripts/benchmark_pagerank.py --synthetic 1000000
+"""
+import argparse
+import resource
+import time
+import tracemalloc
+
+import django
+django.setup()
+
+from sefaria.pagerank import pagerank_vector
+from sefaria.pagesheetrank import init_pagerank_graph, random_web
+
+
+def measure(label, f):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = f()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print("{:<16} {:>10.2f}s {:>12.1f} MB peak".format(label, seconds, peak / 1024 / 1024))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--synthetic", type=int, help="Rank a random graph with this many nodes instead of the links collection")
+    parser.add_argument("--tolerance", type=float, default=0.00005)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        graph = measure("build graph", lambda: random_web(args.synthetic))
+    else:
+        graph, _ = measure("build graph", init_pagerank_graph)
+    print("{:,} nodes, {:,} edges".format(len(graph), graph.edge_count()))
+
+    matrix = measure("build matrix", graph.matrix)
+    print("CSR matrix: {:.1f} MB".format((matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes) / 1024 / 1024))
+    _, report = measure("power iteration", lambda: pagerank_vector(matrix, 0.85, tolerance=args.tolerance))
+    print(report)
+    print("Max RSS of the process: {:.1f} MB".format(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024))
+
+
+if __name__ == "__main__":
+    main()
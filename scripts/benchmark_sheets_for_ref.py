@@ -0,0 +1,86 @@
+"""
+Times the annotation of sheets in get_sheets_for_ref() - owner, assigner and "via" owner data, displayed collections and
+anchor refs - for thousands of synthetic sheets on one ref, done per sheet as it was and in bulk by
+_annotate_sheets_for_ref().
+
+The sheets aren't saved.  Each cites a few random segments or ranges of the ref, and is owned, assigned and copied
+by users drawn from existing profiles, and displays one of a few existing collections, so the database is only read.
+Times are the best of --repeat runs, in seconds.
+
+Usage:
+    python scripts/benchmark_sheets_for_ref.py
+    python scripts/benchmark_sheets_for_ref.py --ref "Shabbat 31a" --sheets 5000
+"""
+import argparse
+import random
+import timeit
+
+import django
+django.setup()
+from sefaria.model import *
+from sefaria.model import user_profile
+from sefaria.sheets import _annotate_sheets_for_ref
+from sefaria.system.database import db
+
+
+def synthetic_sheets(rand, oref, count):
+    segments = oref.all_segment_refs()
+    user_ids = [p["id"] for p in db.profiles.find({}, {"id": 1}).limit(500)]
+    collection_slugs = [c["slug"] for c in db.groups.find({"listed": True}, {"slug": 1}).limit(50)]
+    sheets = []
+    for i in range(count):
+        refs = []
+        for _ in range(rand.randint(1, 4)):
+            start = rand.randrange(len(segments))
+            end = min(start + rand.choice([0, 0, 0, 2, 5]), len(segments) - 1)
+            refs.append(segments[start].to(segments[end]).normal() if end > start else segments[start].normal())
+        sheet = {"id": i, "owner": rand.choice(user_ids), "includedRefs": refs, "expandedRefs": Ref.expand_refs(refs)}
+        if rand.random() < 0.2:
+            sheet["assigner_id"] = rand.choice(user_ids)
+        if rand.random() < 0.3:
+            sheet["viaOwner"] = rand.choice(user_ids)
+        if collection_slugs and rand.random() < 0.3:
+            sheet["displayedCollection"] = rand.choice(collection_slugs)
+        sheets.append(sheet)
+    return sheets
+
+
+def annotate_per_sheet(oref, segment_refs, sheets):
+    # What get_sheets_for_ref() did for each sheet, besides the bulk load of owners
+    for sheet in sheets:
+        oref.get_all_anchor_refs(segment_refs, sheet.get("includedRefs", []), sheet.get("expandedRefs", []))
+        if "assigner_id" in sheet:
+            user_profile.public_user_data(sheet["assigner_id"])
+        if "viaOwner" in sheet:
+            user_profile.public_user_data(sheet["viaOwner"])
+        if "displayedCollection" in sheet:
+            Collection().load({"slug": sheet["displayedCollection"]})
+
+
+def best(f, repeat):
+    def run():
+        user_profile.public_user_data_cache.clear()
+        f()
+    return min(timeit.repeat(run, number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ref", default="Genesis 1")
+    parser.add_argument("--sheets", type=int, default=3000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    oref = Ref(args.ref)
+    segment_refs = [r.normal() for r in oref.all_segment_refs()]
+    sheets = synthetic_sheets(random.Random(args.seed), oref, args.sheets)
+    per_sheet = best(lambda: annotate_per_sheet(oref, segment_refs, sheets), args.repeat)
+    bulk = best(lambda: _annotate_sheets_for_ref(oref, segment_refs, [dict(s) for s in sheets]), args.repeat)
+    print("{} sheets on {}".format(len(sheets), oref.normal()))
+    print("  per sheet {:>8.3f}s".format(per_sheet))
+    print("  bulk      {:>8.3f}s {:>6.1f}x".format(bulk, per_sheet / bulk))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Compares `library.title_scanner()` with `library.all_titles_regex()` on text from source sheets and web pages.
+
+For each language, reports the time to build each matcher, the time each takes to find titles in the whole sample,
+and the time to find titles and build refs from them as `library.get_refs_in_string()` does.
+Also checks that both find the same titles at the same positions, and prints the first few documents where they don't.
+
+Usage:
+    python scripts/benchmark_title_scanner.py --sheets 2000 --webpages 2000
+"""
+import argparse
+import re
+import time
+
+import django
+django.setup()
+
+from sefaria.model import *
+from sefaria.system.database import db
+from sefaria.system.exceptions import InputError
+from sefaria.utils.hebrew import has_hebrew, strip_nikkud
+
+TAG_RE = re.compile(r"<[^>]+>")
+
+
+def sheet_texts(sample_size):
+    sheets = db.sheets.aggregate([{"$sample": {"size": sample_size}}, {"$project": {"sources": 1}}])
+    for sheet in sheets:
+        for source in sheet.get("sources", []):
+            for field in ("text", "outsideBiText"):
+                for s in (source.get(field) or {}).values():
+                    yield s
+            for field in ("outsideText", "comment"):
+                if source.get(field):
+                    yield source[field]
+
+
+def webpage_texts(sample_size):
+    pages = db.webpages.aggregate([{"$sample": {"size": sample_size}}, {"$project": {"title": 1, "description": 1, "body": 1}}])
+    for page in pages:
+        for field in ("title", "description", "body"):
+            if isinstance(page.get(field), str):
+                yield page[field]
+
+
+def load_corpus(sheets, webpages):
+    corpus = {"en": [], "he": []}
+    for s in list(sheet_texts(sheets)) + list(webpage_texts(webpages)):
+        if not isinstance(s, str):
+            continue
+        s = TAG_RE.sub(" ", s)
+        if has_hebrew(s):
+            corpus["he"].append(strip_nikkud(s))
+        else:
+            corpus["en"].append(s)
+    return corpus
+
+
+def timed(f):
+    start = time.perf_counter()
+    result = f()
+    return result, time.perf_counter() - start
+
+
+def regex_matches(reg, s):
+    return [(m.group("title"), m.start()) for m in reg.finditer(s)]
+
+
+def scanner_matches(scanner, s):
+    return [(m.title, m.start) for m in scanner.finditer(s)]
+
+
+def build_refs(matches_by_doc, docs, lang):
+    count = 0
+    for matches, s in zip(matches_by_doc, docs):
+        for title, start in matches:
+            try:
+                if lang == "en":
+                    count += len(library._build_ref_from_string(title, s[start:]) or [])
+                else:
+                    count += len(library._build_all_refs_from_string(title, s) or [])
+            except (AssertionError, InputError, TypeError):
+                continue
+    return count
+
+
+def benchmark(lang, docs, citing_only):
+    library._title_regexes.clear()
+    library._title_scanners.clear()
+    reg, regex_build = timed(lambda: library.all_titles_regex(lang, citing_only=citing_only))
+    scanner, scanner_build = timed(lambda: library.title_scanner(lang, citing_only=citing_only))
+
+    regex_results, regex_scan = timed(lambda: [regex_matches(reg, s) for s in docs])
+    scanner_results, scanner_scan = timed(lambda: [scanner_matches(scanner, s) for s in docs])
+
+    if lang == "he":
+        # As in get_refs_in_string(), Hebrew refs are found once per distinct title in a document
+        regex_results = [[(t, 0) for t in dict.fromkeys(t for t, _ in r)] for r in regex_results]
+        scanner_results = [[(t, 0) for t in dict.fromkeys(t for t, _ in r)] for r in scanner_results]
+    regex_refs, regex_ref_time = timed(lambda: build_refs(regex_results, docs, lang))
+    scanner_refs, scanner_ref_time = timed(lambda: build_refs(scanner_results, docs, lang))
+
+    mismatches = [i for i, (a, b) in enumerate(zip(regex_results, scanner_results)) if a != b]
+    chars = sum(len(s) for s in docs)
+    print("{} ({}), {:,} documents, {:,} characters, {:,} titles".format(lang, "citing only" if citing_only else "all titles", len(docs), chars, len(scanner)))
+    print("  {:<10} {:>12} {:>12} {:>18} {:>8}".format("", "build s", "find s", "find + refs s", "refs"))
+    print("  {:<10} {:>12.2f} {:>12.3f} {:>18.3f} {:>8}".format("regex", regex_build, regex_scan, regex_scan + regex_ref_time, regex_refs))
+    print("  {:<10} {:>12.2f} {:>12.3f} {:>18.3f} {:>8}".format("scanner", scanner_build, scanner_scan, scanner_scan + scanner_ref_time, scanner_refs))
+    print("  {} documents with different matches".format(len(mismatches)))
+    for i in mismatches[:5]:
+        print("    {!r}\n      regex:   {}\n      scanner: {}".format(docs[i][:200], regex_results[i], scanner_results[i]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sheets", type=int, default=1000, help="Number of sheets to sample")
+    parser.add_argument("--webpages", type=int, default=1000, help="Number of web pages to sample")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.sheets, args.webpages)
+    for lang in ("en", "he"):
+        for citing_only in (False, True):
+            benchmark(lang, corpus[lang], citing_only)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Times a whole-library VersionState refresh, and compares the old per-version mask-and-add counting of a node with
+JaggedIntArray.mask_sum() on the largest texts.
+
+Usage:
+    python scripts/benchmark_version_state_refresh.py --processes 8
+    python scripts/benchmark_version_state_refresh.py --counting-only
+"""
+import argparse
+import time
+
+import django
+django.setup()
+
+from sefaria.datatype.jagged_array import JaggedIntArray, JaggedTextArray
+from sefaria.model import VersionSet, library
+from sefaria.model.version_state import refresh_all_states
+
+COUNTING_TITLES = ["Shabbat", "Shulchan Arukh, Orach Chayim", "Mishneh Torah, Sabbath", "Genesis", "Rashi on Shabbat"]
+
+
+def time_counting():
+    print("{:<32} {:>10} {:>10}".format("Counting", "add (s)", "mask_sum (s)"))
+    for title in COUNTING_TITLES:
+        index = library.get_index(title)
+        contents = [v.content_node(index.nodes) for v in VersionSet({"title": title})] if not index.is_complex() else []
+        if not contents:
+            continue
+        start = time.perf_counter()
+        counts = JaggedIntArray()
+        for content in contents:
+            counts = counts + JaggedTextArray(content).mask()
+        added = time.perf_counter() - start
+        start = time.perf_counter()
+        summed = JaggedIntArray.mask_sum(contents)
+        mask_summed = time.perf_counter() - start
+        assert summed == counts
+        print("{:<32} {:>10.3f} {:>10.3f}".format(title, added, mask_summed))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--counting-only", action="store_true")
+    args = parser.parse_args()
+
+    time_counting()
+    if args.counting_only:
+        return
+    report = refresh_all_states(processes=args.processes)
+    print("\nRefreshed {indexes} indexes with {processes} processes: {refresh_seconds:.1f}s, "
+          "{total_seconds:.1f}s with the TOC rebuild".format(**report))
+    print("Sum of per-index seconds: {:.1f}".format(sum(report["seconds"].values())))
+    print("Slowest:")
+    for title, seconds in sorted(report["seconds"].items(), key=lambda x: -x[1])[:20]:
+        print("  {:<48} {:>8.2f}s".format(title, seconds))
+    if report["failed"]:
+        print("Failed:")
+        for title, error in report["failed"].items():
+            print("  {}: {}".format(title, error))
+
+
+if __name__ == "__main__":
+    main()
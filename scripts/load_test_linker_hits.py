@@ -0,0 +1,110 @@
+"""
+Simulates linker pings on a set of synthetic webpages, as pageviews on sites that embed the linker make them, and
+compares writing each hit on its own - loading the page, WebPage.add_hit() and a full save(), as the linker did -
+with counting them in a WebPageHitBuffer that writes them together.
+
+Pings are spread over the pages with a Zipf-like skew, as traffic is, and sent from --threads threads at up to
+--rate pings per minute (0 sends them as fast as they go).  Reports the pings per second each way sustained, the
+updates the database server counted, and checks that each page's linkerHits grew by its pings - which, written
+each on its own, concurrent saves of a page can lose.
+The synthetic pages are deleted afterwards.
+
+Usage:
+    python scripts/load_test_linker_hits.py
+    python scripts/load_test_linker_hits.py --pings 20000 --pages 500 --threads 16 --rate 5000
+"""
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import django
+django.setup()
+from sefaria.model import *
+from sefaria.model.webpage import WebPage, WebPageHitBuffer
+from sefaria.system.database import db
+
+URL_PREFIX = "https://linker-load-test.example.org/page-"
+
+
+def make_pages(count):
+    db.webpages.insert_many([{
+        "url": "{}{}".format(URL_PREFIX, i),
+        "title": "Load test page {}".format(i),
+        "refs": ["Genesis 1:1"],
+        "expandedRefs": ["Genesis 1:1"],
+        "linkerHits": 0,
+        "lastUpdated": datetime.now(),
+    } for i in range(count)])
+
+
+def delete_pages():
+    db.webpages.delete_many({"url": {"$regex": "^" + URL_PREFIX}})
+
+
+def page_hits():
+    return {p["url"]: p["linkerHits"] for p in db.webpages.find({"url": {"$regex": "^" + URL_PREFIX}}, {"url": 1, "linkerHits": 1})}
+
+
+def update_ops():
+    return db.command("serverStatus")["opcounters"]["update"]
+
+
+def hit_each(url):
+    webpage = WebPage().load(url)
+    webpage.add_hit()
+    webpage.save()
+
+
+def run(pings, threads, rate, hit):
+    interval = 60.0 * threads / rate if rate else 0
+
+    def send(urls):
+        start = time.time()
+        for i, url in enumerate(urls):
+            if interval:
+                time.sleep(max(0, start + i * interval - time.time()))
+            hit(url)
+
+    start = time.time()
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(send, [pings[i::threads] for i in range(threads)]))
+    return time.time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pings", type=int, default=5000)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--rate", type=int, default=0, help="Pings per minute.  0 for as fast as they go")
+    parser.add_argument("--flush-interval", type=float, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rand = random.Random(args.seed)
+    weights = [1.0 / (i + 1) for i in range(args.pages)]
+    pings = ["{}{}".format(URL_PREFIX, i) for i in rand.choices(range(args.pages), weights, k=args.pings)]
+    expected = {}
+    for url in pings:
+        expected[url] = expected.get(url, 0) + 1
+
+    delete_pages()
+    make_pages(args.pages)
+    try:
+        buffer = WebPageHitBuffer(flush_interval=args.flush_interval)
+        for name, hit, done in [("each", hit_each, lambda: None), ("buffered", buffer.add, buffer.flush)]:
+            before_hits, before_ops = page_hits(), update_ops()
+            elapsed = run(pings, args.threads, args.rate, hit)
+            done()
+            after_hits = page_hits()
+            ok = all(after_hits[url] - before_hits[url] == n for url, n in expected.items())
+            print("{:<9} {:>8.0f} pings/s {:>8,} updates  hits {}".format(
+                name, args.pings / elapsed, update_ops() - before_ops, "ok" if ok else "MISMATCH"))
+    finally:
+        delete_pages()
+
+
+if __name__ == "__main__":
+    main()
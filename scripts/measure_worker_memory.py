@@ -0,0 +1,101 @@
+"""
+Reports how much memory each gunicorn worker shares with its master and how much is its own.
+
+Reads /proc/<pid>/smaps_rollup (Linux 4.14+), so run it on the host or in the container running gunicorn.
+  RSS:    resident memory, counting shared pages in full
+  Shared: resident pages also mapped by another process (e.g. the master, after fork)
+  Unique: resident pages only this process maps (what a worker costs on top of the master)
+  PSS:    RSS with each shared page divided among the processes sharing it.  Summed over processes, the real total.
+
+Usage:
+    python scripts/measure_worker_memory.py              # finds the gunicorn master(s)
+    python scripts/measure_worker_memory.py --pid 1234   # measures master 1234 and its workers
+"""
+import argparse
+import os
+import sys
+
+
+def read_rollup(pid):
+    """
+    :return: dict of smaps_rollup field to kB
+    """
+    fields = {}
+    with open("/proc/{}/smaps_rollup".format(pid)) as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "shared": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+        "unique": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
+
+
+def read_stat(pid):
+    """
+    :return: (parent pid, command line)
+    """
+    with open("/proc/{}/stat".format(pid)) as f:
+        # The command name can contain spaces and parentheses.  Fields after it are space separated.
+        ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+    with open("/proc/{}/cmdline".format(pid), "rb") as f:
+        cmdline = f.read().replace(b"\0", b" ").decode("utf-8", "replace").strip()
+    return ppid, cmdline
+
+
+def all_processes():
+    procs = {}
+    for name in os.listdir("/proc"):
+        if name.isdigit():
+            try:
+                procs[int(name)] = read_stat(int(name))
+            except (FileNotFoundError, ProcessLookupError, PermissionError):
+                continue
+    return procs
+
+
+def find_masters(procs):
+    gunicorns = {pid for pid, (_, cmdline) in procs.items() if "gunicorn" in cmdline}
+    return sorted(pid for pid in gunicorns if procs[pid][0] not in gunicorns)
+
+
+def mb(kb):
+    return "{:,.1f}".format(kb / 1024.0)
+
+
+def report(master, procs):
+    workers = sorted(pid for pid, (ppid, _) in procs.items() if ppid == master)
+    rows = [("master", master, read_rollup(master))] + [("worker", pid, read_rollup(pid)) for pid in workers]
+
+    print("{:<8} {:>8} {:>10} {:>10} {:>10} {:>10}".format("", "pid", "RSS MB", "Shared MB", "Unique MB", "PSS MB"))
+    for role, pid, m in rows:
+        print("{:<8} {:>8} {:>10} {:>10} {:>10} {:>10}".format(role, pid, mb(m["rss"]), mb(m["shared"]), mb(m["unique"]), mb(m["pss"])))
+
+    total_pss = sum(m["pss"] for _, _, m in rows)
+    print("Total (sum of PSS): {} MB for the master and {} workers".format(mb(total_pss), len(workers)))
+    if workers:
+        worker_rows = [m for role, _, m in rows if role == "worker"]
+        avg_unique = sum(m["unique"] for m in worker_rows) / len(worker_rows)
+        avg_shared = sum(m["shared"] for m in worker_rows) / len(worker_rows)
+        print("Average worker: {} MB unique, {} MB shared".format(mb(avg_unique), mb(avg_shared)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pid", type=int, help="pid of the gunicorn master.  Defaults to every gunicorn master found.")
+    args = parser.parse_args()
+
+    procs = all_processes()
+    masters = [args.pid] if args.pid else find_masters(procs)
+    if not masters:
+        print("No gunicorn master found", file=sys.stderr)
+        sys.exit(1)
+    for master in masters:
+        report(master, procs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""
+Backfill `orderIntervals` on links saved before the field existed.
+Once this has run, the `feature.links.interval_lookup` remote config flag can be turned on.
+"""
+import django
+django.setup()
+from pymongo import UpdateOne
+from tqdm import tqdm
+from sefaria.model import *
+from sefaria.system.database import db
+from sefaria.system.exceptions import InputError
+
+BATCH_SIZE = 5000
+
+links = db.links.find({"orderIntervals": {"$exists": False}}, {"refs": 1})
+num_links = db.links.count_documents({"orderIntervals": {"$exists": False}})
+updates = []
+failed = 0
+for l in tqdm(links, total=num_links):
+    try:
+        intervals = [Link.order_interval_for_ref(Ref(tref)) for tref in l["refs"]]
+    except InputError:
+        failed += 1
+        continue
+    if None in intervals:
+        continue
+    updates += [UpdateOne({"_id": l["_id"]}, {"$set": {"orderIntervals": intervals}})]
+    if len(updates) >= BATCH_SIZE:
+        db.links.bulk_write(updates, ordered=False)
+        updates = []
+
+if updates:
+    db.links.bulk_write(updates, ordered=False)
+print("Skipped {} links with unparseable refs".format(failed))
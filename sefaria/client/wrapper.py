@@ -177,6 +177,8 @@ def get_links(tref, with_text=True, with_sheet_links=False, categories=None):
 
     # for storing all the section level texts that need to be looked up
     texts = {}
+    # (link, client formatted link) for every link to be returned
+    linked = []
 
     linkset = LinkSet(oref)
     # For all links that mention ref (in any position)
@@ -184,10 +186,12 @@ def get_links(tref, with_text=True, with_sheet_links=False, categories=None):
         # each link contains 2 refs in a list
         # find the position (0 or 1) of "anchor", the one we're getting links for
         # If both sides of the ref are in the same section of a text, only one direction will be used.  bug? maybe not.
-        if reRef:
-            pos = 0 if any(re.match(reRef, tref) for tref in link.expandedRefs0) else 1
-        else:
-            pos = 0 if any(nRef == tref[:lenRef] for tref in link.expandedRefs0) else 1
+        pos = link.anchor_position(oref)
+        if pos is None:  # link saved before order intervals were added
+            if reRef:
+                pos = 0 if any(re.match(reRef, tref) for tref in link.expandedRefs0) else 1
+            else:
+                pos = 0 if any(nRef == tref[:lenRef] for tref in link.expandedRefs0) else 1
         try:
             # Skip any anchor refs that aren't segment level.  Unrolling the call to is_segment_level() here, just to save the N function calls.
             anchor_ref = Ref(link.refs[pos])
@@ -212,21 +216,28 @@ def get_links(tref, with_text=True, with_sheet_links=False, categories=None):
         except AttributeError as e:
             logger.error("AttributeError in presenting link: {} - {} : {}".format(link.refs[0], link.refs[1], e))
             continue
+        linked.append((link, com))
 
-        # Rather than getting text with each link, walk through all links here,
-        # caching text so that redundant DB calls can be minimized
-        # If link is spanning, split into section refs and rejoin
+    # Rather than getting text with each link, walk through all links here,
+    # and load the section level texts of all of them at once, so that redundant DB calls can be minimized
+    # If link is spanning, split into section refs and rejoin
+    linked_com_orefs = [Ref(com["ref"]).split_spanning_ref() for _, com in linked] if with_text else [None] * len(linked)
+    if with_text:
+        top_orefs = list({com_oref.top_section_ref() for com_orefs in linked_com_orefs for com_oref in com_orefs})
+        top_chunks = TextChunk.bulk_load(top_orefs, ("en", "he"))
+
+    for (link, com), com_orefs in zip(linked, linked_com_orefs):
         try:
             if with_text:
-                original_com_oref = Ref(com["ref"])
-                com_orefs = original_com_oref.split_spanning_ref()
                 for com_oref in com_orefs:
                     top_oref = com_oref.top_section_ref()
                     # Lookup and save top level text, only if we haven't already
                     top_nref = top_oref.normal()
                     if top_nref not in texts:
                         for lang in ("en", "he"):
-                            top_nref_tc = TextChunk(top_oref, lang)
+                            if (top_oref, lang) not in top_chunks:
+                                raise NoVersionFoundError("No text record found for '{}'".format(top_oref.index.title))
+                            top_nref_tc = top_chunks[(top_oref, lang)]
                             versionInfoMap = None if not top_nref_tc._versions else {
                                 v.versionTitle: {
                                     'license': getattr(v, 'license', ''),
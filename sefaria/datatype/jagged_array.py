@@ -781,6 +781,24 @@ class JaggedIntArray(JaggedArray):
 
         raise Exception("JaggedIntArray._add() reached a condition it shouldn't have reached")
 
+    @classmethod
+    def mask_sum(cls, arrays):
+        """
+        The sum of the masks of `arrays`, computed in one pass rather than by masking and adding them one at a time.
+        Equal to JaggedIntArray() + JaggedArray(a).mask() + JaggedArray(b).mask() + ...
+        :param arrays: nested lists
+        :return JaggedIntArray:
+        """
+        return cls(cls._mask_sum([[]] + list(arrays)))
+
+    @staticmethod
+    def _mask_sum(items):
+        # As in _add(), where some items are lists the others are treated as empty lists
+        lists = [item for item in items if isinstance(item, list)]
+        if not lists:
+            return sum(1 for item in items if item)
+        return [JaggedIntArray._mask_sum([l[i] for l in lists if i < len(l)]) for i in range(max(len(l) for l in lists))]
+
     def depth_sum(self, depth):
         return self._depth_sum(self._store, depth)
 
@@ -0,0 +1,81 @@
+"""
+navigation_table.py: the available sections of a jagged array, in order, for next/prev section lookups
+
+Finding the next or previous available section with JaggedArray.next_index() walks the availability array on
+every call.  A NavigationTable lists the addresses of the sections with any content once, sorted, so that a lookup
+is a binary search.  It also keeps the length of each of those sections, for segment navigation.
+
+Addresses are tuples of 0-based indexes, down to one level above the segments - or the segments themselves in a
+depth 1 array.
+"""
+from bisect import bisect_left
+
+
+class NavigationTable(object):
+
+    def __init__(self, sections=(), lengths=()):
+        """
+        :param sections: sorted list of addresses of available sections
+        :param lengths: number of segments in each of those sections, None where it isn't a list
+        """
+        self.sections = [tuple(s) for s in sections]
+        self.lengths = list(lengths)
+
+    @classmethod
+    def from_array(cls, counts, depth):
+        """
+        :param counts: availability jagged array, as nested lists, e.g. a StateNode's "availableTexts"
+        :param depth: depth of the array's schema node
+        :return NavigationTable:
+        """
+        sections, lengths = [], []
+
+        def walk(cur, address, length):
+            # `length` is the length of the list that holds `cur`
+            if isinstance(cur, list):
+                for i, child in enumerate(cur):
+                    walk(child, address + (i,), len(cur))
+            elif cur:
+                section = address[:-1] if depth > 1 else address
+                if not sections or sections[-1] != section:
+                    sections.append(section)
+                    lengths.append(length if depth > 1 and len(address) == depth else None)
+
+        walk(counts, (), None)
+        return cls(sections, lengths)
+
+    def __len__(self):
+        return len(self.sections)
+
+    def __contains__(self, address):
+        i = bisect_left(self.sections, tuple(address))
+        return i < len(self.sections) and self.sections[i] == tuple(address)
+
+    def next_section(self, starting_points):
+        """
+        :param starting_points: 0-based address, possibly shorter than a section address
+        :return: the address of the first available section at or after `starting_points`, as a list, or None
+        """
+        i = bisect_left(self.sections, tuple(starting_points))
+        return list(self.sections[i]) if i < len(self.sections) else None
+
+    def prev_section(self, starting_points):
+        """
+        :param starting_points: 0-based address, possibly shorter than a section address
+        :return: the address of the last available section at or before `starting_points`, as a list, or None
+        """
+        if not starting_points:
+            return list(self.sections[-1]) if self.sections else None
+        # Every section that starts with `starting_points`, or comes before it, is before the address that follows it
+        following = tuple(starting_points[:-1]) + (starting_points[-1] + 1,)
+        i = bisect_left(self.sections, following) - 1
+        return list(self.sections[i]) if i >= 0 else None
+
+    def section_length(self, address):
+        """
+        :return: the number of segments in the available section at `address`, or None if it isn't available
+        """
+        i = bisect_left(self.sections, tuple(address))
+        if i < len(self.sections) and self.sections[i] == tuple(address):
+            return self.lengths[i]
+        return None
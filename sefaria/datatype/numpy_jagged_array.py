@@ -0,0 +1,293 @@
+"""
+numpy_jagged_array.py: a jagged array of ints, stored in flat NumPy arrays
+
+A jagged array of depth d is stored as d offset arrays and one array of values, as in a CSR matrix:
+    offsets[k][i]:offsets[k][i + 1] is the range of the children of the i-th list at depth k, in the entries at
+    depth k + 1.  The root is the only list at depth 0, and the entries at depth d are the values.
+So [[1, 2], [], [3]] is stored as offsets [[0, 3], [0, 2, 2, 3]] and values [1, 2, 3].
+
+The whole-array operations (add, mask, depth_sum, next_index, ...) are then a few vectorised NumPy calls instead of
+a Python recursion over the nested lists.  Storage stays as nested lists: `array()` converts back on demand.
+
+Only regular arrays can be stored this way - lists down to one depth, with ints at that depth.  Others, e.g. where a
+missing chapter is stored as 0, are kept as nested lists and handled by the JaggedIntArray methods.
+"""
+
+from itertools import chain
+from numbers import Integral
+
+import numpy as np
+
+from .jagged_array import JaggedIntArray
+
+
+class NumpyJaggedIntArray(JaggedIntArray):
+    """
+    A JaggedIntArray with the same interface, backed by NumPy arrays where the array is regular.
+    """
+
+    @classmethod
+    def from_arrays(cls, offsets, values):
+        """
+        :param offsets: list of offset arrays, one per depth
+        :param values: array of ints
+        :return NumpyJaggedIntArray:
+        """
+        obj = cls.__new__(cls)
+        obj._list = None
+        obj._offsets = [np.asarray(o, dtype=np.int64) for o in offsets]
+        obj._values = np.asarray(values, dtype=np.int64)
+        obj._nonzero = None
+        obj._reinit()
+        return obj
+
+    @property
+    def _store(self):
+        if self._list is None:
+            self._list = self._to_list()
+        return self._list
+
+    @_store.setter
+    def _store(self, ja):
+        self._list = ja
+        self._nonzero = None
+        encoded = self._encode(ja)
+        self._offsets, self._values = encoded if encoded else (None, None)
+
+    def is_regular(self):
+        """
+        :return bool: True if this array is held in NumPy arrays
+        """
+        return self._offsets is not None
+
+    def offsets(self):
+        return self._offsets
+
+    def values(self):
+        return self._values
+
+    @staticmethod
+    def _encode(ja):
+        """
+        :return: (offsets, values), or None if `ja` isn't a regular jagged array of ints
+        """
+        if not isinstance(ja, list):
+            return None
+        offsets = []
+        level = [ja]
+        while True:
+            offsets.append(np.concatenate(([0], np.cumsum(np.array(list(map(len, level)), dtype=np.int64)))))
+            level = list(chain.from_iterable(level))
+            types = set(map(type, level))
+            if types <= {list}:
+                if level:
+                    continue
+                return offsets, np.zeros(0, dtype=np.int64)
+            if all(issubclass(t, Integral) for t in types):
+                return offsets, np.array(level, dtype=np.int64)
+            return None
+
+    def _to_list(self):
+        level = self._values.tolist()
+        for offsets in reversed(self._offsets):
+            bounds = offsets.tolist()
+            level = [level[bounds[i]:bounds[i + 1]] for i in range(len(bounds) - 1)]
+        return level[0]
+
+    def _like(self, values):
+        """
+        :return: an array with the shape of this one and `values`
+        """
+        return self.from_arrays(self._offsets, values)
+
+    def _leaf_start(self, entry, depth):
+        """
+        :return: position in the values of the first value under the `entry`-th entry at `depth`
+        """
+        for offsets in self._offsets[depth:]:
+            entry = offsets[entry]
+        return int(entry)
+
+    def _leaf_path(self, position):
+        """
+        :return: list of indexes of the `position`-th value
+        """
+        path = []
+        for offsets in reversed(self._offsets):
+            # Among lists that start at the same place, all but the last are empty
+            parent = int(np.searchsorted(offsets, position, side="right")) - 1
+            path.append(position - int(offsets[parent]))
+            position = parent
+        return path[::-1]
+
+    def _nonzero_positions(self):
+        if self._nonzero is None:
+            self._nonzero = np.flatnonzero(self._values)
+        return self._nonzero
+
+    # Warning, writes!  The NumPy arrays are rebuilt from the modified lists.
+    def set_element(self, indx_list, value, pad=None):
+        super(NumpyJaggedIntArray, self).set_element(indx_list, value, pad)
+        self._store = self._list
+        self._reinit()
+        return self
+
+    def normalize(self, terminal_depth=None, _cur=None, depth=1):
+        normalized = super(NumpyJaggedIntArray, self).normalize(terminal_depth, _cur, depth)
+        if _cur is None:
+            self._store = self._list
+        return normalized
+
+    def __add__(self, other):
+        """
+        :return NumpyJaggedIntArray:
+        """
+        assert isinstance(other, JaggedIntArray)
+        if not (self.is_regular() and isinstance(other, NumpyJaggedIntArray) and other.is_regular()):
+            return NumpyJaggedIntArray(self._add(self._store, other._store))
+        a_offsets, b_offsets = self._offsets, other._offsets
+        if len(a_offsets) != len(b_offsets):
+            # The shallower array can be taken as deep as the other one if it has no values.
+            # Otherwise _add() mixes ints and lists.
+            shallower = self if len(a_offsets) < len(b_offsets) else other
+            if len(shallower._values):
+                return NumpyJaggedIntArray(self._add(self._store, other._store))
+            depth = max(len(a_offsets), len(b_offsets))
+            a_offsets = a_offsets + [np.zeros(1, dtype=np.int64)] * (depth - len(a_offsets))
+            b_offsets = b_offsets + [np.zeros(1, dtype=np.int64)] * (depth - len(b_offsets))
+
+        # Walk down both arrays at once, tracking for each entry of the result its index in each of them, or -1
+        a_index = b_index = np.zeros(1, dtype=np.int64)
+        offsets = []
+        for a_off, b_off in zip(a_offsets, b_offsets):
+            a_start, a_length = self._children(a_off, a_index)
+            b_start, b_length = self._children(b_off, b_index)
+            length = np.maximum(a_length, b_length)
+            result_offsets = np.concatenate(([0], np.cumsum(length)))
+            offsets.append(result_offsets)
+            parent = np.repeat(np.arange(len(length)), length)
+            position = np.arange(result_offsets[-1]) - result_offsets[:-1][parent]
+            a_index = np.where(position < a_length[parent], a_start[parent] + position, -1)
+            b_index = np.where(position < b_length[parent], b_start[parent] + position, -1)
+        return self.from_arrays(offsets, self._pick(self._values, a_index) + self._pick(other._values, b_index))
+
+    @staticmethod
+    def _children(offsets, index):
+        """
+        :return: (start of the children, number of children) of each list in `index`, (0, 0) where it's -1
+        """
+        present = index >= 0
+        safe = np.where(present, index, 0)
+        start = offsets[safe]
+        length = np.where(present, offsets[np.minimum(safe + 1, len(offsets) - 1)] - start, 0)
+        return start, length
+
+    @staticmethod
+    def _pick(values, index):
+        if not len(values):
+            return np.zeros(len(index), dtype=np.int64)
+        return np.where(index >= 0, values[np.where(index >= 0, index, 0)], 0)
+
+    def depth_sum(self, depth):
+        if not self.is_regular():
+            return super(NumpyJaggedIntArray, self).depth_sum(depth)
+        levels = len(self._offsets)
+        if depth > levels:
+            if len(self._values):
+                raise TypeError("depth_sum() depth {} is deeper than the array".format(depth))
+            return 0
+        # As in _depth_sum(): an entry counts as 1 if anything under it does, and a value v as min(v, 1)
+        counts = np.minimum(self._values, 1)
+        if depth == levels:
+            return int(counts.sum())
+        for offsets in reversed(self._offsets[depth + 1:]):
+            totals = np.concatenate(([0], np.cumsum(np.minimum(counts, 1))))
+            counts = totals[offsets[1:]] - totals[offsets[:-1]]
+        return int(np.minimum(counts, 1).sum())
+
+    def mask(self, __curr=None):
+        if __curr is not None:
+            # A recursive call from JaggedArray.mask()
+            return super(NumpyJaggedIntArray, self).mask(__curr)
+        if not self.is_regular():
+            return NumpyJaggedIntArray(super(NumpyJaggedIntArray, self).mask().array())
+        return self._like((self._values != 0).astype(np.int64))
+
+    def constant_mask(self, constant=None, __curr=None):
+        if __curr is not None:
+            return super(NumpyJaggedIntArray, self).constant_mask(constant, __curr)
+        if not self.is_regular() or not isinstance(constant, Integral):
+            return NumpyJaggedIntArray(super(NumpyJaggedIntArray, self).constant_mask(constant).array())
+        return self._like(np.full(len(self._values), constant, dtype=np.int64))
+
+    def element_count(self):
+        if not self.is_regular():
+            return super(NumpyJaggedIntArray, self).element_count()
+        return len(self._values)
+
+    def next_index(self, starting_points=None):
+        """
+        Return the next populated address in a JA
+        :param starting_points: An array indicating starting address in the JA
+        """
+        # _dfs_traverse() numbers the values after a negative starting point from that point, so leave those to it
+        if not self.is_regular() or any(s is not None and s < 0 for s in starting_points or []):
+            return super(NumpyJaggedIntArray, self).next_index(starting_points)
+        return self._traverse(starting_points or [], True)
+
+    def prev_index(self, starting_points=None):
+        """
+        Return the previous populated address in a JA
+        :param starting_points: An array indicating starting address in the JA
+        """
+        if not self.is_regular():
+            return super(NumpyJaggedIntArray, self).prev_index(starting_points)
+        return self._traverse(starting_points or [], False)
+
+    def _traverse(self, starting_points, forward):
+        """
+        The result of _dfs_traverse().  As there, each starting point limits the first list visited at its depth.
+        Once no starting points are left, the rest of a list is searched in one go in the nonzero values.
+        """
+        nonzero = self._nonzero_positions()
+        limited = min(len(starting_points), len(self._offsets))
+        next_limited = 0
+
+        def visit(entry, depth):
+            nonlocal next_limited
+            start, end = int(self._offsets[depth][entry]), int(self._offsets[depth][entry + 1])
+            children = range(start, end)
+            if depth < limited and depth == next_limited:
+                point = starting_points[depth]
+                next_limited += 1
+                if forward:
+                    children = children[point:]
+                else:
+                    children = children[:point + 1 if point is not None else None]
+            if not len(children):
+                return False
+            if next_limited >= limited:
+                lower, upper = self._leaf_start(children.start, depth + 1), self._leaf_start(children.stop, depth + 1)
+                i = int(np.searchsorted(nonzero, lower if forward else upper)) - (0 if forward else 1)
+                if 0 <= i < len(nonzero) and lower <= nonzero[i] < upper:
+                    return self._leaf_path(int(nonzero[i]))
+                return False
+            for child in (children if forward else reversed(children)):
+                result = visit(child, depth + 1)
+                if result:
+                    return result
+            return False
+
+        return visit(0, 0)
+
+    def __eq__(self, other):
+        if isinstance(other, NumpyJaggedIntArray) and self.is_regular() and other.is_regular():
+            return (len(self._offsets) == len(other._offsets)
+                    and all(np.array_equal(a, b) for a, b in zip(self._offsets, other._offsets))
+                    and np.array_equal(self._values, other._values))
+        return super(NumpyJaggedIntArray, self).__eq__(other)
+
+    def __len__(self):
+        if not self.is_regular():
+            return super(NumpyJaggedIntArray, self).__len__()
+        return int(self._offsets[0][1])
@@ -82,6 +82,20 @@ class Test_Jagged_Int_Array(object):
         x = ja.JaggedIntArray([[1, 2], [3, 4]]) + ja.JaggedIntArray([[2, 3], [4]])
         assert x.array() == [[3, 5], [7, 4]]
 
+    def test_mask_sum(self):
+        versions = [
+            [["a", "b"], ["c"], ""],
+            [["", "b", "c"], [], ["d"]],
+            [[], ["c", "d"]],
+            "",
+        ]
+        expected = ja.JaggedIntArray()
+        for version in versions:
+            expected = expected + ja.JaggedTextArray(version).mask()
+        assert ja.JaggedIntArray.mask_sum(versions) == expected
+        assert ja.JaggedIntArray.mask_sum(versions).array() == [[1, 2, 1], [2, 1], [1]]
+        assert ja.JaggedIntArray.mask_sum([]).array() == []
+
 class Test_Jagged_Text_Array(object):
     def test_until_last_nonempty(self):
         sparse_ja = ja.JaggedTextArray([["", "", ""], ["", "foo", "", "bar", ""], ["", "", ""],[]])
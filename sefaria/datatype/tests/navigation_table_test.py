@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+from sefaria.datatype.jagged_array import JaggedIntArray
+from sefaria.datatype.navigation_table import NavigationTable
+
+
+def random_counts(rand, depth, width=6):
+    if depth == 0:
+        return rand.choice([0, 0, 1, 2])
+    return [random_counts(rand, depth - 1, width) for _ in range(rand.randrange(width))]
+
+
+def random_address(rand, counts, length):
+    # An address in the array, as made from a Ref's sections
+    address = []
+    for _ in range(length):
+        if not isinstance(counts, list) or not counts:
+            break
+        address.append(rand.randrange(len(counts)))
+        counts = counts[address[-1]]
+    return address
+
+
+def test_table():
+    table = NavigationTable.from_array([[0, 1], [], [0, 0, 0], [1, 0, 0]], 2)
+    assert table.sections == [(0,), (3,)]
+    assert table.lengths == [2, 3]
+    assert [3] in table and [1] not in table
+    assert table.next_section([1]) == [3]
+    assert table.next_section([4]) is None
+    assert table.prev_section([2]) == [0]
+    assert table.prev_section([-1]) is None
+    assert table.section_length([3]) == 3
+    assert table.section_length([2]) is None
+
+
+@pytest.mark.parametrize("depth", [1, 2, 3])
+def test_matches_dfs_traverse(depth):
+    # As Ref._iter_text_section() looks for the section after or before a Ref
+    rand = random.Random(depth)
+    for _ in range(300):
+        counts = random_counts(rand, depth)
+        ja, table = JaggedIntArray(counts), NavigationTable.from_array(counts, depth)
+        length = max(depth - 1, 1)
+        for _ in range(5):
+            address = random_address(rand, counts, length)
+            if not address:
+                continue
+            for forward in (True, False):
+                starting_points = address[:-1] + [address[-1] + (1 if forward else -1)]
+                expected = ja.next_index(list(starting_points)) if forward else ja.prev_index(list(starting_points))
+                found = table.next_section(starting_points) if forward else table.prev_section(starting_points)
+                if depth == 1:
+                    assert found == (expected or None)
+                else:
+                    assert found == (expected[:-1] if expected else None)
@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+from sefaria.datatype.jagged_array import JaggedIntArray
+from sefaria.datatype.numpy_jagged_array import NumpyJaggedIntArray
+
+
+def random_counts(rand, depth, width=5):
+    if depth == 0:
+        return rand.choice([0, 0, 1, 2])
+    return [random_counts(rand, depth - 1, width) for _ in range(rand.randrange(width))]
+
+
+def random_indexes(rand, depth):
+    return [rand.randrange(-1, 6) for _ in range(rand.randrange(depth + 2))]
+
+
+class Test_Numpy_Jagged_Int_Array(object):
+    def test_round_trip(self):
+        for store in ([], [[], []], [[1, 2], [], [3]], [[[0]], [], [[1, 2], []]]):
+            x = NumpyJaggedIntArray(store)
+            assert x.is_regular()
+            assert NumpyJaggedIntArray.from_arrays(x.offsets(), x.values()).array() == store
+        assert [o.tolist() for o in NumpyJaggedIntArray([[1, 2], [], [3]]).offsets()] == [[0, 3], [0, 2, 2, 3]]
+        # Where a missing chapter is stored as 0, the lists are used
+        irregular = NumpyJaggedIntArray([[1, 2], 0, [3]])
+        assert not irregular.is_regular()
+        assert irregular.array() == [[1, 2], 0, [3]]
+        assert irregular.depth_sum(1) == 3
+
+    @pytest.mark.parametrize("depth", [1, 2, 3])
+    def test_matches_jagged_int_array(self, depth):
+        rand = random.Random(depth)
+        for _ in range(200):
+            a, b = random_counts(rand, depth), random_counts(rand, rand.choice([depth, depth, 1]))
+            expected, x = JaggedIntArray(a), NumpyJaggedIntArray(a)
+            other = NumpyJaggedIntArray(b)
+            assert (x + other).array() == (expected + JaggedIntArray(b)).array()
+            assert (x + JaggedIntArray(b)).array() == (expected + JaggedIntArray(b)).array()
+            assert x.mask() == NumpyJaggedIntArray(expected.mask().array())
+            assert x.zero_mask().array() == expected.zero_mask().array()
+            assert x.element_count() == expected.element_count()
+            assert len(x) == len(expected)
+            assert x.shape() == expected.shape()
+            for d in range(depth + 1):
+                assert x.depth_sum(d) == expected.depth_sum(d)
+            for _ in range(5):
+                indexes = random_indexes(rand, depth)
+                assert x.next_index(list(indexes)) == expected.next_index(list(indexes))
+                assert x.prev_index(list(indexes)) == expected.prev_index(list(indexes))
+
+    def test_set_element(self):
+        x = NumpyJaggedIntArray([[1, 0], [0]])
+        x.set_element([1, 2], 3, 0)
+        assert x.array() == [[1, 0], [0, 0, 3]]
+        assert x.next_index([1, 0]) == [1, 2]
+        assert x.element_count() == 5
@@ -9,10 +9,14 @@ import io
 import unicodecsv as csv
 import re
 import json
+import gzip
+import hashlib
+import multiprocessing
+import time
 from shutil import rmtree
 from random import random
 from pprint import pprint
-from datetime import datetime
+from datetime import datetime, timedelta
 from collections import Counter
 from copy import deepcopy
 import django
@@ -21,7 +25,7 @@ from sefaria.model import *
 from sefaria.model.text import AbstractIndex
 from sefaria.utils.talmud import section_to_daf
 from sefaria.system.exceptions import InputError
-from .settings import SEFARIA_EXPORT_PATH
+from .settings import SEFARIA_EXPORT_PATH, SEFARIA_EXPORT_PROCESSES, SEFARIA_EXPORT_COMPRESSION
 from sefaria.system.database import db
 from sefaria.tracker import modify_bulk_text
 from collections import defaultdict
@@ -264,7 +268,7 @@ export_formats = (
 
 def clear_exports():
     """
-    Deletes all files from any export directory listed in export_formats.
+    Deletes all files from any export directory listed in export_formats, and the manifests of what they hold.
     """
     for format in export_formats:
         if os.path.exists(SEFARIA_EXPORT_PATH + "/" + format[0]):
@@ -273,25 +277,217 @@ def clear_exports():
         rmtree(SEFARIA_EXPORT_PATH + "/schemas")
     if os.path.exists(SEFARIA_EXPORT_PATH + "/links"):
         rmtree(SEFARIA_EXPORT_PATH + "/links")
+    if os.path.exists(SEFARIA_EXPORT_PATH + "/parquet"):
+        rmtree(SEFARIA_EXPORT_PATH + "/parquet")
+    if os.path.exists(ExportManifest.directory()):
+        rmtree(ExportManifest.directory())
 
-def write_text_doc_to_disk(doc=None):
+
+"""
+File suffix of each kind of compression of exported files.
+"""
+compression_suffixes = {
+    "gzip": ".gz",
+    "zstd": ".zst",
+}
+
+
+def open_export_file(path, compression=None):
+    """
+    Opens `path` for writing bytes, compressed with `compression` - None, "gzip" or "zstd".
+    The caller adds the suffix from `compression_suffixes` to `path`.
     """
-    Writes document to disk according to all formats in export_formats
+    if compression is None:
+        return open(path, "wb")
+    if compression == "gzip":
+        return gzip.open(path, "wb")
+    if compression == "zstd":
+        import zstandard
+        return zstandard.ZstdCompressor().stream_writer(open(path, "wb"), closefd=True)
+    raise ValueError("Unknown export compression: {}".format(compression))
+
+
+def write_export_file(path, chunks, compression=None):
+    """
+    Streams the strings in `chunks` to `path`, through a temporary file so that a failed write doesn't leave a partial
+    file behind.
+    :return: (path written, with the compression suffix, SHA-256 of the uncompressed content)
+    """
+    path += compression_suffixes.get(compression, "")
+    if not os.path.exists(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    checksum = hashlib.sha256()
+    temp_path = path + ".tmp"
+    try:
+        with open_export_file(temp_path, compression) as f:
+            for chunk in chunks:
+                data = chunk.encode("utf-8")
+                checksum.update(data)
+                f.write(data)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    os.replace(temp_path, path)
+    return path, checksum.hexdigest()
+
+
+def write_text_doc_to_disk(doc=None, compression=None):
+    """
+    Writes document to disk according to all formats in export_formats.
+    JSON is streamed to the file as it's encoded; the other formats are written as they're produced.
+    :return: {path: checksum} of the files written
     """
     assert doc is not None
+    files = {}
     for format in export_formats:
-        out = format[1](doc)
-        if not out:
-            print("Skipping %s - no content" % doc["title"])
-            return
+        if format[1] is make_json:
+            out = json.JSONEncoder(indent=4, ensure_ascii=False).iterencode({k: v for k, v in doc.items() if k != "original_text"})
+        else:
+            out = format[1](doc)
+            if not out:
+                print("Skipping %s - no content" % doc["title"])
+                return files
+            out = [out]
         path = make_path(doc, format[0], extension=format[2] if len(format) == 3 else None)
-        if not os.path.exists(os.path.dirname(path)):
-            os.makedirs(os.path.dirname(path))
         try:
-            with open(path, "w") as f:
-                f.write(out)
+            path, checksum = write_export_file(path, out, compression)
+            files[path] = checksum
         except IOError as e:
             log_error('failed to write to disk: {}'.format(str(e)))
+    return files
+
+class ExportManifest(object):
+    """
+    What one export stage has written for each text, saved as manifest/<stage>.json in the export directory.
+    Each entry is keyed by "title|language|versionTitle" and holds:
+        "fingerprint": the `_id`s of the versions the files were made from, a hash of the Index and the compression of
+        the files, so that changing the compression exports everything again
+        "exported_at": when the text was read for export
+        "files": {path: SHA-256 of the content}
+    A text whose fingerprint hasn't changed, and that has no edits in the history collection since it was exported,
+    is skipped on the next run.  The manifest is saved as the stage goes, so a run that fails can be resumed.
+    """
+    save_every = 200
+
+    def __init__(self, stage):
+        self.path = os.path.join(self.directory(), stage + ".json")
+        try:
+            with open(self.path) as f:
+                self.entries = json.load(f)
+        except (IOError, ValueError):
+            self.entries = {}
+        self.seen = set()
+        self._unsaved = 0
+
+    @staticmethod
+    def directory():
+        return SEFARIA_EXPORT_PATH + "/manifest"
+
+    @staticmethod
+    def key(title, lang, version_title):
+        return "|".join([title, lang, version_title])
+
+    def since(self):
+        """
+        :return: datetime of the earliest export in the manifest, or None if it's empty
+        """
+        dates = [entry["exported_at"] for entry in self.entries.values()]
+        return datetime.fromisoformat(min(dates)) if dates else None
+
+    def unchanged(self, key, fingerprint, changed_at=None):
+        """
+        :param changed_at: datetime of the latest edit of the text, if any
+        :return: True if the files of `key` are up to date, in which case they're kept
+        """
+        entry = self.entries.get(key)
+        if not entry or entry["fingerprint"] != fingerprint:
+            return False
+        if changed_at and changed_at > datetime.fromisoformat(entry["exported_at"]) - EXPORT_CHANGES_OVERLAP:
+            return False
+        if not all(os.path.exists(path) for path in entry["files"]):
+            return False
+        self.seen.add(key)
+        return True
+
+    def record(self, key, fingerprint, exported_at, files):
+        old_files = self.entries.get(key, {}).get("files", {})
+        for path in set(old_files) - set(files):
+            self._remove_file(path)
+        self.entries[key] = {"fingerprint": fingerprint, "exported_at": exported_at.isoformat(), "files": files}
+        self.seen.add(key)
+        self._unsaved += 1
+        if self._unsaved >= self.save_every:
+            self.save()
+
+    def remove_unseen(self):
+        """
+        Deletes the files of texts that weren't exported or kept in this run, e.g. deleted versions.
+        """
+        for key in set(self.entries) - self.seen:
+            for path in self.entries.pop(key)["files"]:
+                self._remove_file(path)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path + ".tmp", "w") as f:
+            json.dump(self.entries, f)
+        os.replace(self.path + ".tmp", self.path)
+        self._unsaved = 0
+
+    @staticmethod
+    def _remove_file(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+# How far before a text's export its edits are still checked for, to allow for clock differences between servers
+EXPORT_CHANGES_OVERLAP = timedelta(minutes=5)
+
+
+def text_changes_since(since):
+    """
+    :param since: datetime, or None
+    :return: {(title, versionTitle, language): datetime of its latest edit} from the history collection, for versions
+    edited since `since`
+    """
+    changes = {}
+    if since is None:
+        return changes
+    query = {
+        "rev_type": {"$in": ["add text", "edit text", "revert text", "delete text", "edit version_metadata"]},
+        "date": {"$gt": since - EXPORT_CHANGES_OVERLAP},
+    }
+    proj = {"rev_type": 1, "date": 1, "ref": 1, "title": 1, "version": 1, "language": 1, "old.versionTitle": 1}
+    for record in HistorySet(query).iter_stream(proj=proj, raw=True):
+        if record["rev_type"] in ("delete text", "edit version_metadata"):
+            title = record["title"]
+        else:
+            try:
+                title = Ref(record["ref"]).index.title
+            except InputError:
+                continue
+        version_titles = [record["version"], (record.get("old") or {}).get("versionTitle")]
+        for version_title in filter(None, version_titles):
+            key = (title, version_title, record["language"])
+            changes[key] = max(changes.get(key, record["date"]), record["date"])
+    return changes
+
+
+def index_fingerprint(title, cache):
+    """
+    :param cache: dict of fingerprints already computed
+    :return: hash of the Index record of `title`, or None if there isn't one
+    """
+    if title not in cache:
+        try:
+            contents = library.get_index(title).contents()
+            cache[title] = hashlib.sha1(json.dumps(contents, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        except Exception:
+            cache[title] = None
+    return cache[title]
+
 
 def prepare_text_for_export(text):
     """
@@ -357,23 +553,38 @@ def text_is_copyright(text):
            and text["license"].startswith("Copyright")
 
 
-def export_texts():
+def export_texts(incremental=False, compression=None):
     """
     Step through every text in the texts collection and export it with each format
     listed in export_formats.
+    :param incremental: keep the files of texts that haven't changed since the last export, see ExportManifest.
+    Otherwise all exports are cleared first.
+    :param compression: None, "gzip" or "zstd"
     """
-    clear_exports()
-
-    texts = db.texts.find()
-
-    for text in texts:
-        if text_is_copyright(text):
+    if not incremental:
+        clear_exports()
+    manifest = ExportManifest("texts")
+    changes = text_changes_since(manifest.since()) if incremental else {}
+    index_fingerprints = {}
+
+    # Versions are read without their text, which is loaded only for those that need exporting
+    for version in VersionSet().iter_stream(proj={"chapter": 0}, raw=True):
+        if text_is_copyright(version):
             # Don't export copyrighted texts.
             continue
+        key = ExportManifest.key(version["title"], version["language"], version["versionTitle"])
+        fingerprint = [[str(version["_id"])], index_fingerprint(version["title"], index_fingerprints), compression]
+        if incremental and manifest.unchanged(key, fingerprint, changes.get((version["title"], version["versionTitle"], version["language"]))):
+            continue
+
+        exported_at = datetime.now()
+        text = db.texts.find_one({"_id": version["_id"]})
+        prepped_text = prepare_text_for_export(text) if text else None
+        files = write_text_doc_to_disk(prepped_text, compression) if prepped_text else {}
+        manifest.record(key, fingerprint, exported_at, files)
 
-        prepped_text = prepare_text_for_export(text)
-        if prepped_text:
-            write_text_doc_to_disk(prepped_text)
+    manifest.remove_unseen()
+    manifest.save()
 
 
 def prepare_merged_text_for_export(title, lang=None):
@@ -426,10 +637,19 @@ def prepare_merged_text_for_export(title, lang=None):
     return prepare_text_for_export(doc)
 
 
-def export_all_merged():
+def export_all_merged(incremental=False, compression=None):
     """
     Iterate through all index records and exports a merged text for each.
+    :param incremental: keep the merged texts none of whose versions have changed since the last export
+    :param compression: None, "gzip" or "zstd"
     """
+    manifest = ExportManifest("merged")
+    changes = text_changes_since(manifest.since()) if incremental else {}
+    changed_at = {}  # (title, language): latest edit of any of its versions
+    for (title, _, lang), date in changes.items():
+        changed_at[(title, lang)] = max(changed_at.get((title, lang), date), date)
+    index_fingerprints = {}
+
     texts = db.texts.find().distinct("title")
 
     for title in texts:
@@ -443,9 +663,18 @@ def export_all_merged():
             log_error('None title in texts')
             continue
         for lang in ("he", "en"):
+            key = ExportManifest.key(title, lang, "merged")
+            versions = db.texts.find({"title": title, "language": lang}, {"_id": 1, "license": 1})
+            fingerprint = [sorted(str(v["_id"]) for v in versions if not text_is_copyright(v)), index_fingerprint(title, index_fingerprints), compression]
+            if incremental and manifest.unchanged(key, fingerprint, changed_at.get((title, lang))):
+                continue
+            exported_at = datetime.now()
             prepped_text = prepare_merged_text_for_export(title, lang=lang)
-            if prepped_text:
-                write_text_doc_to_disk(prepped_text)
+            files = write_text_doc_to_disk(prepped_text, compression) if prepped_text else {}
+            manifest.record(key, fingerprint, exported_at, files)
+
+    manifest.remove_unseen()
+    manifest.save()
 
 def export_schemas():
     print('exporting schemas...')
@@ -475,30 +704,55 @@ def export_toc():
     with open(SEFARIA_EXPORT_PATH + "/table_of_contents.json", "w") as f:
         f.write(make_json(toc))
 
-def export_links():
+"""
+Matches the address at the end of a normalized ref, e.g. "1:2", "2a:3-2b:4" or "3-5"
+"""
+ref_address_regex = re.compile(r"^\d+[a-z]?([:\-]\d+[a-z]?)*$")
+
+
+def link_ref_book(tref, books):
+    """
+    :param tref: a normalized ref, as stored in links
+    :param books: {node title: (book, Index title, top category)} of the refs seen so far
+    :return: (book, Index title, top category) of `tref`
+    Where `tref` is a node title followed by an address, and that node has been seen, the ref isn't parsed again.
+    """
+    title, _, address = tref.rpartition(" ")
+    if title in books and ref_address_regex.match(address):
+        return books[title]
+    oref = Ref(tref)
+    books[oref.book] = (oref.book, oref.index.title, oref.index.categories[0])
+    return books[oref.book]
+
+
+def export_links(compression=None):
     """
     Creates a single CSV file containing all links known to Sefaria.
+    :param compression: None, "gzip" or "zstd"
     """
     print("Exporting links...")
     links_by_book = Counter()
     links_by_book_without_commentary = Counter()
 
-    links = db.links.find().sort([["refs.0", 1]])
     path = SEFARIA_EXPORT_PATH + "/links/"
-    if not os.path.exists(os.path.dirname(path)):
-        os.makedirs(os.path.dirname(path))
+    # The number of link files can change, so none are left from the last export
+    if os.path.exists(path):
+        rmtree(path)
+    os.makedirs(os.path.dirname(path))
+    suffix = compression_suffixes.get(compression, "")
 
     link_file_number = 0
-    links = db.links.find().sort([["refs.0", 1]])
+    books = {}
+    # streamed in `_id` order; sorting on "refs.0" can't use an index, so it sorted the whole collection in memory
+    links = LinkSet().iter_stream(proj={"refs": 1, "type": 1}, raw=True)
     new_links_file_size = 300000
+    csvfile = None
     for i, link in enumerate(links):
         if i % new_links_file_size == 0:
-            filename = '{}links{}.csv'.format(path, link_file_number)
-            try:
+            filename = '{}links{}.csv{}'.format(path, link_file_number, suffix)
+            if csvfile:
                 csvfile.close()
-            except:
-                pass
-            csvfile = open(filename, 'wb')
+            csvfile = open_export_file(filename, compression)
             writer = csv.writer(csvfile)
             writer.writerow([
                     "Citation 1",
@@ -512,8 +766,8 @@ def export_links():
             link_file_number += 1
 
         try:
-            oref1 = Ref(link["refs"][0])
-            oref2 = Ref(link["refs"][1])
+            book1, title1, category1 = link_ref_book(link["refs"][0], books)
+            book2, title2, category2 = link_ref_book(link["refs"][1], books)
         except InputError:
             continue
 
@@ -521,16 +775,18 @@ def export_links():
             link["refs"][0],
             link["refs"][1],
             link["type"],
-            oref1.book,
-            oref2.book,
-            oref1.index.categories[0],
-            oref2.index.categories[0],
+            book1,
+            book2,
+            category1,
+            category2,
         ])
 
-        book_link = tuple(sorted([oref1.index.title, oref2.index.title]))
+        book_link = tuple(sorted([title1, title2]))
         links_by_book[book_link] += 1
         if link["type"] not in ("commentary", "Commentary", "targum", "Targum"):
             links_by_book_without_commentary[book_link] += 1
+    if csvfile:
+        csvfile.close()
 
     def write_aggregate_file(counter, filename):
         with open(SEFARIA_EXPORT_PATH + "/links/%s" % filename, 'wb') as csvfile:
@@ -581,6 +837,162 @@ def export_topic_graph():
             ])
 
 
+"""
+Columns of the Parquet exports, under SEFARIA_EXPORT_PATH/parquet/, by table.
+"""
+parquet_columns = {
+    "segments": ["ref", "index", "lang", "versionTitle", "order_id", "text"],
+    "links": ["ref1", "ref2", "type", "index1", "index2", "category1", "category2"],
+    "topic_links": ["ref", "index", "toTopic", "linkType", "dataSource"],
+}
+
+
+class ParquetPartitionWriter(object):
+    """
+    Writes the rows of one Parquet table as it's given them, into one file per top level category:
+        parquet/<table>/category=<category>/part-0.parquet
+    which pyarrow.dataset and other Hive partitioning readers load as a `category` column.
+    Rows are buffered by category and written as row groups of `batch_size`.
+    """
+
+    def __init__(self, table, compression=None, batch_size=50000):
+        """
+        :param compression: None, "gzip" or "zstd" for the Parquet pages.  Parquet's own default, snappy, otherwise.
+        """
+        import pyarrow as pa
+        self.table = table
+        self.directory = os.path.join(SEFARIA_EXPORT_PATH, "parquet", table)
+        self.columns = parquet_columns[table]
+        self.schema = pa.schema([(column, pa.string()) for column in self.columns])
+        self.compression = compression or "snappy"
+        self.batch_size = batch_size
+        self._rows = defaultdict(list)
+        self._writers = {}
+        # The table is written from scratch, so no partition of a category that's gone is left behind
+        if os.path.exists(self.directory):
+            rmtree(self.directory)
+
+    def write(self, category, row):
+        """
+        :param row: tuple of values, in the order of parquet_columns[table]
+        """
+        rows = self._rows[category]
+        rows.append(row)
+        if len(rows) >= self.batch_size:
+            self._flush(category)
+
+    def _flush(self, category):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        rows = self._rows.pop(category, None)
+        if not rows:
+            return
+        if category not in self._writers:
+            path = os.path.join(self.directory, "category={}".format(remove_illegal_file_chars(category)))
+            os.makedirs(path, exist_ok=True)
+            self._writers[category] = pq.ParquetWriter(os.path.join(path, "part-0.parquet"), self.schema, compression=self.compression)
+        columns = [pa.array(values, type=pa.string()) for values in zip(*rows)]
+        self._writers[category].write_batch(pa.RecordBatch.from_arrays(columns, schema=self.schema))
+
+    def close(self):
+        for category in list(self._rows):
+            self._flush(category)
+        for writer in self._writers.values():
+            writer.close()
+        self._writers = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def segment_order_id(tref, nodes):
+    """
+    :param tref: a segment ref, as made by Version.walk_thru_contents()
+    :param nodes: {node title: (order id of the node, node)} of the refs seen so far
+    :return: Ref(tref).order_id()
+    As with link_ref_book(), a node title followed by an address is only parsed once.  The order id of a segment is
+    that of its node followed by its sections.
+    """
+    title, _, address = tref.rpartition(" ")
+    if ref_address_regex.match(address) and "-" not in address:
+        if title not in nodes:
+            try:
+                oref = Ref(title)
+                base = oref.order_id()
+                # "Z" is the order id of a node that couldn't be placed, to which no sections are added
+                nodes[title] = (base, oref.index_node) if not oref.sections and base != "Z" else None
+            except InputError:
+                nodes[title] = None
+        if nodes[title] is not None:
+            base, node = nodes[title]
+            try:
+                sections = [node.address_class(depth).toNumber("en", s) for depth, s in enumerate(address.split(":"))]
+                return base + "".join(format(section, "04") for section in sections)
+            except (IndexError, ValueError, TypeError, AttributeError, KeyError):
+                pass
+    return Ref(tref).order_id()
+
+
+def export_parquet(compression=None):
+    """
+    Exports every segment of every non copyrighted version, all links and all ref topic links as Parquet tables,
+    partitioned by top level category.  See parquet_columns for the columns of each table.
+    Segments are streamed a version at a time through Version.walk_thru_contents(), so the corpus is never held in memory.
+    :param compression: None, "gzip" or "zstd"
+    """
+    print("Exporting Parquet tables...")
+    indexes = {}
+
+    def index_and_category(title):
+        if title not in indexes:
+            index = library.get_index(title)
+            indexes[title] = (index, index.categories[0] if index.categories else "Other")
+        return indexes[title]
+
+    with ParquetPartitionWriter("segments", compression) as segments:
+        nodes = {}
+        for version in VersionSet().iter_stream(proj={"chapter": 0}, raw=True):
+            if text_is_copyright(version):
+                continue
+            try:
+                index, category = index_and_category(version["title"])
+            except InputError:
+                log_error("No index for version {} / {}".format(version["title"], version["versionTitle"]))
+                continue
+
+            def action(segment_str, tref, he_tref, v):
+                if segment_str:
+                    segments.write(category, (tref, index.title, v.language, v.versionTitle, segment_order_id(tref, nodes), segment_str))
+
+            try:
+                Version().load({"_id": version["_id"]}).walk_thru_contents(action, heTref=index.get_title("he"), schema=index.schema)
+            except Exception as e:
+                log_error("Failed to export segments of {} / {}: {}".format(version["title"], version["versionTitle"], e))
+
+    with ParquetPartitionWriter("links", compression) as links:
+        books = {}
+        for link in LinkSet().iter_stream(proj={"refs": 1, "type": 1}, raw=True):
+            try:
+                book1, title1, category1 = link_ref_book(link["refs"][0], books)
+                book2, title2, category2 = link_ref_book(link["refs"][1], books)
+            except InputError:
+                continue
+            links.write(category1, (link["refs"][0], link["refs"][1], link.get("type", ""), title1, title2, category1, category2))
+
+    with ParquetPartitionWriter("topic_links", compression) as topic_links:
+        books = {}
+        proj = {"ref": 1, "toTopic": 1, "linkType": 1, "dataSource": 1}
+        for link in RefTopicLinkSet({"is_sheet": False}).iter_stream(proj=proj, raw=True):
+            try:
+                book, title, category = link_ref_book(link["ref"], books)
+            except InputError:
+                continue
+            topic_links.write(category, (link["ref"], title, link["toTopic"], link["linkType"], link.get("dataSource", "")))
+
+
 def make_export_log():
     """
     Exports a file that logs the last export time.
@@ -589,17 +1001,61 @@ def make_export_log():
         f.write(datetime.now().isoformat())
 
 
-def export_all():
+def _export_stages(compression=None):
     """
-    Export all texts, merged texts, links, schemas, toc, links & export log.
+    The stages of export_all(), by name.  Text stages run incrementally: export_all() clears the exports first when
+    they should be made from scratch.
     """
-    clear_exports()
-    export_texts()
-    export_all_merged()
-    export_links()
-    export_schemas()
-    export_toc()
-    export_topic_graph()
+    return {
+        "texts": lambda: export_texts(incremental=True, compression=compression),
+        "merged": lambda: export_all_merged(incremental=True, compression=compression),
+        "links": lambda: export_links(compression=compression),
+        "schemas": export_schemas,
+        "toc": export_toc,
+        "topic_graph": export_topic_graph,
+        "parquet": lambda: export_parquet(compression=compression),
+    }
+
+
+def _run_export_stage(stage, compression=None):
+    """
+    Runs one stage of export_all(), in a worker process when there are several.
+    :return: (stage, seconds, errors logged)
+    """
+    log_error.all_errors = []
+    start = time.perf_counter()
+    try:
+        _export_stages(compression)[stage]()
+    except Exception as e:
+        log_error('export stage {} failed: {}'.format(stage, str(e)))
+    return stage, time.perf_counter() - start, log_error.all_errors
+
+
+def export_all(processes=None, incremental=False, compression=None):
+    """
+    Export all texts, merged texts, links, schemas, toc, links, Parquet tables & export log.
+    :param processes: number of stages run at once, in forked worker processes.  Defaults to SEFARIA_EXPORT_PROCESSES
+    :param incremental: keep the exported texts that haven't changed since the last export, see ExportManifest.
+    Edits are found in the history collection, so texts changed without a history record (e.g. saved with
+    `skip_history` or written to the database directly) keep their old exports.
+    :param compression: None, "gzip" or "zstd" for texts, links and Parquet pages.  Defaults to SEFARIA_EXPORT_COMPRESSION
+    """
+    processes = processes or SEFARIA_EXPORT_PROCESSES
+    compression = compression or SEFARIA_EXPORT_COMPRESSION
+    if not incremental or not os.path.exists(ExportManifest.directory()):
+        # Without manifests, nothing on disk is known to be current
+        clear_exports()
+
+    stages = list(_export_stages())
+    if processes > 1:
+        with multiprocessing.get_context("fork").Pool(min(processes, len(stages))) as pool:
+            results = pool.starmap(_run_export_stage, [(stage, compression) for stage in stages], chunksize=1)
+    else:
+        results = [_run_export_stage(stage, compression) for stage in stages]
+
+    log_error.all_errors = [error for _, _, errors in results for error in errors]
+    for stage, seconds, errors in results:
+        print("Exported {} in {:.1f}s with {} errors".format(stage, seconds, len(errors)))
     make_export_log()
     print_errors()
 
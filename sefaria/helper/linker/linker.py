@@ -5,7 +5,7 @@ from ne_span import RefPartType
 from sefaria.model.linker.ref_part import TermContext
 from sefaria.model.linker.ref_resolver import PossiblyAmbigResolvedRef
 from sefaria.model import text, library
-from sefaria.model.webpage import WebPage
+from sefaria.model.webpage import WebPage, webpage_hit_buffer
 from sefaria.model.webpage_text import WebPageText
 from sefaria.system.cache import django_cache
 from api.api_errors import APIInvalidInputException
@@ -125,10 +125,7 @@ def _create_find_refs_options(get_body: dict, post_body: dict) -> _FindRefsTextO
 
 def _add_webpage_hit_for_url(url):
     if url is None: return
-    webpage = WebPage().load(url)
-    if not webpage: return
-    webpage.add_hit()
-    webpage.save()
+    webpage_hit_buffer.add(url)
 
 
 def _save_webpage_from_linker_metadata(meta_data: dict, response: dict) -> Optional[WebPage]:
@@ -2,9 +2,11 @@
 
 from sefaria.model import *
 from sefaria.model.abstract import AbstractMongoRecord
+from sefaria.model.link import process_index_node_order_change_in_links
 from sefaria.model.marked_up_text_chunk import MarkedUpTextChunkSet
 from sefaria.model.schema import DictionaryNode
 from sefaria.system.exceptions import InputError
+from sefaria.system.cache import in_memory_cache
 from sefaria.system.database import db
 from sefaria.sheets import save_sheet
 from sefaria.utils.util import list_depth, traverse_dict_tree
@@ -44,6 +46,20 @@ def handle_dependant_indices(title):
         record.save()
 
 
+def refresh_index_in_library(index):
+    """
+    Updates the library after a method in this package changed the schema of `index` and saved it without dependencies.
+    Like `process_index_change_in_core_cache`, the index's record is patched in place, and the caches derived from
+    every title in the library are reset.
+    :param index: Index that was changed
+    """
+    library.refresh_index_record_in_cache(index)
+    library.reset_text_titles_cache()
+    library.get_simple_term_mapping_json(rebuild=True)
+    library.get_topic_mapping(rebuild=True)
+    in_memory_cache.reset_all()
+
+
 def insert_last_child(new_node, parent_node):
     return attach_branch(new_node, parent_node, len(parent_node.children))
 
@@ -78,7 +94,8 @@ def attach_branch(new_node, parent_node, place=0):
     new_node.index = parent_node.index
 
     index.save(override_dependencies=True)
-    library.rebuild()
+    refresh_index_in_library(index)
+    process_index_node_order_change_in_links(index)
     refresh_version_state(index.title)
 
     handle_dependant_indices(index.title)
@@ -108,7 +125,8 @@ def remove_branch(node):
     parent.children = [n for n in parent.children if n.key != node.key]
 
     index.save(override_dependencies=True)
-    library.rebuild()
+    refresh_index_in_library(index)
+    process_index_node_order_change_in_links(index)
     refresh_version_state(index.title)
 
     handle_dependant_indices(index.title)
@@ -175,7 +193,8 @@ def merge_default_into_parent(parent_node):
 
     # Save index and rebuild library
     index.save(override_dependencies=True)
-    library.rebuild()
+    refresh_index_in_library(index)
+    process_index_node_order_change_in_links(index)
     refresh_version_state(index.title)
 
     handle_dependant_indices(index.title)
@@ -217,7 +236,8 @@ def convert_jagged_array_to_schema_with_default(ja_node):
     new_parent.parent = parent
 
     index.save(override_dependencies=True)
-    library.rebuild()
+    refresh_index_in_library(index)
+    process_index_node_order_change_in_links(index)
     refresh_version_state(index.title)
     handle_dependant_indices(index.title)
 
@@ -256,7 +276,8 @@ def convert_simple_index_to_complex(index):
     index.nodes = new_parent
 
     index.save(override_dependencies=True)
-    library.rebuild()
+    refresh_index_in_library(index)
+    process_index_node_order_change_in_links(index)
     refresh_version_state(index.title)
 
     handle_dependant_indices(index.title)
@@ -312,7 +333,7 @@ def change_parent(node, new_parent, place=0, exact_match=False):
     new_normal_form = node.ref(force_update=True).normal()
 
     index.save(override_dependencies=True)
-    library.rebuild()
+    refresh_index_in_library(index)
 
     for link in linkset:
         if exact_match:
@@ -320,6 +341,7 @@ def change_parent(node, new_parent, place=0, exact_match=False):
         else:
             link.refs = [ref.replace(old_normal_form, new_normal_form) for ref in link.refs]
         link.save()
+    process_index_node_order_change_in_links(index)
     # todo: commentary linkset
 
     refresh_version_state(index.title)
@@ -373,7 +395,7 @@ def change_node_title(snode, old_title, lang, new_title, ignore_cascade=False):
     snode.remove_title(old_title, lang)
 
     snode.index.save(override_dependencies=True)
-    library.refresh_index_record_in_cache(snode.index)
+    refresh_index_in_library(snode.index)
 
 
 """
@@ -562,7 +584,8 @@ def change_node_structure(ja_node, section_names, address_types=None, upsize_in_
     if delta > 0:
         cascade(ja_node.ref(), rewriter=fix_ref, needs_rewrite=needs_fixing)
 
-    library.rebuild()
+    refresh_index_in_library(index)
+    process_index_node_order_change_in_links(index)
     refresh_version_state(index.title)
 
     handle_dependant_indices(index.title)
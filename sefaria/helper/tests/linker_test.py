@@ -138,6 +138,12 @@ def mock_webpage() -> WebPage:
         yield loaded_webpage
 
 
+@pytest.fixture
+def mock_hit_buffer() -> Mock:
+    with patch('sefaria.helper.linker.linker.webpage_hit_buffer') as mock_buffer:
+        yield mock_buffer
+
+
 class TestFindRefsHelperClasses:
 
     def test_find_refs_text(self):
@@ -167,16 +173,15 @@ class TestFindRefsHelperClasses:
 
 
 class TestMakeFindRefsResponse:
-    def test_make_find_refs_response_with_meta_data(self, mock_request: WSGIRequest, mock_webpage: Mock):
+    def test_make_find_refs_response_with_meta_data(self, mock_request: WSGIRequest, mock_webpage: Mock,
+                                                    mock_hit_buffer: Mock):
         response = linker.make_find_refs_response(mock_request)
-        mock_webpage.add_hit.assert_called_once()
-        mock_webpage.save.assert_called_once()
+        mock_hit_buffer.add.assert_called_once()
 
     def test_make_find_refs_response_without_meta_data(self, mock_request_without_meta_data: dict,
-                                                       mock_webpage: Mock):
+                                                       mock_webpage: Mock, mock_hit_buffer: Mock):
         response = linker.make_find_refs_response(mock_request_without_meta_data)
-        mock_webpage.add_hit.assert_not_called()
-        mock_webpage.save.assert_not_called()
+        mock_hit_buffer.add.assert_not_called()
 
     def test_make_find_refs_response_invalid_post_data(self, mock_request_invalid: dict,
                                                        mock_webpage: Mock):
@@ -201,15 +206,13 @@ class TestUnpackFindRefsRequest:
 
 
 class TestAddWebpageHitForUrl:
-    def test_add_webpage_hit_for_url(self, mock_webpage: Mock):
+    def test_add_webpage_hit_for_url(self, mock_hit_buffer: Mock):
         linker._add_webpage_hit_for_url('https://test.com')
-        mock_webpage.add_hit.assert_called_once()
-        mock_webpage.save.assert_called_once()
+        mock_hit_buffer.add.assert_called_once_with('https://test.com')
 
-    def test_add_webpage_hit_for_url_no_url(self, mock_webpage: Mock):
+    def test_add_webpage_hit_for_url_no_url(self, mock_hit_buffer: Mock):
         linker._add_webpage_hit_for_url(None)
-        mock_webpage.add_hit.assert_not_called()
-        mock_webpage.save.assert_not_called()
+        mock_hit_buffer.add.assert_not_called()
 
 
 class TestFindRefsResponseLinkerV3:
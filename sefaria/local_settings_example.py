@@ -182,6 +182,8 @@ SEARCH_INDEX_NAME_SHEET = 'sheet'
 SEARCH_INDEX_NAME_TOPIC = 'topic'  # topics and authors (authors are a subtype of topic) - powers /api/entity-search
 SEARCH_INDEX_NAME_BOOK = 'book'  # Index (book) records - powers /api/entity-search
 SEARCH_INDEX_NAME_CATEGORY = 'category'  # searchable TOC categories - powers category results on the Books tab
+SEARCH_REINDEX_PROCESSES = 1  # worker processes for a full text reindex
+SEARCH_REINDEX_IN_FLIGHT_REQUESTS = 2  # bulk requests each reindex worker may have in flight at once
 
 # Node Server
 USE_NODE = False
@@ -191,6 +193,8 @@ FAIL_IF_NODE_SSR_UNAVAILABLE = False   # set to True for debugging purposes only
 
 SEFARIA_DATA_PATH = '/path/to/your/Sefaria-Data' # used for Data
 SEFARIA_EXPORT_PATH = '/path/to/your/Sefaria-Data/export' # used for exporting texts
+SEFARIA_EXPORT_PROCESSES = 1  # export stages run at once
+SEFARIA_EXPORT_COMPRESSION = None  # None, "gzip" or "zstd" for exported texts and links
 
 
 GOOGLE_GTAG = 'your gtag id here'
@@ -232,6 +236,27 @@ DISABLE_AUTOCOMPLETER = False
 # Turns on loading of machine learning models to run linker
 ENABLE_LINKER = False
 
+# Share parsed Refs between all processes on a host through a memory-mapped file.  Use a tmpfs path, e.g. "/dev/shm/sefaria_ref_cache"
+SHARED_REF_CACHE_PATH = None
+SHARED_REF_CACHE_SLOTS = 131072
+
+# Load the initialized library from a snapshot file, when it is current, instead of building it from the database
+LIBRARY_SNAPSHOT_PATH = None
+
+# Share the autocompleters between processes as memory mapped files in this directory
+AUTOCOMPLETER_STORE_PATH = None
+
+# Public user data kept per process, and for how many seconds
+PUBLIC_USER_DATA_CACHE_SIZE = 20000
+PUBLIC_USER_DATA_CACHE_TIMEOUT = 60 * 60
+
+# Linker hits on webpages held per process before they're written, in seconds and webpages
+WEBPAGE_HIT_FLUSH_INTERVAL = 60
+WEBPAGE_HIT_BUFFER_SIZE = 1000
+
+# Seconds between each web worker's checks of the sampling profiler's remote config entry.  0 disables them.
+SAMPLING_PROFILER_POLL_SECONDS = 30
+
 # Caching with Cloudflare
 CLOUDFLARE_ZONE = ""
 CLOUDFLARE_EMAIL = ""
@@ -49,4 +49,6 @@ from .linker.ref_part import RawRef
 from .linker.linker import Linker
 from . import dependencies
 
-library._build_index_maps()
+from sefaria.settings import LIBRARY_SNAPSHOT_PATH
+if not (LIBRARY_SNAPSHOT_PATH and library.load_snapshot(LIBRARY_SNAPSHOT_PATH)):
+    library._build_index_maps()
@@ -314,6 +314,7 @@ class AbstractMongoSet(collections.abc.Iterable):
     def __init__(self, query=None, page=0, limit=0, sort=None, proj=None, skip=None, hint=None, record_kwargs=None):   # default sort used to be =[("_id", 1)]
         self.query = query or {}
         self.record_kwargs = record_kwargs or {}  # kwargs to pass to record when instantiating
+        self.proj = proj
         self.raw_records = getattr(db, self.recordClass.collection).find(self.query, proj)
         if sort:
             self.raw_records = self.raw_records.sort(sort)
@@ -328,11 +329,38 @@ class AbstractMongoSet(collections.abc.Iterable):
         self.current = 0
         self.max = None
         self._local_iter = None
+        self.last_streamed_id = None
 
     def __iter__(self):
         self._read_records()
         return iter(self.records)
 
+    def iter_stream(self, batch_size=1000, proj=None, raw=False, start_after=None):
+        """
+        Iterates over the records matching this set's query in `_id` order, fetching `batch_size` at a time, without holding the whole set.
+        Each batch is selected with `_id` greater than the last one seen, rather than with `skip()`,
+        so a batch deep into a collection costs the same as the first.  The set's sort, skip and limit are ignored.
+
+        :param proj: Projection.  Defaults to the set's projection.  `_id` is always returned.
+        :param raw: If True, yields the raw dicts rather than record objects
+        :param start_after: Resume after this `_id`, e.g. the `last_streamed_id` of an interrupted iteration
+        :return: generator of records
+        """
+        collection = getattr(db, self.recordClass.collection)
+        proj = self.proj if proj is None else proj
+        if isinstance(proj, dict) and not proj.get("_id", True):
+            proj = {k: v for k, v in proj.items() if k != "_id"} or None
+        last_id = start_after
+        while True:
+            query = self.query if last_id is None else {"$and": [self.query, {"_id": {"$gt": last_id}}]}
+            batch = list(collection.find(query, proj).sort("_id", 1).limit(batch_size))
+            for rec in batch:
+                self.last_streamed_id = rec["_id"]
+                yield rec if raw else self.recordClass(attrs=rec, **self.record_kwargs)
+            if len(batch) < batch_size:
+                return
+            last_id = batch[-1]["_id"]
+
     def __getitem__(self, item):
         self._read_records()
         return self.records[item]
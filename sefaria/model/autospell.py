@@ -7,6 +7,8 @@ http://scottlobdell.me/2015/02/writing-autocomplete-engine-scratch-python/
 from collections import defaultdict
 from typing import List, Iterable
 import math
+import os
+import pickle
 import datrie
 from unidecode import unidecode
 from django.contrib.auth.models import User
@@ -96,6 +98,134 @@ def normalizer(lang):
 splitter = re.compile(r"[\s,]+")
 
 
+class PicklableNormalizerMixin(object):
+    """
+    `normalizer()` returns a lambda, which can't be pickled.  Drop it when pickling (e.g. for a library snapshot,
+    see `Library.dump_snapshot()`) and recreate it from `self.lang` when unpickling.
+    """
+    _unpicklable_attrs = ("normalizer",)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for attr in self._unpicklable_attrs:
+            state.pop(attr, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.normalizer = normalizer(self.lang)
+
+
+def _restore_trie(cls, trie_state, attrs):
+    trie = cls.__new__(cls)
+    trie.__dict__.update(attrs)
+    trie.__setstate__(trie_state)
+    return trie
+
+
+class PicklableTrieMixin(object):
+    """
+    datrie.Trie pickles as a plain `datrie.Trie`, losing the subclass and its attributes.  Keeps both.
+    """
+    def __reduce__(self):
+        _, _, trie_state = datrie.Trie.__reduce__(self)
+        attrs = {k: v for k, v in self.__dict__.items() if k != "normalizer"}
+        return _restore_trie, (self.__class__, trie_state, attrs)
+
+    def __setstate__(self, state):
+        # Called by _restore_trie() with the state of the underlying datrie.Trie
+        datrie.Trie.__setstate__(self, state)
+        if "lang" in self.__dict__:
+            self.normalizer = normalizer(self.lang)
+
+
+class MappedTrie(object):
+    """
+    A read only trie of pickled values, memory mapped from a file written by `MappedTrie.save()`.
+    Answers the lookups the autocompleters make of a datrie.Trie.  The file's pages are shared by every process that
+    maps it, rather than each process holding its own copy of the trie.
+    """
+    def __init__(self, path):
+        import marisa_trie
+        self._trie = marisa_trie.BytesTrie()
+        self._trie.mmap(path)
+
+    @staticmethod
+    def save(path, items):
+        """
+        :param items: iterable of (key, value), with unique keys
+        """
+        import marisa_trie
+        marisa_trie.BytesTrie((k, pickle.dumps(v, protocol=pickle.HIGHEST_PROTOCOL)) for k, v in items).save(path)
+
+    def __getitem__(self, key):
+        values = self._trie.get(key)
+        if not values:
+            raise KeyError(key)
+        return pickle.loads(values[0])
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return key in self._trie
+
+    def __len__(self):
+        return len(self._trie)
+
+    def keys(self, prefix=""):
+        return sorted(self._trie.keys(prefix))
+
+    def items(self, prefix=""):
+        # In key order, as datrie returns them
+        return sorted(((k, pickle.loads(v)) for k, v in self._trie.items(prefix)), key=lambda item: item[0])
+
+
+class MappedNumbers(object):
+    """
+    A read only dict of numbers, memory mapped from a file written by `MappedNumbers.save()`.
+    :param fmt: struct format of the numbers, e.g. "<I"
+    """
+    def __init__(self, path, fmt):
+        import marisa_trie
+        self._trie = marisa_trie.RecordTrie(fmt)
+        self._trie.mmap(path)
+
+    @staticmethod
+    def save(path, fmt, items):
+        import marisa_trie
+        marisa_trie.RecordTrie(fmt, ((k, (v,)) for k, v in items)).save(path)
+
+    def __getitem__(self, key):
+        values = self._trie.get(key)
+        if not values:
+            raise KeyError(key)
+        return values[0][0]
+
+    def get(self, key, default=None):
+        values = self._trie.get(key)
+        return values[0][0] if values else default
+
+    def __contains__(self, key):
+        return key in self._trie
+
+    def __len__(self):
+        return len(self._trie)
+
+
+def mapped_token_trie(path):
+    """
+    :return: memory mapped marisa_trie.Trie of the keys saved to `path`, for NGramMatcher.token_trie
+    """
+    import marisa_trie
+    trie = marisa_trie.Trie()
+    trie.mmap(path)
+    return trie
+
+
 def get_search_categories(otoc):
     """
     Category nodes meaningful as search results.
@@ -150,11 +280,12 @@ def get_search_categories(otoc):
     return cats
 
 
-class AutoCompleter(object):
+class AutoCompleter(PicklableNormalizerMixin):
     """
     An AutoCompleter object provides completion services - it is the object in this module designed to be used by the Library.
     It instantiates objects that provide string completion according to different algorithms.
     """
+    _unpicklable_attrs = ("normalizer", "library")
     def __init__(self, lang, lib, include_titles=True, include_categories=False,
                  include_parasha=False, include_lexicons=False, include_users=False, include_collections=False,
                  include_topics=False, min_topics=10, *args, **kwargs):
@@ -277,6 +408,41 @@ class AutoCompleter(object):
             self.spell_checker.train_phrases(forms)
             self.ngram_matcher.train_phrases(forms, normal_forms)
 
+    def __setstate__(self, state):
+        super(AutoCompleter, self).__setstate__(state)
+        self.library = library
+
+    _mapped_attrs = ("title_trie", "spell_checker", "ngram_matcher")
+
+    def save_mapped(self, directory):
+        """
+        Writes this AutoCompleter to `directory`, as files that `load_mapped()` memory maps.
+        """
+        os.makedirs(directory, exist_ok=True)
+        MappedTrie.save(os.path.join(directory, "titles.marisa"), self.title_trie.items())
+        self.spell_checker.save_mapped(directory)
+        self.ngram_matcher.save_mapped(directory)
+        attrs = {k: v for k, v in self.__dict__.items() if k not in self._mapped_attrs + self._unpicklable_attrs + ("other_lang_ac",)}
+        with open(os.path.join(directory, "attrs.pickle"), "wb") as f:
+            pickle.dump(attrs, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load_mapped(cls, directory, lib):
+        """
+        :return: an AutoCompleter answering from the files written by `save_mapped()` to `directory`
+        """
+        with open(os.path.join(directory, "attrs.pickle"), "rb") as f:
+            attrs = pickle.load(f)
+        ac = cls.__new__(cls)
+        ac.__dict__.update(attrs)
+        ac.library = lib
+        ac.normalizer = normalizer(ac.lang)
+        ac.other_lang_ac = None
+        ac.title_trie = MappedTrie(os.path.join(directory, "titles.marisa"))
+        ac.spell_checker = SpellChecker.load_mapped(directory, ac.lang)
+        ac.ngram_matcher = NGramMatcher.load_mapped(directory, ac.lang)
+        return ac
+
     def set_other_lang_ac(self, ac):
         self.other_lang_ac = ac
 
@@ -578,7 +744,7 @@ class Completions(object):
         return [completions, completion_objects]
 
 
-class LexiconTrie(datrie.Trie):
+class LexiconTrie(PicklableTrieMixin, datrie.Trie):
 
     def __init__(self, lexicon_name):
         super(LexiconTrie, self).__init__(letter_scope)
@@ -591,7 +757,7 @@ class LexiconTrie(datrie.Trie):
                     self[hebrew.strip_nikkud(ahw)] = self.get(hebrew.strip_nikkud(ahw), []) + [entry.headword]
 
 
-class TitleTrie(datrie.Trie):
+class TitleTrie(PicklableTrieMixin, datrie.Trie):
     """
     Character Trie built up of the titles in the library.
     Stored items are lists of dicts, each dict having details about one system object.
@@ -673,7 +839,7 @@ class TitleTrie(datrie.Trie):
                 }
 
 
-class SpellChecker(object):
+class SpellChecker(PicklableNormalizerMixin):
     """
     Utilities to find small edits of a given string,
     and also to find edits of a given string that result in words in our title list.
@@ -688,6 +854,15 @@ class SpellChecker(object):
             self.letters = hebrew.ALPHABET_22 + hebrew.GERESH + hebrew.GERSHAYIM + '".' + "'"
         self.WORDS = defaultdict(int)
 
+    def save_mapped(self, directory):
+        MappedNumbers.save(os.path.join(directory, "words.marisa"), "<I", self.WORDS.items())
+
+    @classmethod
+    def load_mapped(cls, directory, lang):
+        checker = cls(lang)
+        checker.WORDS = MappedNumbers(os.path.join(directory, "words.marisa"), "<I")
+        return checker
+
     def train_phrases(self, phrases):
         """
         :param phrases: A list of normalized (lowercased, etc) strings
@@ -727,7 +902,7 @@ class SpellChecker(object):
         return [self.correct_token(token) for token in tokens if token]
 
 
-class NGramMatcher(object):
+class NGramMatcher(PicklableNormalizerMixin):
     """
     Utility to find titles in our list that roughly match a given string. 
     """
@@ -753,6 +928,20 @@ class NGramMatcher(object):
         for k in self.token_to_titles.keys():
             self.token_trie[k] = 1
 
+    def save_mapped(self, directory):
+        import marisa_trie
+        MappedTrie.save(os.path.join(directory, "token_titles.marisa"), self.token_to_titles.items())
+        marisa_trie.Trie(self.token_to_titles.keys()).save(os.path.join(directory, "tokens.marisa"))
+        self._tfidf_scorer.save_mapped(directory)
+
+    @classmethod
+    def load_mapped(cls, directory, lang):
+        matcher = cls(lang)
+        matcher.token_to_titles = MappedTrie(os.path.join(directory, "token_titles.marisa"))
+        matcher.token_trie = mapped_token_trie(os.path.join(directory, "tokens.marisa"))
+        matcher._tfidf_scorer = TfidfScorer.load_mapped(directory)
+        return matcher
+
     def _get_real_tokens_from_possible_n_grams(self, tokens):
         return {token: self.token_trie.keys(token) for token in tokens}
 
@@ -802,6 +991,19 @@ class TfidfScorer:
             self._token_idf_map[token] = idf
         self._missing_idf_value = math.log(self._total_documents)
 
+    def save_mapped(self, directory: str) -> None:
+        MappedNumbers.save(os.path.join(directory, "idf.marisa"), "<d", self._token_idf_map.items())
+        with open(os.path.join(directory, "idf.pickle"), "wb") as f:
+            pickle.dump((self._missing_idf_value, self._total_documents), f)
+
+    @classmethod
+    def load_mapped(cls, directory: str) -> "TfidfScorer":
+        scorer = cls()
+        scorer._token_idf_map = MappedNumbers(os.path.join(directory, "idf.marisa"), "<d")
+        with open(os.path.join(directory, "idf.pickle"), "rb") as f:
+            scorer._missing_idf_value, scorer._total_documents = pickle.load(f)
+        return scorer
+
     def score_token(self, query_token: str, doc_tokens):
         tf = 1 / (1 + len(doc_tokens))  # approximation of tf excluding # of times token appears in document. this seems like a small factor for AC and adds function calls.
         idf = self._token_idf_map.get(query_token, self._missing_idf_value)
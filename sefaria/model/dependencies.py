@@ -25,6 +25,8 @@ logger = structlog.get_logger(__name__)
 
 # Index Save / Create
 subscribe(text.process_index_change_in_core_cache,                      text.Index, "save")
+# After the core cache, so that the links' refs are parsed with the new schema
+subscribe(link.process_index_node_order_change_in_links,                text.Index, "save")
 subscribe(version_state.create_version_state_on_index_creation,         text.Index, "save")
 subscribe(text.process_index_change_in_toc,                             text.Index, "save")
 subscribe(place.process_index_place_change, text.Index, 'attributeChange', 'compPlace')
@@ -140,6 +142,10 @@ subscribe(process_version_delete_in_global_notifications,              text.Vers
 # Note Delete
 subscribe(layer.process_note_deletion_in_layer,                         note.Note, "delete")
 
+# Link Save / Delete
+subscribe(link.process_link_change_in_interval_indexes,                 link.Link, "save")
+subscribe(link.process_link_change_in_interval_indexes,                 link.Link, "delete")
+
 # Topic
 # Entity search: keep the `topic` index in sync with Topic saves/deletes.
 # notify() dispatches on the exact instance type, and topics load as their subclass
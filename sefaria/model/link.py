@@ -4,7 +4,11 @@ Writes to MongoDB Collection: links
 """
 
 import regex as re
+import time
 from bson.objectid import ObjectId
+from pymongo import UpdateOne
+from remote_config import remoteConfigCache
+from remote_config.keys import LINK_INTERVAL_LOOKUP_KEY, LINK_INTERVAL_HOT_BOOKS_KEY
 from sefaria.model.text import AbstractTextRecord, VersionSet
 from sefaria.system.exceptions import DuplicateRecordError, InputError, BookNameError
 from sefaria.system.database import db
@@ -45,7 +49,8 @@ class Link(abst.AbstractMongoRecord):
         "score",             # int. represents how "good"/accurate the link is. introduced for quotations finder
         "inline_citation",    # bool acts as a flag for wrapped refs logic to run on the segments where this citation is inline.
         "versions",          # only for cases when type is `essay`: list of versionTitles corresponding to `refs`, where first versionTitle corresponds to Index of first ref, and each value is a dictionary of language and title of version
-        "displayedText"       # only for cases when type is `essay`: dictionary of en and he strings to be displayed
+        "displayedText",      # only for cases when type is `essay`: dictionary of en and he strings to be displayed
+        "orderIntervals",     # list corresponding to `refs` of dicts {"title", "start", "end"}: the index title and `Ref.order_id_interval()` of each ref. Used for interval lookups of links.
     ]
 
     def _normalize(self):
@@ -168,6 +173,7 @@ class Link(abst.AbstractMongoRecord):
 
         if not getattr(self, "_skip_expanded_refs_set", False):
             self._set_expanded_refs()
+            self._set_order_intervals()
 
     def _sanitize(self):
         """
@@ -190,6 +196,35 @@ class Link(abst.AbstractMongoRecord):
         self.expandedRefs0 = [oref.normal() for oref in text.Ref(self.refs[0]).all_segment_refs()]
         self.expandedRefs1 = [oref.normal() for oref in text.Ref(self.refs[1]).all_segment_refs()]
 
+    @staticmethod
+    def order_interval_for_ref(oref):
+        interval = oref.order_id_interval()
+        if interval is None:
+            return None
+        return {"title": oref.index.title, "start": interval[0], "end": interval[1]}
+
+    def _set_order_intervals(self):
+        intervals = [self.order_interval_for_ref(text.Ref(tref)) for tref in self.refs]
+        if None in intervals:
+            if hasattr(self, "orderIntervals"):
+                delattr(self, "orderIntervals")
+            return
+        self.orderIntervals = intervals
+
+    def anchor_position(self, oref):
+        """
+        :return: The position (0 or 1) in `self.refs` of the ref overlapping `oref`, or None if this link has no order intervals.
+        If both refs overlap `oref`, returns 0.
+        """
+        intervals = getattr(self, "orderIntervals", None)
+        anchor = self.order_interval_for_ref(oref)
+        if not intervals or not anchor:
+            return None
+        for pos, interval in enumerate(intervals):
+            if interval["title"] == anchor["title"] and interval["start"] <= anchor["end"] and anchor["start"] <= interval["end"]:
+                return pos
+        return 1
+
     def ref_opposite(self, from_ref, as_tuple=False):
         """
         Return the Ref in this link that is opposite the one matched by `from_ref`.
@@ -227,16 +262,39 @@ class LinkSet(abst.AbstractMongoSet):
         LinkSet can be initialized with a query dictionary, as any other MongoSet.
         It can also be initialized with a :py:class: `sefaria.text.Ref` object,
         and will use the :py:meth: `sefaria.text.Ref.regex()` method to return the set of Links that refer to that Ref or below.
+        When the `LINK_INTERVAL_LOOKUP_KEY` remote config flag is on, Links are found instead by overlap of their `orderIntervals`
+        with the Ref's :py:meth: `sefaria.text.Ref.order_id_interval()`, answered from memory for books listed in `LINK_INTERVAL_HOT_BOOKS_KEY`.
         :param query_or_ref: A query dict, or a :py:class: `sefaria.text.Ref` object
         '''
-        try:
-            regex_list = query_or_ref.regex(as_list=True)
-            ref_clauses = [{"expandedRefs0": {"$regex": r}} for r in regex_list]
-            ref_clauses += [{"expandedRefs1": {"$regex": r}} for r in regex_list]
-            super(LinkSet, self).__init__({"$or": ref_clauses}, page, limit)
-        except AttributeError:
+        if isinstance(query_or_ref, text.Ref):
+            query = None
+            if remoteConfigCache.get(LINK_INTERVAL_LOOKUP_KEY, False):
+                query = self.interval_query(query_or_ref)
+            if query is None:
+                regex_list = query_or_ref.regex(as_list=True)
+                ref_clauses = [{"expandedRefs0": {"$regex": r}} for r in regex_list]
+                ref_clauses += [{"expandedRefs1": {"$regex": r}} for r in regex_list]
+                query = {"$or": ref_clauses}
+            super(LinkSet, self).__init__(query, page, limit)
+        else:
             super(LinkSet, self).__init__(query_or_ref, page, limit)
 
+    @staticmethod
+    def interval_query(oref):
+        """
+        :return: Query for the Links that have a ref overlapping `oref`, or None if `oref` has no order interval.
+        """
+        anchor = Link.order_interval_for_ref(oref)
+        if anchor is None:
+            return None
+        if anchor["title"] in remoteConfigCache.get(LINK_INTERVAL_HOT_BOOKS_KEY, []):
+            return {"_id": {"$in": LinkIntervalIndex.get(anchor["title"]).overlapping(anchor["start"], anchor["end"])}}
+        return {"orderIntervals": {"$elemMatch": {
+            "title": anchor["title"],
+            "start": {"$lte": anchor["end"]},
+            "end": {"$gte": anchor["start"]},
+        }}}
+
     def filter(self, sources):
         """
         Filter LinkSet according to 'sources' which may be either
@@ -342,6 +400,82 @@ class LinkSet(abst.AbstractMongoSet):
         return [{"name": key, "count": results[key]["count"], "books": results[key]["books"] } for key in list(results.keys())]
 
 
+class LinkIntervalIndex(object):
+    """
+    In-memory interval tree of the order intervals of all links to one book, for books whose links are looked up too often
+    to query Mongo each time.  Kept per process, and rebuilt when older than `ttl` seconds or when a link to the book changes.
+    """
+    ttl = 600
+    _cache = {}
+
+    def __init__(self, title, intervals):
+        """
+        :param intervals: list of (start, end, link _id)
+        """
+        self.title = title
+        self.built = time.time()
+        intervals = sorted(intervals, key=lambda x: (x[0], x[1]))
+        self._starts = [i[0] for i in intervals]
+        self._ends = [i[1] for i in intervals]
+        self._ids = [i[2] for i in intervals]
+        # Max end of each subtree of the implicit binary tree over the sorted intervals, rooted at the middle element
+        self._max_ends = [""] * len(intervals)
+        self._build(0, len(intervals))
+
+    def _build(self, lo, hi):
+        if lo >= hi:
+            return ""
+        mid = (lo + hi) // 2
+        self._max_ends[mid] = max(self._ends[mid], self._build(lo, mid), self._build(mid + 1, hi))
+        return self._max_ends[mid]
+
+    def __len__(self):
+        return len(self._ids)
+
+    @classmethod
+    def load(cls, title):
+        intervals = []
+        for record in db.links.find({"orderIntervals.title": title}, {"orderIntervals": 1}):
+            intervals += [(i["start"], i["end"], record["_id"]) for i in record["orderIntervals"] if i["title"] == title]
+        return cls(title, intervals)
+
+    @classmethod
+    def get(cls, title):
+        index = cls._cache.get(title)
+        if index is None or time.time() - index.built > cls.ttl:
+            index = cls._cache[title] = cls.load(title)
+        return index
+
+    @classmethod
+    def invalidate(cls, title):
+        cls._cache.pop(title, None)
+
+    def overlapping(self, start, end):
+        """
+        :return: list of the _ids of links with an interval overlapping [start, end]
+        """
+        results = []
+        stack = [(0, len(self._ids))]
+        while stack:
+            lo, hi = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            if self._max_ends[mid] < start:
+                continue  # everything in this subtree ends before the query starts
+            stack.append((lo, mid))
+            if self._starts[mid] <= end:
+                if self._ends[mid] >= start:
+                    results.append(self._ids[mid])
+                stack.append((mid + 1, hi))
+        return list(dict.fromkeys(results))
+
+
+def process_link_change_in_interval_indexes(link, **kwargs):
+    for interval in getattr(link, "orderIntervals", None) or []:
+        LinkIntervalIndex.invalidate(interval["title"])
+
+
 def process_index_title_change_in_links(indx, **kwargs):
     report_progress("Cascading Links {} to {}".format(kwargs['old'], kwargs['new']))
 
@@ -355,6 +489,9 @@ def process_index_title_change_in_links(indx, **kwargs):
         l.refs = [r.replace(kwargs["old"], kwargs["new"], 1) if re.search('|'.join(patterns), r) else r for r in l.refs]
         l.expandedRefs0 = [r.replace(kwargs["old"], kwargs["new"], 1) if re.search('|'.join(patterns), r) else r for r in l.expandedRefs0]
         l.expandedRefs1 = [r.replace(kwargs["old"], kwargs["new"], 1) if re.search('|'.join(patterns), r) else r for r in l.expandedRefs1]
+        for interval in getattr(l, "orderIntervals", None) or []:
+            if interval["title"] == kwargs["old"]:
+                interval["title"] = kwargs["new"]
         try:
             l._skip_lang_check = True
             l._skip_expanded_refs_set = True
@@ -364,6 +501,37 @@ def process_index_title_change_in_links(indx, **kwargs):
             l.delete()
 
 
+def refresh_order_intervals(title):
+    """
+    Recomputes the `orderIntervals` of the links to `title`, which encode the position of each ref's node in the
+    schema, after the schema's nodes have been reordered or reshaped.
+    Must be called once the library's cache has the new schema.
+    :return int: number of links updated
+    """
+    updates = []
+    for record in db.links.find({"orderIntervals.title": title}, {"refs": 1, "orderIntervals": 1}):
+        try:
+            intervals = [Link.order_interval_for_ref(text.Ref(tref)) for tref in record["refs"]]
+        except InputError:
+            intervals = [None]
+        if None in intervals:
+            updates.append(UpdateOne({"_id": record["_id"]}, {"$unset": {"orderIntervals": ""}}))
+        elif intervals != record["orderIntervals"]:
+            updates.append(UpdateOne({"_id": record["_id"]}, {"$set": {"orderIntervals": intervals}}))
+    for i in range(0, len(updates), 5000):
+        db.links.bulk_write(updates[i:i + 5000], ordered=False)
+    LinkIntervalIndex.invalidate(title)
+    return len(updates)
+
+
+def process_index_node_order_change_in_links(indx, **kwargs):
+    if not indx.is_node_order_changed():
+        return
+    report_progress("Refreshing order intervals of links to {}".format(indx.title))
+    refresh_order_intervals(indx.title)
+    indx.reset_node_order()
+
+
 def process_index_delete_in_links(indx, **kwargs):
     from sefaria.model.text import prepare_index_regex_for_dependency_process
     pattern = prepare_index_regex_for_dependency_process(indx)
@@ -6,6 +6,7 @@ notifications.py - handle user event notifications
 Writes to MongoDB Collection: notifications
 """
 import re
+from collections import defaultdict
 from datetime import datetime
 import json
 
@@ -13,7 +14,6 @@ from django.template.loader import render_to_string
 
 from . import abstract as abst
 from . import user_profile
-from sefaria.model.collection import Collection
 from sefaria.utils.util import strip_tags
 from sefaria.system.database import db
 from sefaria.system.exceptions import InputError
@@ -253,82 +253,26 @@ class Notification(abst.AbstractMongoRecord):
     def id(self):
         return str(self._id)
 
+    # The key in `content` of the user who acted, by notification type
+    actor_keys = {
+        "sheet like":     "liker",
+        "sheet publish":  "publisher",
+        "follow":         "follower",
+        "collection add": "adder",
+        "discuss":        "adder",
+    }
+
     @property
     def actor_id(self):
         """The id of the user who acted in this notification"""
-        keys = {
-            "sheet like":     "liker",
-            "sheet publish":  "publisher",
-            "follow":         "follower",
-            "collection add": "adder",
-            "discuss":        "adder",
-        }
-        return self.content[keys[self.type]]
+        return self.content[self.actor_keys[self.type]]
 
     def client_contents(self):
         """
         Returns contents of notification in format usable by client, including needed merged
         data from profiles, sheets, etc
         """
-        from sefaria.sheets import get_sheet_metadata
-        from sefaria.model.following import FollowRelationship
-
-        n = super(Notification, self).contents(with_string_id=True)
-        n["date"] = n["date"].timestamp()
-        if "global_id" in n:
-            n["global_id"] = str(n["global_id"])
-
-        def annotate_user(n, uid):
-            user_data = user_profile.public_user_data(uid)
-            n["content"].update({
-                "name":       user_data["name"],
-                "profileUrl": user_data["profileUrl"],
-                "imageUrl":   user_data["imageUrl"],
-            })
-
-        def annotate_sheet(n, sheet_id):
-            sheet_data = get_sheet_metadata(id=sheet_id)
-            # Sheet may have been deleted since the notification was created;
-            # gracefully degrade rather than raising an AttributeError.
-            if sheet_data is None:
-                n["content"]["sheet_title"] = ""
-                n["content"]["summary"] = ""
-                return
-            n["content"]["sheet_title"] = strip_tags(sheet_data.get("title", ""), remove_new_lines=True)
-            n["content"]["summary"] = sheet_data.get("summary", "")
-
-        def annotate_collection(n, collection_slug):
-            try:
-               c = Collection().load({"slug": collection_slug})
-               n["content"]["collection_name"] = c.name
-            except:
-               c = Collection().load({"privateSlug": collection_slug})
-               n["content"]["collection_name"] = c.name
-
-        def annotate_follow(n, potential_followee):
-            """
-            Does `self.uid` follow `potential_followee`
-            """
-            relationship = FollowRelationship(follower=self.uid, followee=potential_followee)
-            n["content"]["is_already_following"] = relationship.exists()
-
-        if n["type"] == "sheet like":
-            annotate_sheet(n, n["content"]["sheet_id"])
-            annotate_user(n, n["content"]["liker"])
-
-        elif n["type"] == "sheet publish":
-            annotate_sheet(n, n["content"]["sheet_id"])
-            annotate_user(n, n["content"]["publisher"])
-
-        elif n["type"] == "follow":
-            annotate_user(n, n["content"]["follower"])
-            annotate_follow(n, n["content"]["follower"])
-
-        elif n["type"] == "collection add":
-            annotate_user(n, n["content"]["adder"])
-            annotate_collection(n, n["content"]["collection_slug"])
-
-        return n
+        return NotificationSet.render_client_contents([self])[0]
 
 
 class NotificationSet(abst.AbstractMongoSet):
@@ -408,7 +352,8 @@ class NotificationSet(abst.AbstractMongoSet):
         Likes are not included in this list (so that like only notifcations can generate a different email subject)
         Returns None if all actions are likes.
         """
-        actors = [user_profile.user_name(id) for id in self.actors_list()]
+        user_data = user_profile.public_user_data_bulk(self.actors_list())
+        actors = [data["name"] for data in user_data.values()]
         top, more = actors[:3], actors[3:]
         if len(more) == 1:
             top[2] = "2 others"
@@ -423,7 +368,112 @@ class NotificationSet(abst.AbstractMongoSet):
         return len([n for n in self if n.type == "sheet like"])
 
     def client_contents(self):
-        return [n.client_contents() for n in self]
+        return self.render_client_contents(self.array())
+
+    @staticmethod
+    def render_client_contents(notifications):
+        """
+        Returns the contents of `notifications` in format usable by client, including needed merged
+        data from profiles, sheets, etc.
+        The users, sheets, collections and follow relationships referenced by all the notifications are each
+        loaded with one query, grouped by notification type, rather than per notification.
+        """
+        contents = []
+        for notification in notifications:
+            n = notification.contents(with_string_id=True)
+            n["date"] = n["date"].timestamp()
+            if "global_id" in n:
+                n["global_id"] = str(n["global_id"])
+            contents.append(n)
+
+        by_type = defaultdict(list)
+        for n in contents:
+            by_type[n["type"]].append(n)
+        sheet_notes = by_type["sheet like"] + by_type["sheet publish"]
+        actor_notes = sheet_notes + by_type["follow"] + by_type["collection add"]
+
+        users = user_profile.public_user_data_bulk([n["content"][Notification.actor_keys[n["type"]]] for n in actor_notes])
+        sheets = NotificationSet._load_sheets({n["content"]["sheet_id"] for n in sheet_notes})
+        collection_names = NotificationSet._load_collection_names({n["content"]["collection_slug"] for n in by_type["collection add"]})
+        follows = NotificationSet._load_follows({(n["uid"], n["content"]["follower"]) for n in by_type["follow"]})
+
+        def annotate_user(n, uid):
+            user_data = users[uid]
+            n["content"].update({
+                "name":       user_data["name"],
+                "profileUrl": user_data["profileUrl"],
+                "imageUrl":   user_data["imageUrl"],
+            })
+
+        def annotate_sheet(n, sheet_id):
+            sheet_data = sheets.get(int(sheet_id))
+            # Sheet may have been deleted since the notification was created;
+            # gracefully degrade rather than raising an AttributeError.
+            if sheet_data is None:
+                n["content"]["sheet_title"] = ""
+                n["content"]["summary"] = ""
+                return
+            n["content"]["sheet_title"] = strip_tags(sheet_data.get("title", ""), remove_new_lines=True)
+            n["content"]["summary"] = sheet_data.get("summary", "")
+
+        for n in actor_notes:
+            annotate_user(n, n["content"][Notification.actor_keys[n["type"]]])
+
+        for n in sheet_notes:
+            annotate_sheet(n, n["content"]["sheet_id"])
+
+        for n in by_type["follow"]:
+            # Does the notified user already follow the follower
+            n["content"]["is_already_following"] = (n["uid"], n["content"]["follower"]) in follows
+
+        for n in by_type["collection add"]:
+            # Likewise for a collection that has since been deleted
+            n["content"]["collection_name"] = collection_names.get(n["content"]["collection_slug"], "")
+
+        return contents
+
+    @staticmethod
+    def _load_sheets(sheet_ids):
+        """
+        :return dict: the metadata of each sheet that still exists, by id
+        """
+        from sefaria.sheets import get_sheet_metadata_bulk
+        if not sheet_ids:
+            return {}
+        return {s["id"]: s for s in get_sheet_metadata_bulk([int(i) for i in sheet_ids], public=False)}
+
+    @staticmethod
+    def _load_collection_names(slugs):
+        """
+        :return dict: the name of each collection, by its slug or private slug
+        """
+        if not slugs:
+            return {}
+        slugs = list(slugs)
+        names = {}
+        query = {"$or": [{"slug": {"$in": slugs}}, {"privateSlug": {"$in": slugs}}]}
+        for c in db.groups.find(query, {"slug": 1, "privateSlug": 1, "name": 1}):
+            if c.get("privateSlug") in slugs:
+                names.setdefault(c["privateSlug"], c["name"])
+            if c.get("slug") in slugs:
+                # A collection's public slug wins over another's private slug
+                names[c["slug"]] = c["name"]
+        return names
+
+    @staticmethod
+    def _load_follows(pairs):
+        """
+        :param pairs: set of (follower, followee) uids
+        :return set: the pairs that are follow relationships
+        """
+        if not pairs:
+            return set()
+        query = {
+            "follower": {"$in": list({follower for follower, _ in pairs})},
+            "followee": {"$in": list({followee for _, followee in pairs})},
+        }
+        found = {(f["follower"], f["followee"]) for f in db.following.find(query, {"follower": 1, "followee": 1})}
+        return found & pairs
 
 
 def process_sheet_deletion_in_notifications(sheet_id):
@@ -0,0 +1,332 @@
+"""
+ref_array.py
+
+A compact, array-backed list of refs, for jobs that iterate over very many refs (e.g. every segment in the library)
+and don't need a full :class:`Ref` object for each one.
+
+Each element is stored as a node id, a depth, and padded rows of sections and toSections in NumPy integer arrays.
+Schema nodes are interned in a small per-array table.  Elements are promoted to real :class:`Ref` objects only when
+accessed with `[i]` or iterated over.
+"""
+from array import array
+from functools import reduce
+
+import numpy as np
+import structlog
+
+from .schema import JaggedArrayNode
+from sefaria.system.exceptions import InputError
+
+logger = structlog.get_logger(__name__)
+
+
+class RefArray(object):
+    """
+    ::
+
+        >>> refs = library.get_index("Genesis").all_segment_ref_array()
+        >>> len(refs)
+        1533
+        >>> refs[0]
+        Ref('Genesis 1:1')
+        >>> refs.contained_by(Ref("Genesis 2")).sum()
+        25
+    """
+    # Deepest JaggedArray in the library is well within this
+    MAX_DEPTH = 6
+
+    def __init__(self, nodes, node_ids, depths, starts, ends):
+        """
+        Usually built through `from_refs()`, `from_index()` or a :class:`RefArrayBuilder`
+        :param nodes: list of schema nodes.  `node_ids` index into this list.
+        :param node_ids: int array, one per element
+        :param depths: int array, number of sections in each element
+        :param starts: 2d int array of sections, zero padded beyond each element's depth
+        :param ends: 2d int array of toSections, zero padded beyond each element's depth
+        """
+        self._nodes = nodes
+        self.node_ids = node_ids
+        self.depths = depths
+        self.starts = starts
+        self.ends = ends
+        self._index_ids = None
+        self._order_bases = None
+
+    @classmethod
+    def from_refs(cls, refs):
+        builder = RefArrayBuilder()
+        for oref in refs:
+            builder.add(oref.index_node, oref.sections, oref.toSections)
+        return builder.build()
+
+    @classmethod
+    def from_index(cls, index):
+        """
+        All segment refs of `index`, in order.  Equivalent to `index.all_segment_refs()`, computed from the
+        index's VersionState without building any :class:`Ref`.
+        """
+        builder = RefArrayBuilder()
+        vs = index.versionState()
+        for node in index.nodes.get_leaf_nodes():
+            try:
+                state_ja = vs.state_node(node).ja("all")
+            except Exception as e:
+                logger.warning("Failed to generate references for {}. {}".format(node.full_title("en"), str(e)))
+                continue
+            for indxs in state_ja.non_empty_sections():
+                section = [a + 1 for a in indxs]
+                for i in range(state_ja.sub_array_length(indxs) or 0):
+                    segment = section + [i + 1]
+                    builder.add(node, segment, segment)
+        return builder.build()
+
+    """ Sequence protocol """
+    def __len__(self):
+        return len(self.node_ids)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice) or isinstance(i, np.ndarray):
+            return self.take(i)
+        return self._promote(i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._promote(i)
+
+    def __repr__(self):
+        return "{}({} refs)".format(self.__class__.__name__, len(self))
+
+    def take(self, selector):
+        """
+        :param selector: slice, boolean mask or array of positions
+        :return: RefArray of the selected elements, sharing this array's node table
+        """
+        return self.__class__(self._nodes, self.node_ids[selector], self.depths[selector], self.starts[selector], self.ends[selector])
+
+    def node(self, i):
+        return self._nodes[self.node_ids[i]]
+
+    def sections(self, i):
+        return self.starts[i, :self.depths[i]].tolist()
+
+    def to_sections(self, i):
+        return self.ends[i, :self.depths[i]].tolist()
+
+    def iter_addresses(self):
+        """
+        Iterate over the elements without promoting them to Refs
+        :return: generator of (schema node, sections, toSections)
+        """
+        for i in range(len(self)):
+            yield self.node(i), self.sections(i), self.to_sections(i)
+
+    def _promote(self, i):
+        from .text import Ref
+        node = self.node(i)
+        return Ref(_obj={
+            "index": node.index,
+            "book": node.full_title("en"),
+            "primary_category": node.index.get_primary_category(),
+            "index_node": node,
+            "sections": self.sections(i),
+            "toSections": self.to_sections(i),
+        })
+
+    def is_range(self):
+        """
+        :return: bool array
+        """
+        return np.any(self.starts != self.ends, axis=1)
+
+    @property
+    def index_ids(self):
+        """
+        :return: int array, the position of each element's Index in `self.indexes()`
+        """
+        if self._index_ids is None:
+            titles = [node.index.title for node in self._nodes]
+            index_positions = {title: i for i, title in enumerate(dict.fromkeys(titles))}
+            node_to_index = np.array([index_positions[title] for title in titles], dtype=np.int32)
+            self._index_ids = node_to_index[self.node_ids] if len(self._nodes) else np.zeros(0, dtype=np.int32)
+        return self._index_ids
+
+    def indexes(self):
+        return list({node.index.title: node.index for node in self._nodes}.values())
+
+    """ String forms """
+    def normals(self, lang="en"):
+        """
+        Normal forms of all elements.  Non-ranged elements are formatted directly from their node and sections.
+        :return: list of str
+        """
+        normals = []
+        for i in range(len(self)):
+            node = self.node(i)
+            sections = self.sections(i)
+            if sections != self.to_sections(i):
+                normals.append(self._promote(i).normal(lang))
+                continue
+            normal = node.full_title(lang)
+            if sections:
+                offsets_by_depth = getattr(node, "index_offsets_by_depth", None)
+                normal += " " + ":".join(
+                    node.address_class(d).toStr(lang, s + JaggedArrayNode.get_index_offset([x - 1 for x in sections[:d]], offsets_by_depth))
+                    for d, s in enumerate(sections)
+                )
+            normals.append(normal)
+        return normals
+
+    def order_ids(self):
+        """
+        Same as calling `Ref.order_id()` on each element, with the catalog lookup done once per node.
+        :return: list of str
+        """
+        from .text import library
+        if self._order_bases is None:
+            category_ids = library.category_id_dict()
+            self._order_bases = []
+            for node in self._nodes:
+                index = node.index
+                try:
+                    base = category_ids["/".join(index.categories + [index.title])]
+                    if index.is_complex() and node.parent:
+                        child_order = index.nodes.get_child_order(node)
+                        base += str(format(child_order, '03')) if isinstance(child_order, int) else child_order
+                except Exception as e:
+                    logger.warning("Failed to execute order_id for {} : {}".format(node.full_title("en"), e))
+                    base = None
+                self._order_bases.append(base)
+
+        ids = []
+        for i in range(len(self)):
+            base = self._order_bases[self.node_ids[i]]
+            if base is None:
+                ids.append("Z")
+                continue
+            sections = self.sections(i)
+            to_sections = self.to_sections(i)
+            res = reduce(lambda x, y: x + str(format(y, '04')), sections, base)
+            if sections != to_sections:
+                res = reduce(lambda x, y: x + str(format(y, '04')), to_sections, res + "-")
+            ids.append(res)
+        return ids
+
+    """ Comparisons with a single Ref.  Each returns a bool array with one value per element. """
+    def _node_masks(self, oref, relation):
+        """
+        :param relation: function of (oref's node, element node) used when nodes differ
+        :return: (mask of elements on oref's node, mask of elements on other nodes for which `relation` holds)
+        """
+        same = np.zeros(len(self._nodes), dtype=bool)
+        related = np.zeros(len(self._nodes), dtype=bool)
+        for i, node in enumerate(self._nodes):
+            if node == oref.index_node:
+                same[i] = True
+            elif relation is not None:
+                related[i] = relation(oref.index_node, node)
+        return same[self.node_ids], related[self.node_ids]
+
+    @staticmethod
+    def _compare(rows, depths, vector):
+        """
+        Lexicographic comparison of each row with `vector`, over the levels of specificity they share
+        :return: int array of -1, 0 or 1
+        """
+        result = np.zeros(len(rows), dtype=np.int8)
+        undecided = np.ones(len(rows), dtype=bool)
+        # Rows are only as wide as the deepest element, and no element shares the levels past that with `vector`
+        for level, value in enumerate(vector[:rows.shape[1]]):
+            active = undecided & (depths > level)
+            lt = active & (rows[:, level] < value)
+            gt = active & (rows[:, level] > value)
+            result[lt] = -1
+            result[gt] = 1
+            undecided &= ~(lt | gt)
+        return result
+
+    def overlaps(self, oref):
+        """
+        :return: bool array, `oref.overlaps(element)` for each element
+        """
+        same, related = self._node_masks(oref, lambda node, other: node.is_ancestor_of(other))
+        overlapping = (self._compare(self.starts, self.depths, oref.toSections) <= 0) & \
+                      (self._compare(self.ends, self.depths, oref.sections) >= 0)
+        return related | (same & overlapping)
+
+    def contained_by(self, oref):
+        """
+        :return: bool array, `oref.contains(element)` for each element
+        """
+        same, related = self._node_masks(oref, lambda node, other: node.is_ancestor_of(other))
+        contained = (self._compare(self.ends, self.depths, oref.toSections) <= 0) & \
+                    (self._compare(self.starts, self.depths, oref.sections) >= 0)
+        result = related | (same & contained)
+
+        # Elements less specific than oref need the extent of the element's text.  Fall back to Ref.contains().
+        for i in np.nonzero(same & (self.depths < len(oref.sections)))[0]:
+            try:
+                result[i] = oref.contains(self._promote(i))
+            except InputError:
+                result[i] = False
+        return result
+
+    def precedes(self, oref):
+        """
+        :return: bool array, `element.precedes(oref)` for each element
+        """
+        same, _ = self._node_masks(oref, None)
+        shared = np.minimum(self.depths, len(oref.sections))
+        starting = oref.sections
+        return same & (shared > 0) & (self._compare(self.ends, shared, starting) < 0)
+
+    def follows(self, oref):
+        """
+        :return: bool array, `element.follows(oref)` for each element
+        """
+        same, _ = self._node_masks(oref, None)
+        shared = np.minimum(self.depths, len(oref.toSections))
+        return same & (shared > 0) & (self._compare(self.starts, shared, oref.toSections) > 0)
+
+    def nbytes(self):
+        return self.node_ids.nbytes + self.depths.nbytes + self.starts.nbytes + self.ends.nbytes
+
+
+class RefArrayBuilder(object):
+    """
+    Accumulates refs into compact buffers.  Call `build()` to get a :class:`RefArray`.
+    """
+    def __init__(self):
+        self._nodes = []
+        self._node_positions = {}
+        self._node_ids = array("i")
+        self._depths = array("b")
+        self._starts = array("i")
+        self._ends = array("i")
+        self._max_depth = 0
+
+    def __len__(self):
+        return len(self._node_ids)
+
+    def add(self, node, sections, to_sections=None):
+        to_sections = sections if to_sections is None else to_sections
+        depth = len(sections)
+        assert depth <= RefArray.MAX_DEPTH, "Ref is deeper than RefArray.MAX_DEPTH"
+        key = id(node)
+        if key not in self._node_positions:
+            self._node_positions[key] = len(self._nodes)
+            self._nodes.append(node)
+        self._node_ids.append(self._node_positions[key])
+        self._depths.append(depth)
+        padding = [0] * (RefArray.MAX_DEPTH - depth)
+        self._starts.extend(list(sections) + padding)
+        self._ends.extend(list(to_sections) + padding)
+        self._max_depth = max(self._max_depth, depth)
+
+    def build(self):
+        width = max(self._max_depth, 1)
+        starts = np.frombuffer(self._starts, dtype=np.int32).reshape(-1, RefArray.MAX_DEPTH)[:, :width].copy()
+        ends = np.frombuffer(self._ends, dtype=np.int32).reshape(-1, RefArray.MAX_DEPTH)[:, :width].copy()
+        return RefArray(self._nodes,
+                        np.frombuffer(self._node_ids, dtype=np.int32).copy(),
+                        np.frombuffer(self._depths, dtype=np.int8).copy(),
+                        starts, ends)
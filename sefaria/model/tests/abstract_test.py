@@ -139,6 +139,19 @@ class Test_Mongo_Set_Models(object):
             assert sub.recordClass != abstract.AbstractMongoRecord
             assert issubclass(sub.recordClass, abstract.AbstractMongoRecord)
 
+    def test_iter_stream(self):
+        query = {"title": {"$in": ["Genesis", "Exodus", "Leviticus", "Numbers", "Deuteronomy"]}}
+        expected = [v._id for v in model.VersionSet(query, sort=[("_id", 1)])]
+        vset = model.VersionSet(query)
+        streamed = list(vset.iter_stream(batch_size=2, proj={"chapter": 0}))
+        assert [v._id for v in streamed] == expected
+        assert all(isinstance(v, model.Version) and not hasattr(v, "chapter") for v in streamed)
+        assert vset.last_streamed_id == expected[-1]
+
+        raw = list(vset.iter_stream(batch_size=3, proj={"title": 1, "_id": 0}, raw=True, start_after=expected[1]))
+        assert [r["_id"] for r in raw] == expected[2:]
+        assert set(raw[0].keys()) == {"_id", "title"}
+
 
 class Test_Mongo_Record_Methods(object):
     """ Tests of the methods on the abstract models.
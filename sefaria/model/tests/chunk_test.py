@@ -132,6 +132,20 @@ def test_commentary_chunks():
     assert span.text[-1][-1] == verse.text
 
 
+def test_bulk_load():
+    refs = [Ref("Rashi on Berakhot 2a"), Ref("Tosafot on Berakhot 2a"), Ref("Berakhot 2a"), Ref("Daniel 2:3-4:5"),
+            Ref("Rashi on Exodus 3:1-10"), Ref("Shulchan Arukh, Even HaEzer 1")]
+    chunks = TextChunk.bulk_load(refs, ("en", "he"))
+    for r in refs:
+        for lang in ("en", "he"):
+            single = TextChunk(r, lang)
+            bulk = chunks[(r, lang)]
+            assert bulk.text == single.text
+            assert bulk.is_merged == single.is_merged
+            assert bulk.sources == single.sources
+            assert [v.versionTitle for v in bulk._versions] == [v.versionTitle for v in single._versions]
+
+
 def test_default_in_family():
     r = Ref('Shulchan Arukh, Even HaEzer')
     f = TextFamily(r)
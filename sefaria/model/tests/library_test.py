@@ -4,6 +4,7 @@ import pytest
 from sefaria.model import *
 from functools import reduce
 from sefaria.constants import model as constants
+from sefaria.utils.hebrew import has_hebrew
 
 
 def setup_module(module):
@@ -374,6 +375,14 @@ class Test_get_titles_in_text(object):
         else:
             assert set(titles) == {'ויקרא', 'ספר שושנה'}
 
+    @pytest.mark.parametrize(('lang', 'citing_only'), (("en", True), ("en", False), ("he", True), ("he", False)))
+    def test_scanner_matches_regex(self, lang, citing_only):
+        strings = [v for v in texts.values() if isinstance(v, str) and (lang == "he") == has_hebrew(v)]
+        reg = library.all_titles_regex(lang, citing_only=citing_only)
+        scanner = library.title_scanner(lang, citing_only=citing_only)
+        for st in strings:
+            assert [(m.title, m.start) for m in scanner.finditer(st)] == [(m.group('title'), m.start()) for m in reg.finditer(st)]
+
 
 class Test_Library(object):
     def test_schema_validity(self):
@@ -444,6 +453,72 @@ class Test_Library(object):
         assert 'רש"י על בראשית' in library._index_title_maps["he"]["Rashi on Genesis"]
         assert 'רש"י על בראשית' in library._title_node_maps["he"]
 
+    def test_refresh_index_record_keeps_caches_consistent(self):
+        library.all_titles_regex("en")
+        library.all_titles_regex("he", citing_only=True)
+        regex = library._title_regexes["all_titles_regex_en"]
+
+        library.refresh_index_record_in_cache(library.get_index("Exodus"))
+        assert library._title_regexes["all_titles_regex_en"] is regex  # titles didn't change
+        assert library.check_index_maps_consistency() == []
+
+        library.remove_index_record_from_cache(library.get_index("Exodus"))
+        assert "all_titles_regex_en" not in library._title_regexes
+        assert "Exodus" not in library.full_title_list("en")
+        assert library.check_index_maps_consistency() != []
+
+        library.add_index_record_to_cache(Index().load({"title": "Exodus"}))
+        assert "Exodus" in library.full_title_list("en")
+        assert library.check_index_maps_consistency() == []
+
+    def test_snapshot_round_trip(self, tmp_path):
+        from sefaria.model.text import Library
+        path = str(tmp_path / "library.snapshot")
+        library.get_toc_tree()
+        saved = library.dump_snapshot(path)
+        assert "index_maps" in saved and "toc" in saved
+
+        restored = Library()
+        assert restored.load_snapshot(path)
+        assert restored.snapshot_components == set(saved)
+        assert set(restored._title_node_maps["en"]) == set(library._title_node_maps["en"])
+        node = restored.get_schema_node("Bereishit")
+        assert node.index is restored.get_index("Genesis")
+        assert restored.get_toc() == library.get_toc()
+
+        # A snapshot older than the library's last_cached is ignored
+        library.set_last_cached_time()
+        stale = Library()
+        assert not stale.load_snapshot(path)
+        assert not stale.snapshot_components
+
+    def test_auto_completer_store_round_trip(self, tmp_path):
+        from sefaria.model.text import Library
+        directory = str(tmp_path / "autocompleters")
+        library.build_cross_lexicon_auto_completer()
+        assert "cross_lexicon_auto_completer" in library.dump_auto_completer_store(directory)
+
+        restored = Library()
+        restored.last_cached = library.last_cached
+        assert "cross_lexicon_auto_completer" in restored.load_auto_completer_store(directory)
+        assert restored.cross_lexicon_auto_completer().complete("גדד", 10) == library.cross_lexicon_auto_completer().complete("גדד", 10)
+
+        # A store older than the library's last_cached isn't loaded
+        library.set_last_cached_time()
+        stale = Library()
+        stale.last_cached = library.last_cached
+        assert not stale.load_auto_completer_store(directory)
+
+    def test_title_lists_after_prepare_for_fork(self):
+        import json
+        library.prepare_for_fork()
+        for lang in library.langs:
+            titles = library.full_title_list(lang)
+            assert isinstance(titles, list)
+            assert json.loads(json.dumps(titles)) == titles
+            assert isinstance(library.citing_title_list(lang), list)
+        assert "Genesis" in library.full_title_list("en")
+
     def test_get_title_node(self):
         node = library.get_schema_node("Exodus")
         assert node.is_flat()
@@ -2,6 +2,7 @@
 import pytest
 from sefaria.model import *
 from sefaria.system.exceptions import DuplicateRecordError
+from sefaria.model.link import LinkIntervalIndex
 
 class Test_Link_Save(object):
 
@@ -133,3 +134,54 @@ class Test_Link_Save(object):
                       "type": "quotation_auto_tanakh",
                       "refs": [ref, "Ramban on Genesis 2:1"]})
             assert link._pre_save() == None
+
+
+class Test_Link_Order_Intervals(object):
+
+    @pytest.mark.parametrize(("tref", "other", "overlaps"), [
+        ("Genesis 1:5-2:3", "Genesis 2", True),
+        ("Genesis 1:5-2:3", "Genesis 2:4", False),
+        ("Genesis 1", "Genesis 1:31", True),
+        ("Genesis", "Genesis 50:26", True),
+        ("Shabbat 31a:3", "Shabbat 31a", True),
+        ("Shabbat 31a:3", "Shabbat 31b", False),
+        ("Pesach Haggadah, Magid", "Pesach Haggadah, Magid, Four Sons 2", True),
+        ("Pesach Haggadah, Magid", "Pesach Haggadah, Kadesh 1", False),
+        ("Pesach Haggadah", "Pesach Haggadah, Kadesh 1", True),
+    ])
+    def test_order_id_interval_overlap(self, tref, other, overlaps):
+        start1, end1 = Ref(tref).order_id_interval()
+        start2, end2 = Ref(other).order_id_interval()
+        assert (start1 <= end2 and start2 <= end1) == overlaps
+        assert Ref(tref).overlaps(Ref(other)) == overlaps
+
+    def test_interval_query_matches_regex_query(self):
+        for tref in ["Genesis 1:1", "Shabbat 31a", "Pesach Haggadah, Magid, Four Sons"]:
+            oref = Ref(tref)
+            regex_ids = {l._id for l in LinkSet(oref) if getattr(l, "orderIntervals", None)}
+            interval_ids = {l._id for l in LinkSet(LinkSet.interval_query(oref))}
+            assert regex_ids == interval_ids
+
+    def test_anchor_position(self):
+        link = Link({"type": "commentary", "refs": ["Genesis 1:1", "Rashi on Genesis 1:1:1"]})
+        link._set_order_intervals()
+        assert link.anchor_position(Ref("Genesis 1")) == 0
+        assert link.anchor_position(Ref("Rashi on Genesis 1:1")) == 1
+
+    def test_link_interval_index(self):
+        index = LinkIntervalIndex("Genesis", [("0001", "0001~", 1), ("00010002", "00010004~", 2), ("0002", "0003~", 3)])
+        assert sorted(index.overlapping("00010003", "00010003~")) == [1, 2]
+        assert sorted(index.overlapping("00020005", "00020005~")) == [3]
+        assert index.overlapping("0004", "0004~") == []
+
+    def test_node_order_change(self):
+        index = Index().load({"title": "Pesach Haggadah"})
+        assert not index.is_node_order_changed()
+        index.nodes.children.reverse()
+        assert index.is_node_order_changed()
+        index.reset_node_order()
+        assert not index.is_node_order_changed()
+
+    def test_refresh_order_intervals_unchanged(self):
+        from sefaria.model.link import refresh_order_intervals
+        assert refresh_order_intervals("Pesach Haggadah") == 0
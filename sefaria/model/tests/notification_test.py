@@ -0,0 +1,55 @@
+import pytest
+
+from sefaria.model import user_profile
+from sefaria.model.notification import Notification, NotificationSet
+from sefaria.system.database import db, QueryCounter
+
+# Users, sheets and collections that don't exist
+UID = 9999990
+ACTORS = [9999991, 9999992, 9999993]
+SHEET_IDS = [99999990, 99999991]
+
+
+@pytest.fixture
+def following():
+    db.following.insert_one({"follower": UID, "followee": ACTORS[0]})
+    yield
+    db.following.delete_many({"follower": UID})
+
+
+def make_notifications():
+    notifications = []
+    for i in range(10):
+        actor = ACTORS[i % len(ACTORS)]
+        notifications += [
+            Notification({"uid": UID}).make_sheet_like(liker_id=actor, sheet_id=SHEET_IDS[i % 2]),
+            Notification({"uid": UID}).make_sheet_publish(publisher_id=actor, sheet_id=SHEET_IDS[i % 2]),
+            Notification({"uid": UID}).make_follow(follower_id=actor),
+            Notification({"uid": UID}).make_collection_add(actor, "no-such-collection-{}".format(i)),
+        ]
+    return notifications
+
+
+def test_client_contents_query_count(following):
+    notifications = make_notifications()
+    user_profile.public_user_data_cache.clear()
+    QueryCounter.reset(tracked_commands={'find', 'aggregate', 'count', 'distinct'})
+    contents = NotificationSet.render_client_contents(notifications)
+    # One query each for profiles, sheets, collections and follow relationships, however many notifications
+    assert QueryCounter.count <= 4, [q["collection"] for q in QueryCounter.queries]
+
+    assert len(contents) == len(notifications)
+    for n in contents:
+        assert "name" in n["content"] and "profileUrl" in n["content"]
+        if n["type"] in ("sheet like", "sheet publish"):
+            assert n["content"]["sheet_title"] == "" and n["content"]["summary"] == ""
+        elif n["type"] == "follow":
+            assert n["content"]["is_already_following"] == (n["content"]["follower"] == ACTORS[0])
+        elif n["type"] == "collection add":
+            assert n["content"]["collection_name"] == ""
+
+
+def test_single_client_contents(following):
+    n = Notification({"uid": UID}).make_follow(follower_id=ACTORS[0])
+    assert n.client_contents() == NotificationSet.render_client_contents([n])[0]
+    assert n.client_contents()["content"]["is_already_following"]
@@ -0,0 +1,44 @@
+import pytest
+from sefaria.model import user_profile
+from sefaria.model.user_profile import PublicUserDataCache
+
+
+@pytest.fixture
+def shared(monkeypatch):
+    """A dict standing in for the shared cache"""
+    data = {}
+    monkeypatch.setattr(user_profile.scache, "get_shared_cache_elems", lambda keys: {k: data[k] for k in keys if k in data})
+    monkeypatch.setattr(user_profile.scache, "set_shared_cache_elems", lambda d, timeout=None: data.update(d))
+    monkeypatch.setattr(user_profile.scache, "delete_shared_cache_elem", lambda key: data.pop(key, None))
+    return data
+
+
+def test_lru(shared):
+    cache = PublicUserDataCache(size=2, timeout=60)
+    cache.set_many({1: {"uid": 1}, 2: {"uid": 2}})
+    assert cache.get_many([1]) == {1: {"uid": 1}}
+    cache.set_many({3: {"uid": 3}})
+    # 2 was used least recently
+    assert len(cache) == 2
+    shared.clear()
+    assert cache.get_many([1, 2, 3]) == {1: {"uid": 1}, 3: {"uid": 3}}
+
+
+def test_timeout_and_shared(shared, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(user_profile.time, "time", lambda: now[0])
+    cache = PublicUserDataCache(size=10, timeout=60)
+    cache.set_many({1: {"uid": 1}})
+    assert PublicUserDataCache.shared_key(1) in shared
+
+    # Another process finds it in the shared cache
+    other = PublicUserDataCache(size=10, timeout=60)
+    assert other.get_many([1, 2]) == {1: {"uid": 1}}
+
+    now[0] += 61
+    shared.clear()
+    assert cache.get_many([1]) == {}
+
+    cache.set_many({1: {"uid": 1}})
+    cache.delete(1)
+    assert cache.get_many([1]) == {} and not shared
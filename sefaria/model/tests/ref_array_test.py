@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+import pytest
+from sefaria.model import *
+from sefaria.model.ref_array import RefArray
+
+
+TREFS = ["Genesis 1:1", "Genesis 1:5-2:3", "Genesis 2", "Genesis 3:4", "Exodus 1:1", "Shabbat 31a:3", "Shabbat 31b:2-5"]
+
+
+@pytest.fixture(scope="module")
+def orefs():
+    return [Ref(tref) for tref in TREFS]
+
+
+@pytest.fixture(scope="module")
+def ref_array(orefs):
+    return RefArray.from_refs(orefs)
+
+
+class Test_RefArray(object):
+
+    def test_promotion(self, orefs, ref_array):
+        assert len(ref_array) == len(orefs)
+        assert list(ref_array) == orefs
+        assert ref_array[1] == Ref("Genesis 1:5-2:3")
+        assert ref_array.sections(1) == [1, 5]
+        assert ref_array.to_sections(1) == [2, 3]
+
+    def test_normals(self, orefs, ref_array):
+        assert ref_array.normals() == [r.normal() for r in orefs]
+        assert ref_array.normals("he") == [r.normal("he") for r in orefs]
+
+    def test_order_ids(self, orefs, ref_array):
+        assert ref_array.order_ids() == [r.order_id() for r in orefs]
+
+    @pytest.mark.parametrize("other", ["Genesis 1", "Genesis 1:3-2:1", "Genesis 2:10", "Genesis 3", "Shabbat 31b", "Exodus 1:1"])
+    def test_comparisons(self, orefs, ref_array, other):
+        other = Ref(other)
+        assert ref_array.overlaps(other).tolist() == [other.overlaps(r) for r in orefs]
+        assert ref_array.contained_by(other).tolist() == [other.contains(r) for r in orefs]
+        assert ref_array.precedes(other).tolist() == [r.precedes(other) for r in orefs]
+        assert ref_array.follows(other).tolist() == [r.follows(other) for r in orefs]
+
+    @pytest.mark.parametrize("other", ["Genesis 1:3", "Genesis 2:4-3:2", "Shabbat 31a:3"])
+    def test_comparisons_deeper_than_elements(self, other):
+        sections = [Ref(tref) for tref in ["Genesis 1", "Genesis 2-3", "Genesis 4", "Shabbat 31a"]]
+        ref_array = RefArray.from_refs(sections)
+        other = Ref(other)
+        assert ref_array.overlaps(other).tolist() == [other.overlaps(r) for r in sections]
+        assert ref_array.contained_by(other).tolist() == [other.contains(r) for r in sections]
+        assert ref_array.precedes(other).tolist() == [r.precedes(other) for r in sections]
+        assert ref_array.follows(other).tolist() == [r.follows(other) for r in sections]
+
+    def test_take(self, orefs, ref_array):
+        in_genesis = ref_array.take(ref_array.contained_by(Ref("Genesis")))
+        assert list(in_genesis) == orefs[:4]
+        assert ref_array.index_ids.tolist() == [0, 0, 0, 0, 1, 2, 2]
+        assert [i.title for i in ref_array.indexes()] == ["Genesis", "Exodus", "Shabbat"]
+
+    def test_from_index(self):
+        for title in ["Genesis", "Pirkei Avot", "Pesach Haggadah"]:
+            index = library.get_index(title)
+            ref_array = index.all_segment_ref_array()
+            assert ref_array.normals() == [r.normal() for r in index.all_segment_refs()]
@@ -41,3 +41,48 @@ def test_ref_cache_respects_limit(ref_cache_guard):
     cache_keys = set(Ref._raw_cache().keys())
     assert first_ref.tref not in cache_keys
     assert first_uid not in cache_keys
+
+
+@pytest.fixture
+def shared_ref_table(ref_cache_guard, tmp_path):
+    from sefaria.system.mmap_table import SharedMmapTable
+    from sefaria.model.text import library
+    table = SharedMmapTable(str(tmp_path / "ref_table"), slot_count=1024)
+    table.check_stamp(library.get_last_cached_time())
+    original = Ref._shared_table
+    Ref._shared_table = table
+    yield table
+    Ref._shared_table = original
+    table.close()
+
+
+def test_shared_ref_table_round_trip(shared_ref_table):
+    parsed = Ref("Shabbat 31a:3-5")
+    assert shared_ref_table.stats()["stores"] >= 1
+
+    Ref.clear_cache()
+    loaded = Ref("Shabbat 31a:3-5")
+    assert shared_ref_table.hits == 1
+    assert loaded is not parsed
+    assert loaded == parsed
+    assert loaded.sections == parsed.sections
+    assert loaded.toSections == parsed.toSections
+    assert loaded.index_node is parsed.index_node
+
+
+def test_shared_ref_table_complex_node(shared_ref_table):
+    parsed = Ref("Pesach Haggadah, Magid, Four Sons 2")
+    Ref.clear_cache()
+    loaded = Ref("Pesach Haggadah, Magid, Four Sons 2")
+    assert shared_ref_table.hits == 1
+    assert loaded.index_node is parsed.index_node
+    assert loaded.normal() == parsed.normal()
+
+
+def test_shared_ref_table_invalidated_with_index(shared_ref_table):
+    Ref("Genesis 1:1")
+    Ref("Exodus 1:1")
+    Ref.remove_index_from_cache("Genesis")
+    Ref.clear_cache()
+    assert shared_ref_table.get("Genesis 1:1") is None
+    assert shared_ref_table.get("Exodus 1:1") is not None
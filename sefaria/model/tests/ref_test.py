@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 import pytest
 from sefaria.model import *
+from sefaria.model.text import AnchorRefResolver
 from sefaria.system.exceptions import InputError
 
 class Test_Ref(object):
@@ -1034,3 +1035,33 @@ class Test_ref_manipulations():
         assert t.list_refs_in_range("Job 4:5-9") == ["Job 4:5","Job 4:6","Job 4:7","Job 4:8","Job 4:9"]
         assert t.list_refs_in_range("Genesis 2:3") == ["Genesis 2:3"]
 '''
+
+
+class Test_anchor_refs(object):
+
+    def test_anchor_refs_for_documents(self):
+        oref = Ref("Genesis 1")
+        segment_refs = [r.normal() for r in oref.all_segment_refs()]
+        documents = [
+            (["Genesis 1:3", "Exodus 2:1"], ["Genesis 1:3", "Exodus 2:1"]),
+            (["Genesis 1:30-2:2", "Genesis 1:1"], ["Genesis 1:30", "Genesis 1:31", "Genesis 2:1", "Genesis 2:2", "Genesis 1:1"]),
+            (["Genesis 3:1", "Not a ref"], ["Genesis 3:1"]),
+        ]
+        results = oref.get_all_anchor_refs_for_documents(segment_refs, documents)
+        assert [[r.normal() for r in anchors] for anchors, _ in results] == [["Genesis 1:3"], ["Genesis 1:30-2:2", "Genesis 1:1"], []]
+        assert [[r.normal() for r in expanded] for expanded in results[1][1]] == [["Genesis 1:30", "Genesis 1:31"], ["Genesis 1:1"]]
+        assert results[1] == oref.get_all_anchor_refs(segment_refs, *documents[1])
+
+    @pytest.mark.parametrize("tref,document_trefs", [
+        ("Genesis 1-2", ["Genesis 1", "Genesis 1:5-10", "Genesis 1:31-2:3", "Genesis 2:25-3:4", "Genesis 3", "Genesis"]),
+        ("Shabbat 2a-3a", ["Shabbat 2a:3-2b:2", "Shabbat 2b", "Shabbat 3a:1", "Shabbat 4a"]),
+        ("Pesach Haggadah, Magid", ["Pesach Haggadah, Magid, Ha Lachma Anya 1-2", "Pesach Haggadah, Magid, Ha Lachma Anya", "Pesach Haggadah, Kadesh 1"]),
+    ])
+    def test_resolver_matches_overlaps(self, tref, document_trefs):
+        oref = Ref(tref)
+        segment_refs = [r.normal() for r in oref.all_segment_refs()]
+        anchor_refs, anchor_refs_expanded = AnchorRefResolver(oref, segment_refs).resolve([(document_trefs, None)])[0]
+        expected = [Ref(t) for t in document_trefs if oref.overlaps(Ref(t))]
+        assert anchor_refs == expected
+        for anchor_ref, expanded in zip(anchor_refs, anchor_refs_expanded):
+            assert [r.normal() for r in expanded] == [t for t in segment_refs if anchor_ref.overlaps(Ref(t))]
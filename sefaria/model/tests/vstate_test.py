@@ -13,6 +13,17 @@ class Test_VState(object):
             assert getattr(vs, "title")
             assert getattr(vs, "content")
 
+    def test_refresh_changed_ref(self):
+        # Recounting only the sections of a ref gives the same state as recounting everything
+        for title, tref in [("Exodus", "Exodus 3:4-5:2"), ("Rashi on Shabbat", "Rashi on Shabbat 12a:3"), ("Pesach Haggadah", "Pesach Haggadah, Magid, Ha Lachma Anya 2")]:
+            vs = VersionState(title)
+            vs.refresh()
+            full = vs.content_node(Ref(tref).index_node)
+            full = {key: dict(value) for key, value in full.items()}
+            assert vs._refresh_node(Ref(tref))
+            partial = vs.content_node(Ref(tref).index_node)
+            assert partial == full
+
 
 class Test_VSNode(object):
     def test_section_counts(self):
@@ -1,6 +1,6 @@
 import pytest
 from sefaria.model import *
-from sefaria.model.webpage import WebPage, WebSite, get_webpages_for_ref
+from sefaria.model.webpage import WebPage, WebSite, WebPageHitBuffer, webpage_hit_buffer, get_webpages_for_ref
 from sefaria.helper.webpages import normalize_url
 from sefaria.system.cache import in_memory_cache
 from sefaria.system.exceptions import InputError
@@ -133,6 +133,48 @@ def test_add_and_update_with_same_data(create_good_web_page):
 	assert result == "excluded"
 
 
+def test_hits_are_buffered(create_good_web_page):
+	data = create_good_web_page["data"]
+	webpage_hit_buffer.flush()
+	linker_hits = WebPage().load(data["url"]).linkerHits
+	# Pings with no new data don't count as hits
+	for _ in range(3):
+		assert WebPage().add_or_update_from_linker(data)[0] == "excluded"
+	assert len(webpage_hit_buffer) == 0
+	for _ in range(2):
+		webpage_hit_buffer.add(data["url"])
+	assert WebPage().load(data["url"]).linkerHits == linker_hits
+	assert webpage_hit_buffer.flush() == 1
+	assert WebPage().load(data["url"]).linkerHits == linker_hits + 2
+
+
+def test_hit_buffer_flushes_when_full():
+	buffer = WebPageHitBuffer(flush_interval=3600, max_urls=2)
+	buffer.add("http://notarealsite.org/no-such-page-1")
+	assert len(buffer) == 1
+	buffer.add("http://notarealsite.org/no-such-page-2")
+	assert len(buffer) == 0
+	# Pages that don't exist aren't made by their hits
+	assert WebPage().load("http://notarealsite.org/no-such-page-1") is None
+
+
+def test_hit_buffer_keeps_hits_that_fail(monkeypatch):
+	from types import SimpleNamespace
+	from pymongo.errors import AutoReconnect
+	from sefaria.model import webpage
+	buffer = WebPageHitBuffer(flush_interval=3600)
+	buffer.add("http://notarealsite.org/no-such-page-1")
+	buffer.add("http://notarealsite.org/no-such-page-1")
+
+	def fail(*args, **kwargs):
+		raise AutoReconnect("connection closed")
+	monkeypatch.setattr(webpage, "db", SimpleNamespace(webpages=SimpleNamespace(bulk_write=fail)))
+	assert buffer.flush() == 0
+	assert len(buffer) == 1
+	monkeypatch.undo()
+	assert buffer.flush() == 1
+
+
 def test_update_blank_title_from_linker(create_good_web_page):
 	result, webpage, data = create_good_web_page["result"], create_good_web_page["webpage"], create_good_web_page["data"]
 	print(webpage.contents())
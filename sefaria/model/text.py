@@ -10,10 +10,14 @@ from sefaria.system.progress_context import report_progress
 from functools import reduce, partial
 from typing import Optional, Union
 
-from remote_config.keys import REF_CACHE_LIMIT_KEY
+from remote_config.keys import REF_CACHE_LIMIT_KEY, TITLE_SCANNER_KEY
 logger = structlog.get_logger(__name__)
 
+import os
 import sys
+import pickle
+import struct
+import shutil
 import regex
 import copy
 import bleach
@@ -36,7 +40,8 @@ skip_bad_record = bad_record_guard(logger)
 from sefaria.utils.hebrew import has_hebrew, is_all_hebrew, hebrew_term
 from sefaria.utils.util import list_depth, truncate_string
 from sefaria.datatype.jagged_array import JaggedTextArray, JaggedArray
-from sefaria.settings import DISABLE_INDEX_SAVE, USE_VARNISH, MULTISERVER_ENABLED, DISABLE_AUTOCOMPLETER
+from sefaria.utils.title_scanner import TitleScanner
+from sefaria.settings import DISABLE_INDEX_SAVE, USE_VARNISH, MULTISERVER_ENABLED, DISABLE_AUTOCOMPLETER, SHARED_REF_CACHE_PATH, SHARED_REF_CACHE_SLOTS
 from sefaria.system.multiserver.coordinator import server_coordinator
 from sefaria.constants import model as constants
 from sefaria.helper.normalization import NormalizerFactory
@@ -115,6 +120,14 @@ class AbstractIndex(object):
             seg_refs += sec_ref.all_subrefs()
         return seg_refs
 
+    def all_segment_ref_array(self):
+        """
+        Same refs as `all_segment_refs()`, as a compact :class:`sefaria.model.ref_array.RefArray`.
+        Use for whole-library jobs that don't need a :class:`Ref` object for every segment.
+        """
+        from .ref_array import RefArray
+        return RefArray.from_index(self)
+
     def all_top_section_refs(self):
         """Returns a list of refs one step below root"""
         section_refs = self.all_section_refs()
@@ -246,6 +259,27 @@ class Index(abst.AbstractMongoRecord, AbstractIndex):
         else:
             self.nodes = None
         self._set_struct_objs()
+        if not self.is_new() and not hasattr(self, "_node_order_orig"):
+            self._node_order_orig = self.node_order()
+
+    def node_order(self):
+        """
+        :return: tuple of the addresses of the nodes below the root, in the order that `get_child_order()` numbers them.
+        Stored order intervals of refs to this Index (see `Ref.order_id_interval()`) are only valid as long as it's unchanged.
+        """
+        if not getattr(self, "nodes", None) or not self.nodes.has_children():
+            return ()
+        return tuple(tuple(node.address()) for node in self.nodes.all_children())
+
+    def is_node_order_changed(self):
+        """
+        :return: True if the nodes have been added, removed, moved or reshaped since this Index was loaded, or since
+        `reset_node_order()`
+        """
+        return hasattr(self, "_node_order_orig") and self._node_order_orig != self.node_order()
+
+    def reset_node_order(self):
+        self._node_order_orig = self.node_order()
 
     def _set_struct_objs(self):
         self.struct_objs = {}
@@ -1633,13 +1667,21 @@ class VersionSet(abst.AbstractMongoSet):
                 logger.error("No version title for Version: {}".format(vars(v)))
         if node is None:
             return merge_texts([getattr(v, "chapter", []) for v in self], [getattr(v, "versionTitle", None) for v in self])
-        versions = self.array()
-        if prioritized_vtitle:
-            vindex = next((i for (i, v) in enumerate(versions) if v.versionTitle == prioritized_vtitle), None)
-            if vindex is not None:
-                # move versions[vindex] to front of list
-                versions.insert(0, versions.pop(vindex))
-        return merge_texts([v.content_node(node) for v in versions], [getattr(v, "versionTitle", None) for v in versions])
+        return merge_version_contents(self.array(), node, prioritized_vtitle)
+
+
+def merge_version_contents(versions, node, prioritized_vtitle=None):
+    """
+    Merges the content of `versions` at `node`.  See :meth:`VersionSet.merge`
+    :param versions: list of :class:`Version`, in priority order.  Reordered in place if `prioritized_vtitle` is given.
+    :param prioritized_vtitle: optional vtitle which should have top priority, even if it generally has lower priority
+    """
+    if prioritized_vtitle:
+        vindex = next((i for (i, v) in enumerate(versions) if v.versionTitle == prioritized_vtitle), None)
+        if vindex is not None:
+            # move versions[vindex] to front of list
+            versions.insert(0, versions.pop(vindex))
+    return merge_texts([v.content_node(node) for v in versions], [getattr(v, "versionTitle", None) for v in versions])
 
 
 # used in VersionSet.merge(), merge_text_versions(), and export.export_merged()
@@ -1791,11 +1833,12 @@ class TextChunk(AbstractTextRecord, metaclass=TextFamilyDelegator):
     :param lang: "he" or "en". "he" means all rtl languages and "en" means all ltr languages
     :param vtitle: optional. Title of the version desired.
     :param actual_lang: optional. if vtitle isn't specified, prefer to find a version with ISO language `actual_lang`. As opposed to `lang` which can only be "he" or "en", `actual_lang` can be any valid 2 letter ISO language code.
+    :param versions: optional. Versions in `lang` already loaded with `oref.part_projection()` that have content at `oref`, in priority order.  Saves the database lookup.  See `bulk_load()`
     """
 
     text_attr = "text"
 
-    def __init__(self, oref, lang="en", vtitle=None, exclude_copyrighted=False, actual_lang=None, fallback_on_default_version=False):
+    def __init__(self, oref, lang="en", vtitle=None, exclude_copyrighted=False, actual_lang=None, fallback_on_default_version=False, versions=None):
         """
         :param oref:
         :type oref: Ref
@@ -1837,22 +1880,26 @@ class TextChunk(AbstractTextRecord, metaclass=TextFamilyDelegator):
                     raise MissingKeyError(f'The version {vtitle} exists but has no key for the node {self._oref.index_node}')
         elif lang:
             if actual_lang is not None:
-                self._choose_version_by_lang(oref, lang, exclude_copyrighted, actual_lang, prioritized_vtitle=vtitle)
+                self._choose_version_by_lang(oref, lang, exclude_copyrighted, actual_lang, prioritized_vtitle=vtitle, versions=versions)
             else:
-                self._choose_version_by_lang(oref, lang, exclude_copyrighted, prioritized_vtitle=vtitle)
+                self._choose_version_by_lang(oref, lang, exclude_copyrighted, prioritized_vtitle=vtitle, versions=versions)
         else:
             raise Exception("TextChunk requires a language.")
 
-    def _choose_version_by_lang(self, oref, lang: str, exclude_copyrighted: bool, actual_lang: str = None, prioritized_vtitle: str = None) -> None:
+    def _choose_version_by_lang(self, oref, lang: str, exclude_copyrighted: bool, actual_lang: str = None, prioritized_vtitle: str = None, versions: list = None) -> None:
         if prioritized_vtitle:
             actual_lang = None
-        vset = VersionSet(self._oref.condition_query(lang, actual_lang), proj=self._oref.part_projection())
-        if len(vset) == 0:
-            if VersionSet({"title": self._oref.index.title}).count() == 0:
-                raise NoVersionFoundError("No text record found for '{}'".format(self._oref.index.title))
+        if versions is None:
+            vset = VersionSet(self._oref.condition_query(lang, actual_lang), proj=self._oref.part_projection())
+            if len(vset) == 0:
+                if VersionSet({"title": self._oref.index.title}).count() == 0:
+                    raise NoVersionFoundError("No text record found for '{}'".format(self._oref.index.title))
+                return
+            versions = vset.array()
+        if len(versions) == 0:
             return
-        if len(vset) == 1:
-            v = vset[0]
+        if len(versions) == 1:
+            v = versions[0]
             if exclude_copyrighted and v.is_copyrighted():
                 raise InputError("Can not provision copyrighted text. {} ({}/{})".format(oref.normal(), v.versionTitle, v.language))
             self._versions += [v]
@@ -1860,18 +1907,90 @@ class TextChunk(AbstractTextRecord, metaclass=TextFamilyDelegator):
             #todo: Should this instance, and the non-merge below, be made saveable?
         else:  # multiple versions available, merge
             if exclude_copyrighted:
-                vset.remove(Version.is_copyrighted)
-            merged_text, sources = vset.merge(self._oref.index_node, prioritized_vtitle=prioritized_vtitle)  #todo: For commentaries, this merges the whole chapter.  It may show up as merged, even if our part is not merged.
+                versions = [v for v in versions if not v.is_copyrighted()]
+            merged_text, sources = merge_version_contents(versions, self._oref.index_node, prioritized_vtitle=prioritized_vtitle)  #todo: For commentaries, this merges the whole chapter.  It may show up as merged, even if our part is not merged.
             self.text = self.trim_text(merged_text)
             if len(set(sources)) == 1:
-                for v in vset:
+                for v in versions:
                     if v.versionTitle == sources[0]:
                         self._versions += [v]
                         break
             else:
                 self.sources = sources
                 self.is_merged = True
-                self._versions = vset.array()
+                self._versions = versions
+
+    @classmethod
+    def bulk_load(cls, refs, langs=("en", "he")):
+        """
+        Equivalent to calling `TextChunk(oref, lang)` for every ref and language, with far fewer database queries.
+        Refs that share a projection (e.g. the same daf in every commentary on a tractate) are fetched with a
+        single query across all of their books and languages.
+
+        :param refs: list of :class:`Ref`
+        :param langs: "he" and/or "en"
+        :return: dict of (Ref, lang) to TextChunk.  Refs to books that have no versions at all are left out.
+        """
+        chunks = {}
+        groups = {}
+        for oref in refs:
+            if oref.index_node.is_virtual:
+                for lang in langs:
+                    chunks[(oref, lang)] = cls(oref, lang)
+                continue
+            chunk_ref = oref if isinstance(oref.index_node, JaggedArrayNode) else oref.default_child_ref()
+            if chunk_ref == oref and not isinstance(oref.index_node, JaggedArrayNode):
+                raise InputError("Can not get TextChunk at this level, please provide a more precise reference")
+            projection = chunk_ref.part_projection()
+            group = groups.setdefault(json.dumps(projection, sort_keys=True), {"projection": projection, "refs": []})
+            group["refs"].append((oref, chunk_ref))
+
+        for group in groups.values():
+            titles = list({chunk_ref.index.title for _, chunk_ref in group["refs"]})
+            query = {"title": {"$in": titles}, "language": {"$in": list(langs)}}
+            versions_by_title = defaultdict(list)
+            for v in VersionSet(query, proj=group["projection"]):
+                versions_by_title[(v.title, v.language)].append(v)
+
+            loaded_titles = {title for title, _ in versions_by_title}
+            missing = [title for title in titles if title not in loaded_titles]
+            existing = set(VersionSet({"title": {"$in": missing}}).distinct("title")) if missing else set()
+
+            for oref, chunk_ref in group["refs"]:
+                title = chunk_ref.index.title
+                if title not in loaded_titles and title not in existing:
+                    continue
+                for lang in langs:
+                    versions = [v for v in versions_by_title[(title, lang)] if cls._has_content_at(chunk_ref, v)]
+                    chunks[(oref, lang)] = cls(oref, lang, versions=versions)
+        return chunks
+
+    @staticmethod
+    def _has_content_at(oref, version):
+        """
+        Does `version`, loaded with `oref.part_projection()`, have content at `oref`?
+        Mirrors the condition in `oref.condition_query()`, within the projected sections.
+        """
+        try:
+            content = version.content_node(oref.index_node)
+        except (KeyError, TypeError):
+            return False
+        if oref.is_spanning():
+            return any(TextChunk._has_content_at_path(r, content, oref.sections[0]) for r in oref.split_spanning_ref())
+        return TextChunk._has_content_at_path(oref, content, oref.sections[0] if oref.sections else 1)
+
+    @staticmethod
+    def _has_content_at_path(oref, content, first_section):
+        empty = ("", [], 0)
+        depth = len(oref.sections) - 1 if oref.is_range() else len(oref.sections)
+        path = [oref.sections[0] - first_section] + [s - 1 for s in oref.sections[1:depth]] if depth else []
+        for i in path:
+            if not isinstance(content, list) or i >= len(content):
+                return False
+            content = content[i]
+        if depth == len(oref.sections) == oref.index_node.depth:
+            return content not in empty
+        return isinstance(content, list) and any(x not in empty for x in content)
 
     def __str__(self):
         args = "{}, {}".format(self._oref, self.lang)
@@ -2463,6 +2582,10 @@ class TextFamily(object):
             oref = oref.context_ref()
         self._context_oref = oref
 
+        # Languages with no requested version or language preference can be loaded together
+        default_langs = [language for language in self.text_attr_map if language not in {lang, lang2} and not (language == 'en' and translationLanguagePreference)]
+        preloaded = TextChunk.bulk_load([oref], default_langs) if len(default_langs) > 1 and not oref.index_node.is_virtual else {}
+
         # processes "en" and "he" TextChunks, and puts the text in self.text and self.he, respectively.
         for language, attr in list(self.text_attr_map.items()):
             tc_kwargs = dict(oref=oref, lang=language, fallback_on_default_version=fallbackOnDefaultVersion)
@@ -2477,6 +2600,8 @@ class TextFamily(object):
                         c = TextChunk(vtitle=curr_version, **tc_kwargs)
                     elif curr_version:
                         self._nonExistantVersions[language] = curr_version
+            elif (oref, language) in preloaded:
+                c = preloaded[(oref, language)]
             else:
                 c = TextChunk(**tc_kwargs)
             self._chunks[language] = c
@@ -2621,6 +2746,11 @@ class RefCacheType(type):
     Metaclass for Ref class.
     Caches all Ref instances according to the string they were instantiated with and their normal form.
     Returns cached instance on instantiation if either instantiation string or normal form are matched.
+
+    Behind the per-process cache, if settings.SHARED_REF_CACHE_PATH is set, parsed refs are also stored in a
+    host-wide memory-mapped table (see sefaria.system.mmap_table), so that a process can skip the regex parse
+    of a tref that another process has already parsed.  The table stores the index title, node address, sections
+    and toSections of each ref, is keyed to `library.last_cached`, and is invalidated per index along with this cache.
     """
 
     def __init__(cls, name, parents, dct):
@@ -2628,6 +2758,8 @@ class RefCacheType(type):
         cls.__tref_oref_map = OrderedDict()
         cls.__index_tref_map = {}
         cls._tref_oref_cache_limit = remoteConfigCache.get(REF_CACHE_LIMIT_KEY, 60000)
+        cls._shared_table = None
+        cls._shared_table_failed = False
 
     def _touch_cache_key(cls, key):
         try:
@@ -2665,19 +2797,104 @@ class RefCacheType(type):
 
     def remove_index_from_cache(cls, index_title):
         """
-        Removes all refs to Index with title `index_title` from the Ref cache
+        Removes all refs to Index with title `index_title` from the Ref cache, and from the shared ref table
         :param cls:
         :param index_title:
         :return:
         """
+        for tref in cls.__index_tref_map.pop(index_title, []):
+            try:
+                del cls.__tref_oref_map[tref]
+            except KeyError:
+                continue
+
+        table = cls._get_shared_table()
+        if table:
+            table.invalidate_group(index_title)
+
+    def _get_shared_table(cls):
+        """
+        :return: The host-wide SharedMmapTable of parsed refs, or None if it is disabled or can't be opened
+        """
+        if cls._shared_table is None and SHARED_REF_CACHE_PATH and not cls._shared_table_failed:
+            from sefaria.system.mmap_table import SharedMmapTable
+            try:
+                cls._shared_table = SharedMmapTable(SHARED_REF_CACHE_PATH, slot_count=SHARED_REF_CACHE_SLOTS)
+            except OSError as e:
+                logger.warning("Failed to open shared ref table", path=SHARED_REF_CACHE_PATH, error=str(e))
+                cls._shared_table_failed = True
+        return cls._shared_table
+
+    def _usable_shared_table(cls):
+        table = cls._get_shared_table()
+        if table and table.check_stamp(library.get_last_cached_time()):
+            return table
+        return None
+
+    def shared_cache_stats(cls, with_occupancy=False):
+        """
+        :return dict: hit/miss/eviction counters of the shared ref table, or None if it is disabled.
+        """
+        table = cls._get_shared_table()
+        return table.stats(with_occupancy=with_occupancy) if table else None
+
+    def _load_from_shared_table(cls, tref):
+        """
+        Build a Ref for `tref` from its entry in the shared ref table, without parsing `tref`.
+        :return: Ref, or None if there is no usable entry
+        """
+        table = cls._usable_shared_table()
+        if not table:
+            return None
+        value = table.get(tref)
+        if value is None:
+            return None
         try:
-            for tref in cls.__index_tref_map[index_title]:
-                try:
-                    del cls.__tref_oref_map[tref]
-                except KeyError:
-                    continue
-        except KeyError:
-            pass
+            d = json.loads(value)
+            index = library.get_index(d["i"])
+            node = index.nodes
+            if d["a"][0] != node.key:
+                return None
+            for key in d["a"][1:]:
+                node = node.get_child_by_key(key)
+                if node is None:
+                    return None
+            result = super(RefCacheType, cls).__call__(_obj={
+                "index": index,
+                "book": node.full_title("en"),
+                "primary_category": index.get_primary_category(),
+                "index_node": node,
+                "sections": d["s"],
+                "toSections": d["t"],
+            })
+        except (ValueError, KeyError, IndexError, AttributeError, InputError):
+            # Entry written by a process with a different view of the library.  Parse from scratch.
+            return None
+        result.orig_tref = tref
+        result.tref = d["r"]
+        result._lang = d["l"]
+        return result
+
+    def _store_in_shared_table(cls, tref, oref):
+        table = cls._usable_shared_table()
+        if not table:
+            return
+        node = oref.index_node
+        if node.is_virtual or oref.is_sheet():
+            return
+        address = node.address()
+        root = oref.index.nodes
+        if address[0] != root.key or reduce(lambda n, key: n.get_child_by_key(key) if n else None, address[1:], root) is not node:
+            return
+        value = json.dumps({
+            "i": oref.index.title,
+            "a": address,
+            "s": oref.sections,
+            "t": oref.toSections,
+            "r": oref.tref,
+            "l": oref._lang,
+        }, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        table.set(tref, value, group=oref.index.title)
 
     def __call__(cls, *args, **kwargs):
         if len(args) == 1:
@@ -2693,7 +2910,10 @@ class RefCacheType(type):
                 cls._touch_cache_key(tref)
                 return result
             else:
-                result = super(RefCacheType, cls).__call__(*args, **kwargs)
+                result = cls._load_from_shared_table(tref)
+                if result is None:
+                    result = super(RefCacheType, cls).__call__(*args, **kwargs)
+                    cls._store_in_shared_table(tref, result)
                 uid = result.uid()
                 title = result.index.title
                 if uid in cls.__tref_oref_map:
@@ -3662,7 +3882,7 @@ class Ref(object, metaclass=RefCacheType):
             r = r.prev_section_ref(vstate=vstate)
             if not r:
                 return None
-            last_index = r.get_subrefs_count(self.get_state_ja(vstate=vstate))
+            last_index = self._section_length(r, vstate=vstate)
             d = r._core_dict()
             d["sections"] = d["toSections"] = r.sections + [last_index]
             return Ref(_obj=d)
@@ -3680,7 +3900,7 @@ class Ref(object, metaclass=RefCacheType):
         if not r.is_segment_level():
             return r
         section_ref = r.section_ref()
-        section_length = section_ref.get_subrefs_count(self.get_state_ja(vstate=vstate))
+        section_length = self._section_length(section_ref, vstate=vstate)
         if r.sections[-1] < section_length:
             d = r._core_dict()
             d["sections"] = d["toSections"] = r.sections[:-1] + [r.sections[-1] + 1]
@@ -3734,9 +3954,9 @@ class Ref(object, metaclass=RefCacheType):
         if r.is_book_level():
             # r is depth 1. return first segment
             r = r.subref([1])
-            return r.next_segment_ref(vstate=vstate) if r.is_empty(vstate=vstate) else r
+            return r.next_segment_ref(vstate=vstate) if r._is_empty_section(vstate=vstate) else r
         else:
-            return r.next_section_ref(vstate=vstate) if r.is_empty(vstate=vstate) else r
+            return r.next_section_ref(vstate=vstate) if r._is_empty_section(vstate=vstate) else r
 
     #Don't store results on Ref cache - state objects change, and don't yet propogate to this Cache
     def get_state_node(self, meta=None, hint=None):
@@ -3746,6 +3966,35 @@ class Ref(object, metaclass=RefCacheType):
         from . import version_state
         return version_state.StateNode(snode=self.index_node, meta=meta, hint=hint)
 
+    def get_navigation_table(self, lang="all", vstate=None):
+        """
+        :param lang: "all", "he", or "en"
+        :param vstate: optional pre-fetched VersionState, to build the table from if it isn't cached
+        :return: :class:`sefaria.datatype.navigation_table.NavigationTable` of the available sections of this Ref's node,
+        or None for nodes without one (e.g. virtual nodes), which are navigated with :meth:`get_state_ja`
+        """
+        from . import version_state
+        return version_state.get_navigation_table(self.index_node, lang, vstate)
+
+    def _section_length(self, section_ref, vstate=None):
+        """
+        :return: Number of segments in `section_ref`, a section of this Ref's node
+        """
+        table = self.get_navigation_table(vstate=vstate)
+        length = table.section_length([s - 1 for s in section_ref.sections]) if table is not None else None
+        if length is None:
+            return section_ref.get_subrefs_count(self.get_state_ja(vstate=vstate))
+        return length
+
+    def _is_empty_section(self, vstate=None):
+        """
+        Like :meth:`is_empty`, from the navigation table where this Ref is a section, or a segment of a depth 1 text.
+        """
+        table = self.get_navigation_table(vstate=vstate)
+        if table is not None and len(self.sections) == max(self.index_node.depth - 1, 1) and not self.is_range():
+            return [s - 1 for s in self.sections] not in table
+        return self.is_empty(vstate=vstate)
+
     def get_state_ja(self, lang="all", vstate=None):
         """
         :param lang: "all", "he", or "en"
@@ -3828,7 +4077,18 @@ class Ref(object, metaclass=RefCacheType):
         if len(starting_points) > 0:
             starting_points[-1] += 1 if forward else -1
 
-        # let the counts obj calculate the correct place to go.
+        # where there's a navigation table of available sections, look the section up in it
+        table = self.get_navigation_table(vstate=vstate) if depth_up == min(self.index_node.depth - 1, 1) else None
+        if table is not None:
+            section = table.next_section(starting_points) if forward else table.prev_section(starting_points)
+            if section is None:
+                return None
+            d = self._core_dict()
+            # Above a depth 1 text's segments is the whole text
+            d["toSections"] = d["sections"] = [(s + 1) for s in section] if depth_up else []
+            return Ref(_obj=d)
+
+        # otherwise let the counts obj calculate the correct place to go.
         if vstate:
             c = vstate.state_node(self.index_node).ja("all", "availableTexts")
         else:
@@ -4489,6 +4749,41 @@ class Ref(object, metaclass=RefCacheType):
             logger.warning("Failed to execute order_id for {} : {}".format(self, e))
             return "Z"
 
+    def order_id_interval(self):
+        """
+        Returns the span of this Ref within its Index as a pair of strings ``(start, end)``, such that two Refs in the same Index
+        overlap if and only if ``start1 <= end2 and start2 <= end1``.
+
+        The strings are built like the part of :meth:`order_id` that follows the category prefix - the position of the node in the
+        schema, followed by the zero-padded sections.  The category prefix is left out so that stored intervals don't change
+        when the ToC is reordered; compare intervals only along with the Index title.
+        The end string is terminated with "~", which sorts after every digit, so that it covers everything below the ending address.
+
+        ::
+
+            >>> Ref("Genesis 1:5-2:3").order_id_interval()
+            ('00010005', '00020003~')
+
+        :return tuple: (start, end), or None for nodes that can't be placed (e.g. dictionary entries)
+        """
+        if self.index_node.is_virtual:
+            return None
+        prefix = ""
+        suffix = ""
+        if self.index.is_complex() and self.index_node.parent:
+            child_order = self.index.nodes.get_child_order(self.index_node)
+            if not isinstance(child_order, int):
+                return None
+            prefix = format(child_order, '03')
+            # A node above the leaves covers its descendants, which follow it in pre-order
+            suffix = format(child_order + len(self.index_node.all_children()), '03') if self.index_node.children else prefix
+        elif self.index_node.children:
+            # Root of a complex book
+            suffix = format(len(self.index_node.all_children()), '03')
+        start = reduce(lambda x, y: x + str(format(y, '04')), self.sections, prefix)
+        end = reduce(lambda x, y: x + str(format(y, '04')), self.toSections, suffix)
+        return start, end + "~"
+
     """ Methods for working with Versions and VersionSets """
     def storage_address(self, format="string"):
         """
@@ -4852,28 +5147,16 @@ class Ref(object, metaclass=RefCacheType):
         :param list(Ref): document_tref_expanded. unique list of trefs that results from running Ref.expand_refs(document_tref_list)
         Returns tuple(list(Ref), list(list(Ref))). returns two lists. First are the anchor_refs for self. The second is a 2D list, where the inner list represents the expanded anchor refs for the corresponding position in anchor_ref_list
         """
+        return self.get_all_anchor_refs_for_documents(expanded_self, [(document_tref_list, document_tref_expanded)])[0]
 
-        # narrow down search space to avoid excissive Ref instantiation
-        unique_anchor_ref_expanded_set = set(expanded_self) & set(document_tref_expanded)
-        document_tref_list = [tref for tref in document_tref_list if tref.startswith(self.index.title)]
-
-        unique_anchor_ref_expanded_list = []
-        for tref in unique_anchor_ref_expanded_set:
-            try:
-                oref = Ref(tref)
-                unique_anchor_ref_expanded_list += [oref]
-            except InputError:
-                continue
-        document_oref_list = []
-        for tref in document_tref_list:
-            try:
-                oref = Ref(tref)
-                document_oref_list += [oref]
-            except InputError:
-                continue
-        anchor_ref_list = list(filter(lambda document_ref: self.overlaps(document_ref), document_oref_list))
-        anchor_ref_expanded_list = [list(filter(lambda document_segment_ref: anchor_ref.overlaps(document_segment_ref), unique_anchor_ref_expanded_list)) for anchor_ref in anchor_ref_list]
-        return anchor_ref_list, anchor_ref_expanded_list
+    def get_all_anchor_refs_for_documents(self, expanded_self, documents):
+        """
+        get_all_anchor_refs() for many documents at once, e.g. all the sheets that include self.  See AnchorRefResolver.
+        :param list(str): expanded_self. precalculated list of segment trefs for self
+        :param documents: list of (document_tref_list, document_tref_expanded) pairs, as passed to get_all_anchor_refs()
+        Returns list of (anchor_ref_list, anchor_ref_expanded_list), one for each document. Expanded anchor refs are in the order of expanded_self.
+        """
+        return AnchorRefResolver(self, expanded_self).resolve(documents)
 
     @staticmethod
     def expand_refs(refs):
@@ -4928,6 +5211,103 @@ class Ref(object, metaclass=RefCacheType):
                 return matched_ref
 
 
+class AnchorRefResolver(object):
+    """
+    Finds the anchor refs of documents - sheets, webpages - on a Ref: the refs of each document that overlap the Ref,
+    and the segments of the Ref that each of them covers.
+    Segments and anchor refs are compared as intervals from :meth:`Ref.order_id_interval`.  The segments are in order,
+    so the segments covered by all the distinct anchor refs of all the documents are found in one sweep over them,
+    rather than by comparing every anchor ref with every segment.  Refs without an interval, as in virtual nodes, are
+    compared with :meth:`Ref.overlaps`.
+    Each distinct tref is instantiated only once.
+    """
+
+    def __init__(self, oref, expanded_self):
+        """
+        :param Ref oref: the Ref the documents are anchored on
+        :param list(str) expanded_self: segment trefs of `oref`, in order
+        """
+        self.oref = oref
+        self._refs = {}
+        self._anchors = {}  # document tref -> its Ref if it overlaps `oref`, else None
+        self._segments = []  # (tref, Ref, interval) of each segment of `oref`
+        for tref in dict.fromkeys(expanded_self):
+            segment_ref = self._get_ref(tref)
+            if segment_ref is not None:
+                self._segments.append((tref, segment_ref, segment_ref.order_id_interval()))
+        intervals = [interval for _, _, interval in self._segments]
+        # The sweep relies on the segments' intervals following one another, as segments in order do
+        self._sweepable = all(intervals) and all(a[1] < b[0] for a, b in zip(intervals, intervals[1:]))
+
+    def _get_ref(self, tref):
+        if tref not in self._refs:
+            try:
+                self._refs[tref] = Ref(tref)
+            except InputError:
+                self._refs[tref] = None
+        return self._refs[tref]
+
+    def anchor_ref(self, tref):
+        """
+        :return Ref: `tref` if it overlaps the Ref, else None
+        """
+        if tref not in self._anchors:
+            # narrow down search space to avoid excissive Ref instantiation
+            document_ref = self._get_ref(tref) if tref.startswith(self.oref.index.title) else None
+            self._anchors[tref] = document_ref if document_ref is not None and self.oref.overlaps(document_ref) else None
+        return self._anchors[tref]
+
+    def resolve(self, documents):
+        """
+        :param documents: list of (document_tref_list, document_tref_expanded) pairs.  `document_tref_expanded`, the
+        segment trefs of the document's refs, limits the segments its anchor refs are expanded to.  It may be None.
+        :return: list of (anchor_ref_list, anchor_ref_expanded_list), one for each document, as returned by
+        :meth:`Ref.get_all_anchor_refs`.  Expanded anchor refs are in the order of the segments.
+        """
+        anchor_trefs = {tref for document_tref_list, _ in documents for tref in document_tref_list if self.anchor_ref(tref) is not None}
+        covered = self._covered_segments(anchor_trefs)
+        results = []
+        for document_tref_list, document_tref_expanded in documents:
+            document_segments = None if document_tref_expanded is None else set(document_tref_expanded)
+            anchor_ref_list, anchor_ref_expanded_list = [], []
+            for tref in document_tref_list:
+                anchor_ref = self._anchors.get(tref)
+                if anchor_ref is None:
+                    continue
+                anchor_ref_list.append(anchor_ref)
+                anchor_ref_expanded_list.append([segment_ref for segment_tref, segment_ref in covered[tref]
+                                                 if document_segments is None or segment_tref in document_segments])
+            results.append((anchor_ref_list, anchor_ref_expanded_list))
+        return results
+
+    def _covered_segments(self, anchor_trefs):
+        """
+        :return dict: anchor tref -> list of (tref, Ref) of the segments it overlaps, in order
+        """
+        covered = {}
+        intervals = []
+        for tref in anchor_trefs:
+            interval = self._anchors[tref].order_id_interval() if self._sweepable else None
+            if interval is None:
+                covered[tref] = [(segment_tref, segment_ref) for segment_tref, segment_ref, _ in self._segments
+                                 if self._anchors[tref].overlaps(segment_ref)]
+            else:
+                intervals.append((interval, tref))
+
+        intervals.sort()
+        first = 0
+        for (start, end), tref in intervals:
+            # Anchors come in order of their starts, so a segment that ends before this one starts is before all the rest
+            while first < len(self._segments) and self._segments[first][2][1] < start:
+                first += 1
+            covered[tref] = []
+            i = first
+            while i < len(self._segments) and self._segments[i][2][0] <= end:
+                covered[tref].append(self._segments[i][:2])
+                i += 1
+        return covered
+
+
 class Library(object):
     """
     Operates as a singleton, through the instance called ``library``.
@@ -4974,6 +5354,8 @@ class Library(object):
         # Title regex strings & objects, keys are strings generated from a combination of arguments to `all_titles_regex` and `all_titles_regex_string`
         self._title_regex_strings = {}
         self._title_regexes = {}
+        # Title scanners, keyed like `_title_regexes`.  See `title_scanner()`
+        self._title_scanners = {}
 
         # Maps, keyed by language, from term names to text refs
         self._term_ref_maps = {lang: {} for lang in self.langs}
@@ -5011,6 +5393,11 @@ class Library(object):
         # Virtual books
         self._virtual_books = []
 
+        # Components loaded by `load_snapshot()`
+        self.snapshot_components = set()
+        # Autocompleters memory mapped by `load_auto_completer_store()`
+        self.mapped_components = set()
+
         # Initialization Checks
         # These values are set to True once their initialization is complete
         self._toc_tree_is_ready = False
@@ -5057,6 +5444,7 @@ class Library(object):
         self._full_title_list_jsons = {}
         self._title_regex_strings = {}
         self._title_regexes = {}
+        self._title_scanners = {}
         # TOC is handled separately since it can be edited in place
 
     def rebuild(self, include_toc = False, include_auto_complete=False):
@@ -5068,6 +5456,7 @@ class Library(object):
         self.reset_text_titles_cache()
         self._title_regex_strings = {}
         self._title_regexes = {}
+        self._title_scanners = {}
         Ref.clear_cache()
         in_memory_cache.reset_all()
         if include_toc:
@@ -5123,6 +5512,179 @@ class Library(object):
         if rebuild:
             scache.delete_shared_cache_elem("regenerating")
 
+    # Derived structures saved by `dump_snapshot()`, by component.
+    # All components are pickled together, so objects shared between them (e.g. Index records) stay shared.
+    SNAPSHOT_COMPONENTS = {
+        "index_maps": ["_index_map", "_index_title_maps", "_title_node_maps"],
+        "title_lists": ["_full_title_lists", "_full_title_list_jsons", "_title_regex_strings"],
+        "terms": ["_term_ref_maps", "_simple_term_mapping", "_full_term_mapping", "_simple_term_mapping_json"],
+        "toc": ["_toc", "_toc_with_authors", "_toc_json", "_toc_tree", "_toc_tree_is_ready", "_category_id_dict", "_virtual_books"],
+        "topics": ["_topic_toc", "_topic_toc_json", "_topic_toc_category_mapping", "_topic_mapping"],
+        "full_auto_completer": ["_full_auto_completer", "_full_auto_completer_is_ready"],
+        "lexicon_auto_completer": ["_lexicon_auto_completer", "_lexicon_auto_completer_is_ready"],
+        "cross_lexicon_auto_completer": ["_cross_lexicon_auto_completer", "_cross_lexicon_auto_completer_is_ready"],
+    }
+    SNAPSHOT_MAGIC = b"SFLIBSNP"
+    # Bump when the pickled classes change in a way that old snapshots can't be loaded into
+    SNAPSHOT_VERSION = 1
+    # magic, version, last_cached
+    SNAPSHOT_HEADER = struct.Struct("<8sId")
+
+    def dump_snapshot(self, path):
+        """
+        Saves the derived structures listed in `SNAPSHOT_COMPONENTS` to `path`, keyed to `last_cached`, so that other
+        processes can `load_snapshot()` them instead of building them from the database.
+        Linkers aren't included.  They are built from a spaCy model on disk, not from the database.
+        Components that haven't been built, or can't be pickled, are left out, as are autocompleters mapped from
+        the autocompleter store.
+        :return: list of the names of the saved components
+        """
+        components = {}
+        for name, attrs in self.SNAPSHOT_COMPONENTS.items():
+            if name in self.mapped_components:
+                # Already shared between processes through the autocompleter store
+                continue
+            values = {attr: getattr(self, attr) for attr in attrs}
+            if any(values.values()):
+                components[name] = values
+        try:
+            payload = pickle.dumps(components, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            for name in list(components):
+                try:
+                    pickle.dumps(components[name], protocol=pickle.HIGHEST_PROTOCOL)
+                except Exception as e:
+                    logger.warning("Leaving {} out of the library snapshot: {}".format(name, e))
+                    del components[name]
+            payload = pickle.dumps(components, protocol=pickle.HIGHEST_PROTOCOL)
+
+        tmp_path = "{}.{}.tmp".format(path, os.getpid())
+        with open(tmp_path, "wb") as f:
+            f.write(self.SNAPSHOT_HEADER.pack(self.SNAPSHOT_MAGIC, self.SNAPSHOT_VERSION, self.get_last_cached_time()))
+            f.write(payload)
+        os.replace(tmp_path, path)  # atomic, so readers never see a partial snapshot
+        logger.info("Wrote library snapshot", path=path, components=list(components), size=len(payload))
+        return list(components)
+
+    def load_snapshot(self, path):
+        """
+        Loads the structures saved by `dump_snapshot()`, if the snapshot is as recent as `last_cached`.
+        Otherwise, leaves the library as it is, to be built as usual.
+        :return bool: True if the snapshot was loaded
+        """
+        try:
+            with open(path, "rb") as f:
+                header = f.read(self.SNAPSHOT_HEADER.size)
+                if len(header) < self.SNAPSHOT_HEADER.size:
+                    return False
+                magic, version, stamp = self.SNAPSHOT_HEADER.unpack(header)
+                if magic != self.SNAPSHOT_MAGIC or version != self.SNAPSHOT_VERSION:
+                    logger.info("Ignoring library snapshot of another format", path=path, version=version)
+                    return False
+                if stamp != self.get_last_cached_time():
+                    logger.info("Ignoring stale library snapshot", path=path, stamp=stamp, last_cached=self.last_cached)
+                    return False
+                components = pickle.load(f)
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning("Failed to load library snapshot {}: {}".format(path, e))
+            return False
+
+        for name, values in components.items():
+            for attr, value in values.items():
+                setattr(self, attr, value)
+        self.snapshot_components = set(components)
+        Ref.clear_cache()
+        logger.info("Loaded library snapshot", path=path, components=list(components))
+        return True
+
+    # Bump when the files written by the autospell `save_mapped()` methods change
+    AUTO_COMPLETER_STORE_VERSION = 1
+
+    def _auto_completer_store_dir(self, directory):
+        # One subdirectory per last_cached, so that a store is only rebuilt when the titles have changed
+        return os.path.join(directory, "v{}-{:.6f}".format(self.AUTO_COMPLETER_STORE_VERSION, self.get_last_cached_time()))
+
+    def dump_auto_completer_store(self, directory):
+        """
+        Writes the autocompleters that have been built to `directory` as memory mappable tries, keyed to
+        `last_cached`, for `load_auto_completer_store()`.  Stores of older libraries are removed.
+        :return: list of the names of the saved components
+        """
+        from .autospell import MappedTrie
+        target = self._auto_completer_store_dir(directory)
+        tmp_path = "{}.{}.tmp".format(target, os.getpid())
+        components = []
+        if self._full_auto_completer_is_ready:
+            for lang, ac in self._full_auto_completer.items():
+                ac.save_mapped(os.path.join(tmp_path, "full_auto_completer", lang))
+            components.append("full_auto_completer")
+        if self._lexicon_auto_completer_is_ready:
+            lexicon_dir = os.path.join(tmp_path, "lexicon_auto_completer")
+            os.makedirs(lexicon_dir)
+            names = list(self._lexicon_auto_completer)
+            for i, name in enumerate(names):
+                MappedTrie.save(os.path.join(lexicon_dir, "{}.marisa".format(i)), self._lexicon_auto_completer[name].items())
+            with open(os.path.join(lexicon_dir, "names.json"), "w") as f:
+                json.dump(names, f)
+            components.append("lexicon_auto_completer")
+        if self._cross_lexicon_auto_completer_is_ready:
+            self._cross_lexicon_auto_completer.save_mapped(os.path.join(tmp_path, "cross_lexicon_auto_completer"))
+            components.append("cross_lexicon_auto_completer")
+        if not components:
+            return []
+
+        try:
+            os.rename(tmp_path, target)  # atomic, so readers never see a partial store
+        except OSError:
+            # Another process wrote the same store first
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if path != target and not name.endswith(".tmp"):
+                # Processes still mapping these files keep their pages until they unmap them
+                shutil.rmtree(path, ignore_errors=True)
+        logger.info("Wrote autocompleter store", path=target, components=components)
+        return components
+
+    def load_auto_completer_store(self, directory):
+        """
+        Memory maps the autocompleters written by `dump_auto_completer_store()`, if the store is as recent as
+        `last_cached`.  The mapped pages are shared by all processes that load the store.
+        :return: set of the names of the loaded components
+        """
+        from .autospell import AutoCompleter, MappedTrie
+        target = self._auto_completer_store_dir(directory)
+        if not os.path.isdir(target):
+            return set()
+        components = set()
+        try:
+            full_dir = os.path.join(target, "full_auto_completer")
+            if os.path.isdir(full_dir):
+                self._full_auto_completer = {lang: AutoCompleter.load_mapped(os.path.join(full_dir, lang), library) for lang in os.listdir(full_dir)}
+                for lang, ac in self._full_auto_completer.items():
+                    ac.set_other_lang_ac(self._full_auto_completer.get("he" if lang == "en" else "en"))
+                self._full_auto_completer_is_ready = True
+                components.add("full_auto_completer")
+            lexicon_dir = os.path.join(target, "lexicon_auto_completer")
+            if os.path.isdir(lexicon_dir):
+                with open(os.path.join(lexicon_dir, "names.json")) as f:
+                    names = json.load(f)
+                self._lexicon_auto_completer = {name: MappedTrie(os.path.join(lexicon_dir, "{}.marisa".format(i))) for i, name in enumerate(names)}
+                self._lexicon_auto_completer_is_ready = True
+                components.add("lexicon_auto_completer")
+            cross_dir = os.path.join(target, "cross_lexicon_auto_completer")
+            if os.path.isdir(cross_dir):
+                self._cross_lexicon_auto_completer = AutoCompleter.load_mapped(cross_dir, library)
+                self._cross_lexicon_auto_completer_is_ready = True
+                components.add("cross_lexicon_auto_completer")
+        except Exception as e:
+            logger.warning("Failed to load autocompleter store {}: {}".format(target, e))
+        self.mapped_components = components
+        logger.info("Loaded autocompleter store", path=target, components=list(components))
+        return components
+
     def get_last_cached_time(self):
         if not self.last_cached:
             self.last_cached = scache.get_shared_cache_elem("last_cached")
@@ -5453,12 +6015,12 @@ class Library(object):
             logger.warning("Built full {} auto completer.".format(lang))
             return self._full_auto_completer[lang]
 
-    def recount_index_in_toc(self, indx, skip_toc_refresh=False):
+    def recount_index_in_toc(self, indx, skip_toc_refresh=False, changed_ref=None):
         # This is used in the case of a remotely triggered multiserver update
         if isinstance(indx, str):
             indx = Index().load({"title": indx})
 
-        self.get_toc_tree().update_title(indx, recount=True)
+        self.get_toc_tree().update_title(indx, recount=True, changed_ref=changed_ref)
 
         if not skip_toc_refresh:
             # `rebuild_toc(skip_toc_tree=True)` re-serializes the full ToC and rebuilds
@@ -5536,8 +6098,8 @@ class Library(object):
         Update library title dictionaries and caches with information from provided index.
         Index can be passed with primary title in `index_title` or as an object in `index_object`
         :param index_object: Index record
-        :param rebuild: Perform a rebuild of derivative objects afterwards?  False only in cases of batch update.
-        :return:
+        :param rebuild: Update derivative objects afterwards?  False only in cases of batch update.
+        :return: dict of lang to list of the titles that were added
         """
         assert index_object, "Library.add_index_record_to_cache called without index"
 
@@ -5546,29 +6108,34 @@ class Library(object):
             index_object = Index().load({"title": index_object})
 
         self._index_map[index_object.title] = index_object
+        added_titles = {}
         try:
             for lang in self.langs:
                 title_dict = index_object.nodes.title_dict(lang)
                 self._index_title_maps[lang][index_object.title] = list(title_dict.keys())
                 self._title_node_maps[lang].update(title_dict)
+                added_titles[lang] = list(title_dict.keys())
         except IndexSchemaError as e:
             logger.error("Error in generating title node dictionary: {}".format(e))
 
         if rebuild:
-            self._reset_index_derivative_objects()
+            self._update_index_derivative_objects({}, added_titles, is_cited=getattr(index_object, "is_cited", False))
+        return added_titles
 
     def remove_index_record_from_cache(self, index_object=None, old_title=None, rebuild = True):
         """
         Update provided index from library title dictionaries and caches
         :param index_object: In the local case - the index object to remove.  In the remote case, the name of the index object to remove.
         :param old_title: In the case of a title change - the old title of the Index record
-        :param rebuild: Perform a rebuild of derivative objects afterwards?
-        :return:
+        :param rebuild: Update derivative objects afterwards?
+        :return: dict of lang to list of the titles that were removed
         """
 
         index_object_title = old_title if old_title else (index_object.title if isinstance(index_object, Index) else index_object)
         Ref.remove_index_from_cache(index_object_title)
+        old_index = self._index_map.get(index_object_title)
 
+        removed_titles = {}
         for lang in self.langs:
             simple_titles = self._index_title_maps[lang].get(index_object_title)
             if simple_titles:
@@ -5582,25 +6149,137 @@ class Library(object):
                     except KeyError:
                         pass
                 del self._index_title_maps[lang][index_object_title]
+                removed_titles[lang] = simple_titles
             else:
                 logger.warning("Failed to remove '{}' from {} index-title and title-node cache: nothing to remove".format(index_object_title, lang))
-                return
+                return removed_titles
 
         if rebuild:
-            self._reset_index_derivative_objects()
+            self._update_index_derivative_objects(removed_titles, {}, was_cited=getattr(old_index, "is_cited", False))
+        return removed_titles
 
     def refresh_index_record_in_cache(self, index_object, old_title = None):
         """
-        Update library title dictionaries and caches for provided index
+        Update library title dictionaries and caches for provided index.
+        Only the entries of this index are replaced, and lists and regexes of titles are only touched if its titles changed.
+        `check_index_maps_consistency()` compares the result with a full rebuild.
         :param index_object: In the local case - the index object to remove.  In the remote case, the name of the index object to remove.
         :param old_title: In the case of a title change - the old title of the Index record
         :return:
         """
         index_object_title = index_object.title if isinstance(index_object, Index) else index_object
-        self.remove_index_record_from_cache(index_object, old_title=old_title, rebuild=False)
+        old_index = self._index_map.get(old_title or index_object_title)
+        removed_titles = self.remove_index_record_from_cache(index_object, old_title=old_title, rebuild=False)
         new_index = Index().load({"title": index_object_title})
         assert new_index, "No Index record found for {}: {}".format(index_object.__class__.__name__, index_object_title)
-        self.add_index_record_to_cache(new_index, rebuild=True)
+        added_titles = self.add_index_record_to_cache(new_index, rebuild=False)
+        self._update_index_derivative_objects(removed_titles, added_titles,
+                                              was_cited=getattr(old_index, "is_cited", False),
+                                              is_cited=getattr(new_index, "is_cited", False))
+
+    def _update_index_derivative_objects(self, removed_titles, added_titles, was_cited=False, is_cited=False):
+        """
+        Patches the title lists derived from the index maps after the titles of one index were removed and/or added.
+        Title regexes can't be patched, so those of a language are dropped (and lazily rebuilt) only if its titles changed.
+        :param removed_titles: dict of lang to list of titles
+        :param added_titles: dict of lang to list of titles
+        :param was_cited: did the removed titles belong to an index with `is_cited` set
+        :param is_cited: do the added titles belong to an index with `is_cited` set
+        """
+        for lang in self.langs:
+            removed = removed_titles.get(lang, [])
+            added = added_titles.get(lang, [])
+            if set(removed) != set(added):
+                self._patch_title_list(lang, removed, added)
+                # Terms share this list, and a term's title may equal a removed book title
+                term_titles = self._term_ref_maps.get(lang, {})
+                self._patch_title_list(lang + "_terms", [t for t in removed if t not in term_titles], added)
+                self._full_title_list_jsons.pop(lang, None)
+                for key in (lang, lang + "_terms"):
+                    self._title_regex_strings.pop(key, None)
+                for key in ("all_titles_regex_" + lang, "all_titles_regex_" + lang + "_terms"):
+                    self._title_regexes.pop(key, None)
+                    self._title_scanners.pop(key, None)
+
+            cited_removed = removed if was_cited else []
+            cited_added = added if is_cited else []
+            if set(cited_removed) != set(cited_added):
+                self._patch_title_list("citing-" + lang, cited_removed, cited_added)
+                self._title_regex_strings.pop(lang + "_citations", None)
+                self._title_regexes.pop("citing_titles_regex_" + lang, None)
+                self._title_scanners.pop("citing_titles_regex_" + lang, None)
+
+    def _patch_title_list(self, key, removed, added):
+        titles = self._full_title_lists.get(key)
+        if titles is None:
+            return
+        removed = set(removed)
+        patched = [t for t in titles if t not in removed]
+        present = set(patched)
+        patched += [t for t in added if t not in present]
+        self._full_title_lists[key] = patched
+
+    def check_index_maps_consistency(self):
+        """
+        Compares the index and title maps, and the title lists and regexes derived from them, which are patched in place
+        as indexes change, with maps built from scratch.  Hits the database for every index, so use in tests and scripts.
+        :return: list of str describing each difference.  Empty if the state is consistent with a full rebuild.
+        """
+        fresh = Library.__new__(Library)
+        fresh.langs = self.langs
+        fresh._build_index_maps()
+        diffs = []
+
+        fresh_titles = set(fresh._index_map.keys())
+        current_titles = {i.title for i in self._index_map.values()}
+        for title in sorted(fresh_titles - current_titles):
+            diffs.append("_index_map: missing index '{}'".format(title))
+        for title in sorted(current_titles - fresh_titles):
+            diffs.append("_index_map: index '{}' should have been removed".format(title))
+        for key, indx in self._index_map.items():
+            if key != indx.title and not any(self._title_node_maps[lang].get(key) is not None and self._title_node_maps[lang][key].index.title == indx.title for lang in self.langs):
+                diffs.append("_index_map: '{}' is not a title of '{}'".format(key, indx.title))
+        for title in sorted(fresh_titles & current_titles):
+            if title not in self._index_map:
+                diffs.append("_index_map: index '{}' is not keyed by its title".format(title))
+            elif self._index_map[title].contents(raw=True) != fresh._index_map[title].contents(raw=True):
+                diffs.append("_index_map: index '{}' is stale".format(title))
+
+        for lang in self.langs:
+            current, expected = self._index_title_maps[lang], fresh._index_title_maps[lang]
+            for key in sorted(set(current) ^ set(expected)):
+                diffs.append("_index_title_maps[{}]: key '{}' {}".format(lang, key, "missing" if key in expected else "should have been removed"))
+            for key in sorted(set(current) & set(expected)):
+                if set(current[key]) != set(expected[key]):
+                    diffs.append("_index_title_maps[{}]: titles of '{}' differ".format(lang, key))
+
+            current, expected = self._title_node_maps[lang], fresh._title_node_maps[lang]
+            for title in sorted(set(current) ^ set(expected)):
+                diffs.append("_title_node_maps[{}]: title '{}' {}".format(lang, title, "missing" if title in expected else "should have been removed"))
+            for title in sorted(set(current) & set(expected)):
+                if (current[title].index.title, current[title].address()) != (expected[title].index.title, expected[title].address()):
+                    diffs.append("_title_node_maps[{}]: title '{}' points to the wrong node".format(lang, title))
+
+            cited = IndexSet({"is_cited": True}).distinct("title")
+            expected_lists = {
+                lang: set(expected),
+                lang + "_terms": set(expected) | set(self._term_ref_maps.get(lang, {})),
+                "citing-" + lang: {t for title in cited for t in fresh._index_title_maps[lang].get(title, [])},
+            }
+            for key, titles in expected_lists.items():
+                if key in self._full_title_lists and set(self._full_title_lists[key]) != titles:
+                    diffs.append("_full_title_lists: '{}' differs".format(key))
+            string_keys = {lang: lang, lang + "_terms": lang + "_terms", "citing-" + lang: lang + "_citations"}
+            regex_keys = {lang: "all_titles_regex_" + lang, lang + "_terms": "all_titles_regex_" + lang + "_terms", "citing-" + lang: "citing_titles_regex_" + lang}
+            for key, titles in expected_lists.items():
+                expected_string = self._titles_regex_string(titles)
+                re_string = self._title_regex_strings.get(string_keys[key])
+                if re_string is not None and re_string != expected_string:
+                    diffs.append("_title_regex_strings: '{}' differs".format(string_keys[key]))
+                reg = self._title_regexes.get(regex_keys[key])
+                if reg is not None and reg.pattern != expected_string:
+                    diffs.append("_title_regexes: '{}' differs".format(regex_keys[key]))
+        return diffs
 
     # todo: the for_js path here does not appear to be in use.
     # todo: Rename, as method not gauraunteed to return all titles
@@ -5619,24 +6298,29 @@ class Library(object):
             key += "_terms"
         re_string = self._title_regex_strings.get(key)
         if not re_string:
-            re_string = ""
             if citing_only:
-                simple_books = list(map(re.escape, self.citing_title_list(lang)))
+                re_string = self._titles_regex_string(self.citing_title_list(lang))
             else:
-                simple_books = list(map(re.escape, self.full_title_list(lang, with_terms=with_terms)))
-            simple_book_part = r'|'.join(sorted(simple_books, key=len, reverse=True))  # Match longer titles first
-
-            # re_string += ur'(?:^|[ ([{>,-]+)' if for_js else u''  # Why don't we check for word boundaries internally as well?
-            # re_string += ur'(?:\u05d5?(?:\u05d1|\u05de|\u05dc|\u05e9|\u05d8|\u05d8\u05e9)?)' if for_js and lang == "he" else u'' # likewise leading characters in Hebrew?
-            # re_string += ur'(' if for_js else
-            re_string = r'(?P<title>'
-            re_string += simple_book_part
-            re_string += r')'
-            re_string += r'($|[:., <]+)'
+                re_string = self._titles_regex_string(self.full_title_list(lang, with_terms=with_terms))
             self._title_regex_strings[key] = re_string
 
         return re_string
 
+    @staticmethod
+    def _titles_regex_string(titles):
+        # Match longer titles first.  Ties are broken alphabetically, so the result doesn't depend on the order of `titles`.
+        simple_books = sorted(map(re.escape, titles), key=lambda t: (-len(t), t))
+        simple_book_part = r'|'.join(simple_books)
+
+        # re_string += ur'(?:^|[ ([{>,-]+)' if for_js else u''  # Why don't we check for word boundaries internally as well?
+        # re_string += ur'(?:\u05d5?(?:\u05d1|\u05de|\u05dc|\u05e9|\u05d8|\u05d8\u05e9)?)' if for_js and lang == "he" else u'' # likewise leading characters in Hebrew?
+        # re_string += ur'(' if for_js else
+        re_string = r'(?P<title>'
+        re_string += simple_book_part
+        re_string += r')'
+        re_string += r'($|[:., <]+)'
+        return re_string
+
     #WARNING: Do NOT put the compiled re2 object into redis.  It gets corrupted.
     def all_titles_regex(self, lang="en", with_terms=False, citing_only=False):
         """
@@ -5663,6 +6347,34 @@ class Library(object):
             self._title_regexes[key] = reg
         return reg
 
+    def title_scanner(self, lang="en", with_terms=False, citing_only=False):
+        """
+        :return: :class:`TitleScanner` over the same titles as `all_titles_regex()` with these arguments, finding the same matches in one pass over a string
+        """
+        if citing_only:
+            key = "citing_titles_regex_" + lang
+        else:
+            key = "all_titles_regex_" + lang
+            key += "_terms" if with_terms else ""
+        scanner = self._title_scanners.get(key)
+        if scanner is None:
+            titles = self.citing_title_list(lang) if citing_only else self.full_title_list(lang, with_terms=with_terms)
+            scanner = TitleScanner(titles)
+            self._title_scanners[key] = scanner
+        return scanner
+
+    def _title_matches_in_string(self, st, lang, citing_only=False):
+        """
+        Finds known titles in `st`, with `title_scanner()` when the `TITLE_SCANNER_KEY` remote config flag is on, otherwise with `all_titles_regex()`
+        :return: generator of (title, start position)
+        """
+        if remoteConfigCache.get(TITLE_SCANNER_KEY, False):
+            for match in self.title_scanner(lang, citing_only=citing_only).finditer(st):
+                yield match.title, match.start
+        else:
+            for match in self.all_titles_regex(lang, citing_only=citing_only).finditer(st):
+                yield match.group('title'), match.start()
+
     def ref_list(self):
         """
         :return: list of all section-level Refs in the library
@@ -6042,7 +6754,7 @@ class Library(object):
         """
         if not lang:
             lang = "he" if has_hebrew(s) else "en"
-        return [m.group('title') for m in self.all_titles_regex(lang, citing_only=citing_only).finditer(s)]
+        return [title for title, _ in self._title_matches_in_string(s, lang, citing_only)]
 
     def get_refs_in_string(self, st, lang=None, citing_only=False):
         """
@@ -6073,12 +6785,11 @@ class Library(object):
                     logger.info("Error finding ref for {} in: {}".format(title, st))
 
         else:  # lang == "en"
-            for match in self.all_titles_regex(lang, citing_only=citing_only).finditer(st):
-                title = match.group('title')
+            for title, start in self._title_matches_in_string(st, lang, citing_only):
                 if not title:
                     continue
                 try:
-                    res = self._build_ref_from_string(title, st[match.start():])  # Slice string from title start
+                    res = self._build_ref_from_string(title, st[start:])  # Slice string from title start
                     refs += res
                 except AssertionError as e:
                     logger.info("Skipping Schema Node: {}".format(title))
@@ -6430,6 +7141,23 @@ class Library(object):
                 ins = library.get_indexes_in_category(ref_or_cat)
             return sum([Ref(r).word_count(lang) for r in ins])
 
+    def prepare_for_fork(self):
+        """
+        Builds the structures that are otherwise built lazily on first use, so that pre-forked workers share them with
+        the parent instead of each building their own.
+        See `reader.startup.init_library_cache_before_fork()`
+        """
+        self.get_toc_tree()
+        self.category_id_dict()
+        for lang in self.langs:
+            self.full_title_list(lang)
+            self.citing_title_list(lang)
+            self.all_titles_regex(lang)
+            self.all_titles_regex(lang, citing_only=True)
+            if remoteConfigCache.get(TITLE_SCANNER_KEY, False):
+                self.title_scanner(lang)
+                self.title_scanner(lang, citing_only=True)
+
     def is_initialized(self):
         """
         Returns True if the following fields are initialized
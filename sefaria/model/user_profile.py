@@ -40,6 +40,8 @@ def sanitize_bio(bio):
 import sys
 import json
 import csv
+import time
+from collections import OrderedDict
 from datetime import datetime
 from django.utils.translation import gettext as _, ngettext_lazy
 from random import randint
@@ -62,7 +64,9 @@ from sefaria.model.following import FollowersSet, FolloweesSet, general_follow_r
 from sefaria.model.blocking import BlockersSet, BlockeesSet
 from sefaria.model.text import Ref, TextChunk
 from sefaria.system.database import db
+from sefaria.system import cache as scache
 from sefaria.utils.util import epoch_time
+from sefaria.settings import PUBLIC_USER_DATA_CACHE_SIZE, PUBLIC_USER_DATA_CACHE_TIMEOUT
 from django.utils import translation
 
 import structlog
@@ -553,6 +557,7 @@ class UserProfile(object):
             self.delete_user_history()
             self._process_remove_history = False
 
+        public_user_data_cache.delete(self.id)
         return self
 
     def errors(self):
@@ -854,29 +859,118 @@ def email_unread_notifications(timeframe):
             translation.deactivate()
 
 
-public_user_data_cache = {}
+class PublicUserDataCache(object):
+    """
+    Public data of users by uid, as returned by public_user_data().
+    Kept in a per-process LRU of at most `size` users, whose entries expire after `timeout` seconds, in front of the
+    shared cache, where entries expire after the same time.
+    """
+    def __init__(self, size, timeout):
+        self.size = size
+        self.timeout = timeout
+        self._data = OrderedDict()  # uid -> (expiry time, data)
+
+    @staticmethod
+    def shared_key(uid):
+        return "public_user_data:{}".format(uid)
+
+    def __len__(self):
+        return len(self._data)
+
+    def get_many(self, uids):
+        """
+        :return: {uid: data} of the `uids` in the cache
+        """
+        now = time.time()
+        found = {}
+        for uid in uids:
+            entry = self._data.get(uid)
+            if entry is not None and entry[0] > now:
+                self._data.move_to_end(uid)
+                found[uid] = entry[1]
+        missing = {self.shared_key(uid): uid for uid in uids if uid not in found}
+        if missing:
+            shared = scache.get_shared_cache_elems(list(missing))
+            for key, data in shared.items():
+                found[missing[key]] = data
+            self._set_local({missing[key]: data for key, data in shared.items()})
+        return found
+
+    def set_many(self, data_by_uid):
+        self._set_local(data_by_uid)
+        scache.set_shared_cache_elems({self.shared_key(uid): data for uid, data in data_by_uid.items()}, timeout=self.timeout)
+
+    def _set_local(self, data_by_uid):
+        expires = time.time() + self.timeout
+        for uid, data in data_by_uid.items():
+            self._data[uid] = (expires, data)
+            self._data.move_to_end(uid)
+        while len(self._data) > self.size:
+            self._data.popitem(last=False)
+
+    def delete(self, uid):
+        self._data.pop(uid, None)
+        scache.delete_shared_cache_elem(self.shared_key(uid))
+
+    def clear(self):
+        """
+        Clears this process's entries.  The shared ones expire on their own.
+        """
+        self._data.clear()
+
+
+public_user_data_cache = PublicUserDataCache(PUBLIC_USER_DATA_CACHE_SIZE, PUBLIC_USER_DATA_CACHE_TIMEOUT)
+
+
 def public_user_data(uid, ignore_cache=False):
     """Returns a dictionary with common public data for `uid`"""
-    if uid in public_user_data_cache and not ignore_cache:
-        return public_user_data_cache[uid]
+    return public_user_data_bulk([uid], ignore_cache=ignore_cache)[uid]
 
-    profile = UserProfile(id=uid)
-    try:
-        user = User.objects.get(id=uid)
-        is_staff = user.is_staff()
-    except:
-        is_staff = False
-
-    data = {
-        "name": profile.full_name,
-        "profileUrl": "/profile/" + profile.slug,
-        "imageUrl": profile.profile_pic_url_small,
-        "position": profile.position,
-        "organization": profile.organization,
-        "isStaff": is_staff,
-        "uid": uid
-    }
-    public_user_data_cache[uid] = data
+
+def public_user_data_bulk(uids, ignore_cache=False):
+    """
+    Returns {uid: public_user_data(uid)} for each of `uids`.
+    Users who aren't cached are loaded together, with one query for their profiles and one for their Django users.
+    """
+    uids = list(dict.fromkeys(uids))
+    found = {} if ignore_cache else public_user_data_cache.get_many(uids)
+    missing = [uid for uid in uids if uid not in found]
+    if missing:
+        loaded = _load_public_user_data(missing)
+        public_user_data_cache.set_many(loaded)
+        found.update(loaded)
+    return {uid: found[uid] for uid in uids}
+
+
+def _load_public_user_data(uids):
+    """
+    :return: {uid: public data} for `uids`, read from the database
+    """
+    int_uids = {}
+    for uid in uids:
+        try:
+            int_uids[uid] = int(uid)
+        except (TypeError, ValueError):
+            pass
+    users = {u.id: u for u in User.objects.filter(id__in=list(int_uids.values())).only("id", "first_name", "last_name", "is_staff")}
+    profiles = {p["id"]: p for p in db.profiles.find({"id": {"$in": uids}}, {"id": 1, "slug": 1, "profile_pic_url_small": 1, "position": 1, "organization": 1})}
+
+    data = {}
+    for uid in uids:
+        user, profile = users.get(int_uids.get(uid)), profiles.get(uid)
+        if user is not None and profile is None:
+            # UserProfile() creates the missing profile
+            profile = UserProfile(id=uid).to_mongo_dict()
+        profile = profile or {}
+        data[uid] = {
+            "name": "{} {}".format(user.first_name, user.last_name) if user is not None else "User {}".format(uid),
+            "profileUrl": "/profile/" + profile.get("slug", ""),
+            "imageUrl": profile.get("profile_pic_url_small", ""),
+            "position": profile.get("position", ""),
+            "organization": profile.get("organization", ""),
+            "isStaff": bool(user.is_staff) if user is not None else False,
+            "uid": uid
+        }
     return data
 
 
@@ -916,11 +1010,12 @@ def annotate_user_list(uids):
     Returns a list of dictionaries giving details (names, profile links)
     for the user ids list in uids.
     """
+    user_data = public_user_data_bulk(uids)
     annotated_list = []
     for uid in uids:
-        data = public_user_data(uid)
+        data = user_data[uid]
         annotated = {
-            "userLink": user_link(uid),
+            "userLink": "<a href='" + data["profileUrl"] + "' class='userLink'>" + data["name"] + "</a>",
             "imageUrl": data["imageUrl"]
         }
         annotated_list.append(annotated)
@@ -2,8 +2,11 @@
 version_state.py
 Writes to MongoDB Collection:
 """
+import multiprocessing
+import time
 import structlog
 from functools import reduce
+from pymongo.errors import OperationFailure
 
 
 logger = structlog.get_logger(__name__)
@@ -12,9 +15,12 @@ from . import abstract as abst
 from . import text
 from . import link
 from .text import VersionSet, AbstractIndex, AbstractSchemaContent, IndexSet, library, Ref
-from sefaria.datatype.jagged_array import JaggedTextArray, JaggedIntArray
+from sefaria.datatype.jagged_array import JaggedIntArray
+from sefaria.datatype.navigation_table import NavigationTable
+from sefaria.datatype.numpy_jagged_array import NumpyJaggedIntArray
 from sefaria.system.exceptions import InputError, BookNameError
-from sefaria.system.cache import delete_template_cache
+from sefaria.system.cache import delete_template_cache, get_shared_cache_elem, set_shared_cache_elem, delete_shared_cache_elem
+from sefaria.system.database import db
 try:
     from sefaria.settings import USE_VARNISH
 except ImportError:
@@ -147,20 +153,45 @@ class VersionState(abst.AbstractMongoRecord, AbstractSchemaContent):
         d["toSections"] = d["sections"] = [(s + 1) for s in new_section[:-depth_up]]
         return Ref(_obj=d)
 
-    def refresh(self):
+    def refresh(self, changed_ref=None):
+        """
+        :param changed_ref: Ref of text that was just saved.  If given, only the state of its node is recomputed, and
+        only from the sections it spans when it can be.  See _refresh_node().
+        """
         if self.is_new_state:  # refresh done on init
             return
-        self.content = self.index.nodes.visit_content(self._content_node_visitor, self.content)
+        if changed_ref is None or not self._refresh_node(changed_ref):
+            self.content = self.index.nodes.visit_content(self._content_node_visitor, self.content)
         self.index.nodes.visit_structure(self._aggregate_structure_state, self)
         self.linksCount = link.LinkSet(Ref(self.index.title)).count()
         fsr = self._first_section_ref()
         self.first_section_ref = fsr.normal() if fsr else None
         self.save()
+        set_shared_cache_elem(navigation_tables_key(self.index.title), self.navigation_tables())
 
         if USE_VARNISH:
             from sefaria.system.varnish.wrapper import invalidate_counts
             invalidate_counts(self.index)
 
+    def navigation_tables(self):
+        """
+        :return: {version address of each content node, as a tuple: {"all"|"he"|"en": NavigationTable}}
+        Built from the "availableTexts" of each language.  Nodes without a state, e.g. virtual nodes, are left out.
+        """
+        tables = {}
+        for snode in self.index.nodes.get_leaf_nodes():
+            if getattr(snode, "is_virtual", False) or not getattr(snode, "depth", None):
+                continue
+            try:
+                current = self.content_node(snode)
+                tables[tuple(snode.version_address())] = {
+                    lang: NavigationTable.from_array(current[lkey]["availableTexts"], snode.depth)
+                    for lang, lkey in StateNode.lang_map.items()
+                }
+            except (KeyError, TypeError):
+                continue
+        return tables
+
     def get_flag(self, flag):
         return self.flags.get(flag, False) # consider all flags False until set True
         
@@ -194,6 +225,69 @@ class VersionState(abst.AbstractMongoRecord, AbstractSchemaContent):
                 'percentAvailableInvalid': any([contents[ckey][lkey]["percentAvailableInvalid"] for ckey in ckeys]),
             }
 
+    def _refresh_node(self, oref):
+        """
+        Recomputes the state of the content node of `oref`, reading just that node of each version.
+        If the node has sections and their number hasn't changed, only the sections `oref` spans are read and counted,
+        and the counts of the other sections are kept.
+        :return: False if the state has to be refreshed in full instead
+        """
+        snode = oref.index_node
+        if getattr(snode, "is_virtual", False) or not getattr(snode, "depth", None):
+            return False
+        try:
+            current = self.content_node(snode)
+        except (KeyError, TypeError):
+            return False
+        if not isinstance(current, dict) or any(not isinstance(current.get(key), dict) for key in self.lang_keys + ["_all"]):
+            return False
+
+        sections = None
+        if snode.depth > 1 and oref.sections:
+            sections = (oref.sections[0] - 1, oref.toSections[0])
+        try:
+            length, contents = self._node_contents(snode, sections)
+            if sections and length != len(current["_all"]["availableTexts"]):
+                sections = None
+                length, contents = self._node_contents(snode)
+        except OperationFailure:
+            return False
+
+        ja = {}
+        for lang, lkey in self.lang_map.items():
+            counts = NumpyJaggedIntArray.mask_sum(contents[lang])
+            if sections:
+                # Stored counts are padded to the shape of "_all", which doesn't change the derived state
+                start, end = sections
+                stored = list(current[lkey]["availableTexts"])
+                stored[start:end] = counts.array() + [[]] * (end - start - len(counts.array()))
+                counts = NumpyJaggedIntArray(stored[:length])
+            ja[lkey] = counts
+        self._set_node_state(snode, current, ja)
+        return True
+
+    def _node_contents(self, snode, sections=None):
+        """
+        Reads the content of `snode` in each version, with an aggregation so that the rest of the versions isn't loaded.
+        :param sections: (start, end) - only read top-level sections start to end - 1
+        :return: (the greatest number of top-level sections in any version, {lang: list of contents})
+        """
+        path = "$" + ".".join(["chapter"] + snode.version_address())
+        node_content = {"$ifNull": [path, []]}
+        if sections:
+            start, end = sections
+            node_content = {"$slice": [node_content, start, end - start]}
+        pipeline = [
+            {"$match": {"title": self.index.title, "language": {"$in": self.langs}}},
+            {"$project": {"language": 1, "length": {"$size": {"$ifNull": [path, []]}}, "content": node_content}},
+        ]
+        length = 0
+        contents = {lang: [] for lang in self.langs}
+        for record in getattr(db, text.Version.collection).aggregate(pipeline):
+            length = max(length, record["length"])
+            contents[record["language"]].append(record["content"])
+        return length, contents
+
     #todo: do we want to use an object here?
     def _content_node_visitor(self, snode, *contents, **kwargs):
         """
@@ -204,17 +298,22 @@ class VersionState(abst.AbstractMongoRecord, AbstractSchemaContent):
         """
         assert len(contents) == 1
         current = contents[0]  # some information is manually set - don't wipe and re-create it.   todo: just copy flags?
+        # Get base counts for each language
+        ja = {lkey: self._node_count(snode, lang) for lang, lkey in self.lang_map.items()}
+        return self._set_node_state(snode, current, ja)
+
+    def _set_node_state(self, snode, current, ja):
+        """
+        :param current: The state of `snode`, modified in place
+        :param ja: JaggedIntArrays of counts for each language key
+        :return: current
+        """
         depth = snode.depth  # This also acts as an assertion that we have a SchemaContentNode
-        ja = {}  # JaggedIntArrays for each language and 'all'
         padded_ja = {}  # Padded JaggedIntArrays for each language
-
-        # Get base counts for each language
-        for lang, lkey in list(self.lang_map.items()):
+        for lkey in self.lang_keys:
             if not current.get(lkey):
                 current[lkey] = {}
 
-            ja[lkey] = self._node_count(snode, lang)
-
         # Sum all of the languages
         ja['_all'] = reduce(lambda x, y: x + y, [ja[lkey] for lkey in self.lang_keys])
         zero_mask = ja['_all'].zero_mask()
@@ -267,16 +366,7 @@ class VersionState(abst.AbstractMongoRecord, AbstractSchemaContent):
         :return counts:
         :type return: JaggedIntArray
         """
-        counts = JaggedIntArray()
-
-        versions = self.versions(lang)
-        for version in versions:
-            raw_text_ja = version.content_node(snode)
-            ja = JaggedTextArray(raw_text_ja)
-            mask = ja.mask()
-            counts = counts + mask
-
-        return counts
+        return NumpyJaggedIntArray.mask_sum(version.content_node(snode) for version in self.versions(lang))
 
 
     @classmethod
@@ -446,25 +536,82 @@ class StateNode(object):
         return en[unit]
 
 
-def refresh_all_states():
-    indices = IndexSet()
-
-    for index in indices:
-        logger.debug("Rebuilding state for {}".format(index.title))
-        try:
-            VersionState(index).refresh()
-        except Exception as e:
-            logger.warning("Got exception rebuilding state for {}: {}".format(index.title, e))
+def refresh_all_states(processes=1):
+    """
+    Refreshes the VersionState of every index, then rebuilds the TOC.
+    :param processes: With more than one, indexes are refreshed in a pool of forked worker processes
+    :return: dict timing the refresh - total seconds, seconds per index, and the indexes that failed
+    """
+    start = time.perf_counter()
+    titles = [index["title"] for index in IndexSet().iter_stream(proj={"title": 1}, raw=True)]
+    if processes > 1:
+        with multiprocessing.get_context("fork").Pool(processes) as pool:
+            results = pool.map(_refresh_state, titles, chunksize=8)
+    else:
+        results = [_refresh_state(title) for title in titles]
+    refresh_seconds = time.perf_counter() - start
 
     library.rebuild_toc()
+    report = {
+        "indexes": len(titles),
+        "processes": processes,
+        "refresh_seconds": refresh_seconds,
+        "total_seconds": time.perf_counter() - start,
+        "seconds": {title: seconds for title, seconds, _ in results},
+        "failed": {title: error for title, _, error in results if error},
+    }
+    slowest = sorted(report["seconds"].items(), key=lambda x: -x[1])[:10]
+    logger.info("Refreshed all version states", indexes=report["indexes"], processes=processes, failed=len(report["failed"]),
+                refresh_seconds=round(refresh_seconds, 1), total_seconds=round(report["total_seconds"], 1),
+                slowest=[(title, round(seconds, 2)) for title, seconds in slowest])
+    return report
+
+
+def _refresh_state(title):
+    """
+    :return: (title, seconds, error message or None)
+    """
+    logger.debug("Rebuilding state for {}".format(title))
+    start = time.perf_counter()
+    error = None
+    try:
+        VersionState(title).refresh()
+    except Exception as e:
+        logger.warning("Got exception rebuilding state for {}: {}".format(title, e))
+        error = str(e)
+    return title, time.perf_counter() - start, error
+
+
+def navigation_tables_key(title):
+    return "navigation_tables:" + title
+
+
+def get_navigation_table(snode, lang="all", vstate=None):
+    """
+    The NavigationTable of the available sections of `snode`, from the shared cache.
+    On a miss, the tables of the whole Index are built from `vstate`, or the stored VersionState, and cached.
+    VersionState.refresh() replaces them whenever the state changes.
+    :param lang: "all", "he", or "en"
+    :return: NavigationTable, or None for nodes without one, which are navigated with their state JaggedArray
+    """
+    if getattr(snode, "is_virtual", False) or not getattr(snode, "depth", None):
+        return None
+    key = navigation_tables_key(snode.index.title)
+    tables = get_shared_cache_elem(key)
+    if tables is None:
+        tables = (vstate or VersionState(snode.index.title, proj={"content": 1})).navigation_tables()
+        set_shared_cache_elem(key, tables)
+    return tables.get(tuple(snode.version_address()), {}).get(lang)
 
 
 def process_index_delete_in_version_state(indx, **kwargs):
     from sefaria.system.database import db
     db.vstate.delete_one({"title": indx.title})
+    delete_shared_cache_elem(navigation_tables_key(indx.title))
 
 def process_index_title_change_in_version_state(indx, **kwargs):
     VersionStateSet({"title": kwargs["old"]}).update({"title": kwargs["new"]})
+    delete_shared_cache_elem(navigation_tables_key(kwargs["old"]))
 
 
 def create_version_state_on_index_creation(indx, **kwargs):
@@ -1,8 +1,12 @@
 # coding=utf-8
+import atexit
+import threading
+import time
 import regex as re
 from collections import defaultdict
 from django.core.validators import URLValidator
 from django.core.exceptions import ValidationError
+from django.core.signals import request_finished
 from . import abstract as abst
 from . import text
 from sefaria.system.database import db
@@ -13,7 +17,10 @@ from collections import Counter
 from sefaria.utils.calendars import daf_yomi, parashat_hashavua_and_haftara
 from sefaria.utils.util import truncate_string
 from datetime import datetime, timedelta
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
 from sefaria.system.exceptions import InputError
+from sefaria.settings import WEBPAGE_HIT_FLUSH_INTERVAL, WEBPAGE_HIT_BUFFER_SIZE
 from tqdm import tqdm
 from sefaria.model import *
 from sefaria.helper.webpages import normalize_url as normalize_webpage_url
@@ -248,6 +255,95 @@ class WebPage(abst.AbstractMongoRecord):
         return truncate_string(description, 150, 170)
 
 
+class WebPageHitBuffer(object):
+    """
+    Counts linker hits on webpages in process, by normalized URL, and writes them in bulk: a `$inc` of `linkerHits`
+    and a `$max` of `lastUpdated` for each page, at most every `flush_interval` seconds or once `max_urls` pages
+    have hits waiting.  A page that doesn't exist isn't created.
+    Hits are flushed by the hit that comes due, at the end of any request once they are due, and when the process
+    exits, so a process that is killed loses its pending hits.  Hits that fail to be written are kept for the next flush.
+    """
+
+    def __init__(self, flush_interval=60, max_urls=1000):
+        self.flush_interval = flush_interval
+        self.max_urls = max_urls
+        self._hits = {}  # url -> [count, time of last hit]
+        self._last_flush = time.time()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._hits)
+
+    def add(self, url, when=None):
+        """
+        Counts a hit on the webpage at `url`
+        """
+        url = normalize_webpage_url(url)
+        when = when or datetime.now()
+        with self._lock:
+            self._add(url, 1, when)
+            due = self._is_due()
+        if due:
+            self.flush()
+
+    def _add(self, url, count, when):
+        hit = self._hits.get(url)
+        if hit:
+            hit[0] += count
+            hit[1] = max(hit[1], when)
+        else:
+            self._hits[url] = [count, when]
+
+    def _is_due(self):
+        return len(self._hits) >= self.max_urls or (bool(self._hits) and time.time() - self._last_flush >= self.flush_interval)
+
+    def flush_if_due(self):
+        with self._lock:
+            due = self._is_due()
+        if due:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the pending hits.  If the write fails, the hits that weren't written are logged and put back.
+        :return int: the number of webpages written to
+        """
+        with self._lock:
+            hits, self._hits = self._hits, {}
+            self._last_flush = time.time()
+        if not hits:
+            return 0
+        hits = list(hits.items())
+        try:
+            db.webpages.bulk_write([
+                UpdateOne({"url": url}, {"$inc": {"linkerHits": count}, "$max": {"lastUpdated": last_hit}})
+                for url, (count, last_hit) in hits
+            ], ordered=False)
+        except PyMongoError as e:
+            if isinstance(e, BulkWriteError):
+                failed = [hits[error["index"]] for error in e.details.get("writeErrors", [])]
+            else:
+                # which of the writes went through is unknown, so all are tried again
+                failed = hits
+            logger.error("Failed to write linker hits on {} of {} webpages: {}".format(len(failed), len(hits), repr(e)))
+            with self._lock:
+                for url, (count, last_hit) in failed:
+                    self._add(url, count, last_hit)
+            return len(hits) - len(failed)
+        return len(hits)
+
+
+webpage_hit_buffer = WebPageHitBuffer(WEBPAGE_HIT_FLUSH_INTERVAL, WEBPAGE_HIT_BUFFER_SIZE)
+atexit.register(webpage_hit_buffer.flush)
+
+
+def flush_webpage_hits_if_due(sender, **kwargs):
+    webpage_hit_buffer.flush_if_due()
+
+
+request_finished.connect(flush_webpage_hits_if_due)
+
+
 class WebPageSet(abst.AbstractMongoSet):
     recordClass = WebPage
 
@@ -312,12 +408,6 @@ def _get_webpages_for_segment_refs(oref, segment_refs):
     from pymongo.errors import OperationFailure
     if not segment_refs:
         return []
-    segment_ref_objs = []
-    for tref in segment_refs:
-        try:
-            segment_ref_objs.append(text.Ref(tref))
-        except InputError:
-            continue
     # only get items that lastUpdated in last year
     results = WebPageSet(query={"expandedRefs": {"$in": segment_refs},
                                 "title": {"$ne": ""},
@@ -341,32 +431,17 @@ def _get_webpages_for_segment_refs(oref, segment_refs):
         # If documents are too large or there are too many results, fail gracefully
         logger.warn(f"WebPageSet for ref {oref.normal()} failed due to Error: {repr(e)}")
         return []
+    webpages = [webpage for webpage in results if webpage.whitelisted]
+    # Anchor refs from segment refs + webpage refs, to avoid loading/using expandedRefs
+    anchors = text.AnchorRefResolver(oref, segment_refs).resolve([(webpage.refs, None) for webpage in webpages])
+
     webpage_objs = {}      # webpage_obj is an actual WebPage()
     webpage_results = {}  # webpage_results is dictionary that API returns
 
-    for webpage in results:
-        if not webpage.whitelisted:
-            continue
+    for webpage, (anchor_ref_list, anchor_ref_expanded_list) in zip(webpages, anchors):
         webpage_key = webpage.title+"|".join(sorted(webpage.refs))
         prev_webpage_obj = webpage_objs.get(webpage_key, None)
         if prev_webpage_obj is None or prev_webpage_obj.lastUpdated < webpage.lastUpdated:
-            # Recompute anchor refs from segment refs + webpage refs to avoid loading/using expandedRefs.
-            # This is a reimplementation of the logic in Ref.get_all_anchor_refs to avoid loading Ref objects unnecessarily.
-            anchor_ref_list = []
-            anchor_ref_expanded_list = []
-            for tref in webpage.refs:
-                if not tref.startswith(oref.index.title):
-                    continue
-                try:
-                    document_ref = text.Ref(tref)
-                except InputError:
-                    continue
-                if not oref.overlaps(document_ref):
-                    continue
-                anchor_ref_list.append(document_ref)
-                anchor_ref_expanded_list.append(
-                    [segment_ref for segment_ref in segment_ref_objs if document_ref.overlaps(segment_ref)]
-                )
             base_webpage_contents = _webpage_client_contents_minimal(webpage)
             for anchor_ref, anchor_ref_expanded in zip(anchor_ref_list, anchor_ref_expanded_list):
                 webpage_contents = dict(base_webpage_contents)
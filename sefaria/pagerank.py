@@ -0,0 +1,132 @@
+"""
+pagerank.py
+
+Sparse-matrix PageRank, used by pagesheetrank.py to rank segment refs by the links between them.
+
+Refs are given integer ids as edges are added to a :class:`LinkGraph`.  The edges are kept in flat arrays and turned
+into a SciPy CSR matrix, on which PageRank is computed by power iteration with NumPy.
+"""
+import time
+from array import array
+from dataclasses import dataclass, field
+
+import numpy as np
+from scipy import sparse
+
+
+class LinkGraph(object):
+    """
+    Weighted, directed graph of refs.  An edge from `source` to `target` passes rank from `source` to `target`.
+    Repeated edges between the same nodes add up.
+    """
+    def __init__(self):
+        self.node_ids = {}
+        self.nodes = []
+        self._sources = array("i")
+        self._targets = array("i")
+        self._weights = array("d")
+
+    @classmethod
+    def from_in_links(cls, items):
+        """
+        Build from the older dict representation: (node, {linking node: weight}) pairs
+        """
+        graph = cls()
+        items = list(items)
+        for node, _ in items:
+            graph.add_node(node)
+        for node, in_links in items:
+            for source, weight in in_links.items():
+                graph.add_edge(source, node, weight)
+        return graph
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __contains__(self, node):
+        return node in self.node_ids
+
+    def add_node(self, node):
+        """
+        :return: int id of `node`
+        """
+        node_id = self.node_ids.get(node)
+        if node_id is None:
+            node_id = self.node_ids[node] = len(self.nodes)
+            self.nodes.append(node)
+        return node_id
+
+    def add_edge(self, source, target, weight=1.0):
+        self._sources.append(self.add_node(source))
+        self._targets.append(self.add_node(target))
+        self._weights.append(weight)
+
+    def edge_count(self):
+        return len(self._weights)
+
+    def matrix(self):
+        """
+        :return: n x n CSR matrix, with the total weight of edges from node j to node i at [i, j]
+        """
+        n = len(self.nodes)
+        weights = np.frombuffer(self._weights, dtype=np.float64) if len(self._weights) else np.zeros(0)
+        targets = np.frombuffer(self._targets, dtype=np.int32) if len(self._targets) else np.zeros(0, dtype=np.int32)
+        sources = np.frombuffer(self._sources, dtype=np.int32) if len(self._sources) else np.zeros(0, dtype=np.int32)
+        return sparse.csr_matrix((weights, (targets, sources)), shape=(n, n))
+
+
+@dataclass
+class PageRankReport:
+    nodes: int
+    edges: int
+    iterations: int = 0
+    converged: bool = False
+    # L1 change of the rank vector at each iteration
+    changes: list = field(default_factory=list)
+    seconds: float = 0.0
+
+    def __str__(self):
+        return "PageRank over {:,} nodes and {:,} edges {} after {} iterations (last change {:.3g}) in {:.2f}s".format(
+            self.nodes, self.edges, "converged" if self.converged else "did not converge",
+            self.iterations, self.changes[-1] if self.changes else 0.0, self.seconds)
+
+
+def pagerank_vector(matrix, s=0.85, tolerance=0.00001, maxiter=100):
+    """
+    PageRank by power iteration.  Rank of dangling nodes (with no out edges) is spread evenly over all nodes.
+    :param matrix: n x n sparse matrix of edge weights, see `LinkGraph.matrix()`
+    :param s: damping factor
+    :param tolerance: stop once the L1 change of the rank vector is at most this
+    :param maxiter: stop before this many iterations
+    :return: (NumPy array of ranks summing to 1, :class:`PageRankReport`)
+    """
+    start = time.perf_counter()
+    n = matrix.shape[0]
+    report = PageRankReport(nodes=n, edges=matrix.nnz)
+    if n == 0:
+        report.converged = True
+        return np.zeros(0), report
+
+    # Divide each column by its node's total out weight, so that column j spreads node j's rank over its out edges
+    out_weights = np.asarray(matrix.sum(axis=0)).ravel()
+    dangling = out_weights == 0
+    inverse = np.zeros(n)
+    inverse[~dangling] = 1.0 / out_weights[~dangling]
+    transition = (matrix @ sparse.diags(inverse)).tocsr()
+
+    p = np.full(n, 1.0 / n)
+    iteration = 1
+    change = 2
+    while change > tolerance and iteration < maxiter:
+        v = s * (transition @ p) + (s * p[dangling].sum() + (1 - s)) / n
+        # Rescale so the vector remains a probability distribution despite floating point roundoff
+        v /= v.sum()
+        change = np.abs(p - v).sum()
+        report.changes.append(float(change))
+        p = v
+        iteration += 1
+
+    report.iterations = iteration - 1
+    report.converged = change <= tolerance
+    report.seconds = time.perf_counter() - start
+    return p, report
@@ -1,5 +1,5 @@
-# implementation of pagerank with low ram requirements
-# source: http://michaelnielsen.org/blog/using-your-laptop-to-compute-pagerank-for-millions-of-webpages/
+# Ranks segment refs by PageRank over the links between them, and by how often they're used in sheets.
+# The PageRank engine is in sefaria/pagerank.py
 
 import re
 import math
@@ -8,26 +8,17 @@ import random
 import json
 import time
 from pymongo.errors import AutoReconnect
-from collections import defaultdict, OrderedDict
+from collections import defaultdict
 from sefaria.model import *
+from sefaria.pagerank import LinkGraph, pagerank_vector
 from sefaria.system.exceptions import InputError, NoVersionFoundError
 from sefaria.system.database import db
 from .settings import STATICFILES_DIRS
-from functools import reduce
-
-tanach_indexes = set(library.get_indexes_in_category("Tanakh"))
 
+import structlog
+logger = structlog.get_logger(__name__)
 
-class web:
-    def __init__(self, n):
-        self.size = n
-        self.in_links = {}
-        self.number_out_links = {}
-        self.dangling_pages = {}
-        for j in range(n):
-            self.in_links[j] = []
-            self.number_out_links[j] = 0
-            self.dangling_pages[j] = True
+tanach_indexes = set(library.get_indexes_in_category("Tanakh"))
 
 
 def paretosample(n, power=2.0):
@@ -40,88 +31,42 @@ def paretosample(n, power=2.0):
 
 
 def random_web(n=1000, power=2.0):
-    '''Returns a web object with n pages, and where each
+    '''Returns a LinkGraph with n pages, and where each
   page k is linked to by L_k random other pages.  The L_k
   are independent and identically distributed random
   variables with a shifted and truncated Pareto
   probability mass function p(l) proportional to
   1/(l+1)^power.'''
-    g = web(n)
+    g = LinkGraph()
+    for k in range(n):
+        g.add_node(k)
     for k in range(n):
         lk = paretosample(n + 1, power) - 1
-        values = random.sample(range(n), lk)
-        g.in_links[k] = values
-        for j in values:
-            if g.number_out_links[j] == 0: g.dangling_pages.pop(j)
-            g.number_out_links[j] += 1
-    return g
-
-
-def create_empty_nodes(g):
-    all_links = set(reduce(lambda a, b: a + b, [list(v.keys()) for v in list(g.values())], []))
-    for l in all_links:
-        if l not in g:
-            g[l] = {}
+        for j in random.sample(range(n), lk):
+            g.add_edge(j, k)
     return g
 
 
-def create_web(g):
-    n = len(g)
-    w = web(n)
-    node2index = {r: i for i, r in enumerate([x[0] for x in g])}
-    for i, (r, links) in enumerate(g):
-        r_ind = node2index[r]
-        link_inds = [(node2index[r_temp], count) for r_temp, count in list(links.items())]
-        w.in_links[r_ind] = reduce(lambda a, b: a + [b[0]] * int(round(b[1])), link_inds, [])
-        for j, count in link_inds:
-            if w.number_out_links[j] == 0: w.dangling_pages.pop(j)
-            w.number_out_links[j] += count
-    return w
-
-
-def step(w, p, s=0.85):
-    '''Performs a single step in the PageRank computation,
-    with web g and parameter s.  Applies the corresponding M
-    matrix to the vector p, and returns the resulting
-    vector.'''
-    n = w.size
-    v = numpy.matrix(numpy.zeros((n, 1)))
-    inner_product = sum(p[j] for j in w.dangling_pages.keys())
-    for j in range(n):
-        v[j] = s * sum([p[k] / w.number_out_links[k]
-                        for k in w.in_links[j]]) + s * inner_product / n + (1 - s) / n
-    # We rescale the return vector, so it remains a
-    # probability distribution even with floating point
-    # roundoff.
-    return v / numpy.sum(v)
-
-
 def pagerank(g, s=0.85, tolerance=0.00001, maxiter=100, verbose=False, normalize=False):
-    w = create_web(g)
-    n = w.size
-    p = numpy.matrix(numpy.ones((n, 1))) / n
-    iteration = 1
-    change = 2
-    while change > tolerance and iteration < maxiter:
-        if verbose:
-            print("Iteration: %s" % iteration)
-        new_p = step(w, p, s)
-        change = numpy.sum(numpy.abs(p - new_p))
-        if verbose:
-            print("Change in l1 norm: %s" % change)
-        p = new_p
-        iteration += 1
-    if normalize:
+    """
+    :param g: :class:`LinkGraph`, or list of (ref, {ref linking to it: weight}) pairs
+    :return: dict of node to PageRank
+    """
+    if not isinstance(g, LinkGraph):
+        g = LinkGraph.from_in_links(g)
+    p, report = pagerank_vector(g.matrix(), s, tolerance, maxiter)
+    if verbose:
+        print("Change in l1 norm by iteration: {}".format(", ".join("{:.3g}".format(c) for c in report.changes)))
+        print(report)
+    logger.info("pagerank", nodes=report.nodes, edges=report.edges, iterations=report.iterations,
+                converged=report.converged, change=report.changes[-1] if report.changes else None, seconds=round(report.seconds, 2))
+    if normalize and len(p):
         # This is interesting and nerdy, but min seems to do the exact same thing
-        # dangling_pr_sum = sum(p[j] for j in w.dangling_pages.keys())
-        # norm_factor = ((1-s) + s*dangling_pr_sum)/w.size  # see: https://www2007.org/posters/poster893.pdf
+        # dangling_pr_sum = sum(p[j] for j in dangling pages)
+        # norm_factor = ((1-s) + s*dangling_pr_sum)/n  # see: https://www2007.org/posters/poster893.pdf
         # p /= norm_factor
-        try:
-            p /= p.min()
-        except ValueError:
-            pass  # empty list can't calculate min
-    pr_list = list(numpy.squeeze(numpy.asarray(p)))
-    return {k: v for k, v in zip([x[0] for x in g], pr_list)}
+        p /= p.min()
+    return dict(zip(g.nodes, p.tolist()))
 
 
 def has_intersection(a, b):
@@ -134,8 +79,7 @@ def has_intersection(a, b):
 def init_pagerank_graph(ref_list=None):
     """
     :param ref_list: optional list of refs to use instead of using all links. link graph is built from all links to these refs
-    :return: graph which is a double dict. the keys of both dicts are refs. the values are the number of incoming links
-    between outer key and inner key
+    :return: :class:`LinkGraph` of normal segment refs, with an edge from each ref to each older ref it links to
     """
 
     def is_tanach(r):
@@ -173,84 +117,70 @@ def init_pagerank_graph(ref_list=None):
         all_ref_cat_counts[str1].add(ref2.primary_category)
         all_ref_cat_counts[str2].add(ref1.primary_category)
 
-        if str1 not in graph:
-            graph[str1] = {}
+        graph.add_node(str1)
 
         if str2 == str1 or (is_tanach(ref1) and is_tanach(ref2)):
             # self link
             return
 
-        if str2 not in graph[str1]:
-            graph[str1][str2] = 0
-        graph[str1][str2] += weight
+        # the newer ref passes rank to the older one
+        graph.add_edge(str2, str1, weight)
 
-    graph = OrderedDict()
+    graph = LinkGraph()
     if ref_list is None:
-        all_links = LinkSet()  # LinkSet({"type": re.compile(ur"(commentary|quotation)")}).array()
-        len_all_links = all_links.count()
+        len_all_links = LinkSet().count()
+        # streamed in batches, so the links collection is never held in memory
+        all_link_refs = (link["refs"] for link in LinkSet().iter_stream(proj={"refs": 1}, raw=True))
     else:
         link_list = []
         ref_list_seg_set = {rr.normal() for r in ref_list for rr in r.all_segment_refs()}
         for oref in ref_list:
             link_list += list(filter(lambda x: has_intersection(x.expandedRefs0, ref_list_seg_set) and has_intersection(x.expandedRefs1, ref_list_seg_set), oref.linkset()))
         len_all_links = len(link_list)
-        all_links = LinkSet()
-        all_links.records = link_list
+        all_link_refs = (link.refs for link in link_list)
     all_ref_cat_counts = {}
-    current_link, page, link_limit = 0, 0, 100000
-    if ref_list is None:
-        all_links = LinkSet(limit=link_limit, page=page)
-
-    while len(all_links.array()) > 0:
-        for link in all_links:  # raw records avoids caching the entire LinkSet into memory
-            if current_link % 1000 == 0 and current_link > 0:
-                print("{}/{}".format(current_link, len_all_links))
-
-            try:
-                # TODO pagerank segments except Talmud. Talmud is pageranked by section
-                # TODO if you see a section link, add pagerank to all of its segments
-                refs = [Ref(r) for r in link.refs]
-                tp1 = refs[0].index.best_time_period()
-                tp2 = refs[1].index.best_time_period()
-                start1 = int(tp1.determine_year_estimate()) if tp1 else 3000
-                start2 = int(tp2.determine_year_estimate()) if tp2 else 3000
-
-                older_ref, newer_ref = (refs[0], refs[1]) if start1 < start2 else (refs[1], refs[0])
-
-                temp_links = []
-                older_ref = older_ref.padded_ref()
-                newer_ref = newer_ref.padded_ref()
-                if start1 == start2:
-                    if ref_list is not None:
-                        continue  # looks like links at the same time span can cause a big increase in PR. I'm going to disable this right now for small graphs
-                    # randomly switch refs that are equally dated
-                    older_ref, newer_ref = (older_ref, newer_ref) if random.choice([True, False]) else (
-                    newer_ref, older_ref)
-                recursively_put_in_graph(older_ref, newer_ref)
-
-            except InputError:
-                pass
-            except TypeError as e:
-                print("TypeError")
-                print(link.refs)
-            except IndexError:
-                pass
-            except AssertionError:
-                pass
-            except ValueError:
-                print("ValueError")
-                print(link.refs)
-                pass
-            current_link += 1
-        if ref_list is None:
-            page += 1
-            all_links = LinkSet(limit=link_limit, page=page)
-        else:
-            break
+
+    for current_link, link_refs in enumerate(all_link_refs):
+        if current_link % 1000 == 0 and current_link > 0:
+            print("{}/{}".format(current_link, len_all_links))
+
+        try:
+            # TODO pagerank segments except Talmud. Talmud is pageranked by section
+            # TODO if you see a section link, add pagerank to all of its segments
+            refs = [Ref(r) for r in link_refs]
+            tp1 = refs[0].index.best_time_period()
+            tp2 = refs[1].index.best_time_period()
+            start1 = int(tp1.determine_year_estimate()) if tp1 else 3000
+            start2 = int(tp2.determine_year_estimate()) if tp2 else 3000
+
+            older_ref, newer_ref = (refs[0], refs[1]) if start1 < start2 else (refs[1], refs[0])
+
+            older_ref = older_ref.padded_ref()
+            newer_ref = newer_ref.padded_ref()
+            if start1 == start2:
+                if ref_list is not None:
+                    continue  # looks like links at the same time span can cause a big increase in PR. I'm going to disable this right now for small graphs
+                # randomly switch refs that are equally dated
+                older_ref, newer_ref = (older_ref, newer_ref) if random.choice([True, False]) else (
+                newer_ref, older_ref)
+            recursively_put_in_graph(older_ref, newer_ref)
+
+        except InputError:
+            pass
+        except TypeError as e:
+            print("TypeError")
+            print(link_refs)
+        except IndexError:
+            pass
+        except AssertionError:
+            pass
+        except ValueError:
+            print("ValueError")
+            print(link_refs)
+            pass
 
     for ref in all_ref_cat_counts:
-        if ref not in graph:
-            graph[ref] = {}
+        graph.add_node(ref)
 
     return graph, all_ref_cat_counts
 
@@ -262,7 +192,7 @@ def pagerank_rank_ref_list(ref_list, normalize=False, seg_ref_map=None):
     # make unique
     ref_list = [v for k, v in {r.normal(): r for r in ref_list}.items()]
     graph, all_ref_cat_counts = init_pagerank_graph(ref_list)
-    pr = pagerank(list(graph.items()), 0.85, verbose=False, tolerance=0.00005, normalize=normalize)
+    pr = pagerank(graph, 0.85, verbose=False, tolerance=0.00005, normalize=normalize)
 
     if not normalize:
         # remove lowest pr value which just means it quoted at least one source but was never quoted
@@ -288,7 +218,7 @@ def pagerank_rank_ref_list(ref_list, normalize=False, seg_ref_map=None):
 def calculate_pagerank():
     graph, all_ref_cat_counts = init_pagerank_graph()
     # json.dump(graph.items(), open("{}pagerank_graph3.json".format(STATICFILES_DIRS[0]), "wb"))
-    ranked = pagerank(list(graph.items()), 0.85, verbose=True, tolerance=0.00005)
+    ranked = pagerank(graph, 0.85, verbose=True, tolerance=0.00005)
     sorted_ranking = sorted(list(dict(ranked).items()), key=lambda x: x[1])
     count = 0
     smallest_pr = sorted_ranking[0][1]
@@ -340,7 +270,7 @@ def test_pagerank(a, b):
         },
         "c": {}
     }
-    ranked = pagerank(g, a, verbose=True, tolerance=b)
+    ranked = pagerank(list(g.items()), a, verbose=True, tolerance=b)
     print(ranked)
 
 
@@ -0,0 +1,53 @@
+"""
+Admin access to the sampling profiler of the current Gunicorn worker.
+
+Profiles are collected by `sefaria.system.sampling_profiler`, either across all workers for a time window set
+through the `feature.profiler.sampling` remote config entry, or on demand in the worker that handles the request.
+The stacks are returned in collapsed format, ready for flamegraph.pl or https://www.speedscope.app.
+Access is restricted to Django staff members.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.contrib.admin.views.decorators import staff_member_required
+
+from sefaria.system.sampling_profiler import profiler
+
+MAX_ON_DEMAND_SECONDS = 120
+
+
+@staff_member_required
+def profiler_view(request: HttpRequest) -> HttpResponse:
+    """
+    Download the stacks this worker has collected so far.
+        ?status=1 returns the profiler's state as JSON instead.
+        ?seconds=N first samples this worker for N seconds (at most MAX_ON_DEMAND_SECONDS), discarding stacks
+        collected earlier unless ?keep=1.  ?interval_ms sets the sampling interval.
+    """
+    if request.method not in {"GET", "POST"}:
+        return JsonResponse({"status": "error", "message": "Method not allowed."}, status=405)
+
+    if request.GET.get("status"):
+        return JsonResponse(profiler.status())
+
+    if request.GET.get("seconds"):
+        try:
+            seconds = min(float(request.GET["seconds"]), MAX_ON_DEMAND_SECONDS)
+            interval = float(request.GET.get("interval_ms", 10)) / 1000.0
+        except ValueError:
+            return JsonResponse({"status": "error", "message": "seconds and interval_ms must be numbers."}, status=400)
+        if profiler.is_running():
+            return JsonResponse({"status": "error", "message": "The profiler is already running in this worker.", **profiler.status()}, status=409)
+        if not request.GET.get("keep"):
+            profiler.reset()
+        profiler.start(duration=seconds, interval=interval)
+        profiler.join()
+
+    status = profiler.status()
+    timestamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+    response = HttpResponse(profiler.collapsed(), content_type="text/plain; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="profile-{status["pid"]}-{timestamp}.folded"'
+    response["X-Profiler-Samples"] = str(status["samples"])
+    return response
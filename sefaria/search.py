@@ -2,12 +2,17 @@
 """
 search.py - full-text search for Sefaria using ElasticSearch
 
-Writes to MongoDB Collection: index_queue
+Writes to MongoDB Collections: index_queue, search_reindex_checkpoints, search_watermarks
 """
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+import json
 import logging
+import multiprocessing
+import os
 import re
 import sys
+import warnings
 import bleach
 import pymongo
 
@@ -16,7 +21,7 @@ import time as pytime
 
 from elastic_transport import ConnectionError as ESConnectionError, ConnectionTimeout
 from elasticsearch.client import IndicesClient
-from elasticsearch.helpers import bulk
+from elasticsearch.helpers import bulk, parallel_bulk
 from elasticsearch.exceptions import NotFoundError
 from django_topics.models import Topic as DjangoTopic, PoolType
 from sefaria.model import *
@@ -24,10 +29,11 @@ from sefaria.model.text import AbstractIndex, AbstractTextRecord
 from sefaria.model.user_profile import user_link, public_user_data
 from sefaria.model.collection import CollectionSet
 from sefaria.system.database import db
-from sefaria.system.exceptions import InputError
+from sefaria.system.exceptions import InputError, BookNameError
 from sefaria.utils.util import strip_tags, strip_markdown
 from .settings import SEARCH_INDEX_NAME_TEXT, SEARCH_INDEX_NAME_SHEET
 from .settings import SEARCH_INDEX_NAME_TOPIC, SEARCH_INDEX_NAME_BOOK, SEARCH_INDEX_NAME_CATEGORY
+from .settings import SEARCH_REINDEX_PROCESSES, SEARCH_REINDEX_IN_FLIGHT_REQUESTS
 # Aliased on import: this module already defines an unrelated `get_search_categories(oref,
 # categories)` (the text index's category-path helper, below), which would shadow it.
 from sefaria.model.autospell import get_search_categories as get_searchable_toc_categories
@@ -98,18 +104,18 @@ def delete_version(index, version, lang, old_title=None):
     """
     assert isinstance(index, AbstractIndex)
 
-    refs = []
+    trefs = []
 
     if SITE_SETTINGS.get("TORAH_SPECIFIC"):
         all_gemara_indexes = library.get_indexes_in_category("Bavli")
         davidson_indexes = all_gemara_indexes[:all_gemara_indexes.index("Horayot") + 1]
         if Ref(index.title).is_bavli() and index.title not in davidson_indexes:
-            refs += index.all_section_refs()
+            trefs += [ref.normal() for ref in index.all_section_refs()]
 
-    refs += index.all_segment_refs()
+    # Only the normal forms are needed, so avoid building a Ref for every segment
+    trefs += index.all_segment_ref_array().normals()
 
-    for ref in refs:
-        tref = ref.normal()
+    for tref in trefs:
         if old_title:
             tref = old_title + tref[len(index.title):]
         delete_text_by_ref_string(tref, version, lang)
@@ -803,11 +809,111 @@ def get_search_categories(oref, categories):
     return indexed_categories
 
 
+class ReindexCheckpoints(object):
+    """
+    Records which (title, language) groups of versions have been completely written to a text index, so that an
+    interrupted `TextIndexer.index_all()` can resume where it stopped.
+    """
+    def __init__(self, index_name, collection=None):
+        self.index_name = index_name
+        self.collection = collection if collection is not None else db.search_reindex_checkpoints
+
+    def completed(self):
+        return {(c["title"], c["lang"]) for c in self.collection.find({"index": self.index_name}, {"title": 1, "lang": 1})}
+
+    def mark_completed(self, title, lang, **stats):
+        self.collection.update_one({"index": self.index_name, "title": title, "lang": lang},
+                                   {"$set": dict(stats, completed=datetime.now())}, upsert=True)
+
+    def clear(self):
+        self.collection.delete_many({"index": self.index_name})
+
+
+@dataclass
+class ReindexShardStats:
+    """
+    Throughput of one process of a text reindex
+    """
+    shard: int
+    indexes: int = 0
+    versions: int = 0
+    segments: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+
+    def add(self, result):
+        self.indexes += 1
+        self.versions += result["indexed"]
+        self.segments += result["segments"]
+        self.bytes += result["bytes"]
+        self.seconds += result["seconds"]
+
+    def segments_per_second(self):
+        return self.segments / self.seconds if self.seconds else 0.0
+
+    def bytes_per_second(self):
+        return self.bytes / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (f"{self.shard}: {self.indexes} indexes, {self.versions} versions, {self.segments} segments, "
+                f"{self.segments_per_second():.1f} segments/sec, {self.bytes_per_second() / 1024:.1f} KB/sec")
+
+
+class TextChanges(object):
+    """
+    The text edits read from the history collection, coalesced per version.
+    Versions that were deleted or renamed have all their documents deleted before anything is reindexed.
+    """
+    REV_TYPES = ["add text", "edit text", "revert text", "delete text", "edit version_metadata"]
+
+    def __init__(self):
+        self.segments = defaultdict(set)  # (title, versionTitle, lang): segment trefs to reindex
+        self.versions_to_reindex = set()
+        self.versions_to_delete = set()
+        self.latest = None  # date of the newest change
+
+    def __len__(self):
+        return len(self.versions_to_delete | self.versions_to_reindex | set(self.segments))
+
+    def add(self, record):
+        """
+        :param record: dict from the history collection
+        """
+        if self.latest is None or record["date"] > self.latest:
+            self.latest = record["date"]
+        rev_type = record["rev_type"]
+        if rev_type == "delete text":
+            key = (record["title"], record["version"], record["language"])
+            self.versions_to_delete.add(key)
+            self.versions_to_reindex.discard(key)
+            self.segments.pop(key, None)
+        elif rev_type == "edit version_metadata":
+            key = (record["title"], record["version"], record["language"])
+            old_version_title = (record.get("old") or {}).get("versionTitle")
+            if old_version_title and old_version_title != record["version"]:
+                self.versions_to_delete.add((record["title"], old_version_title, record["language"]))
+            self.versions_to_reindex.add(key)
+        else:
+            try:
+                oref = Ref(record["ref"])
+            except InputError as e:
+                logger.warning(f"Skipping text change with unparseable ref - ref: {record.get('ref')}, error: {e}")
+                return
+            key = (oref.index.title, record["version"], record["language"])
+            if key in self.versions_to_delete:
+                # Added again after it was deleted
+                self.versions_to_reindex.add(key)
+            elif key not in self.versions_to_reindex:
+                self.segments[key].update(r.normal() for r in oref.all_segment_refs())
+
+
 class TextIndexer(object):
     
     # Class-level failure tracking
     _failed_versions = None
     _skipped_versions = None
+    # (title, lang): versions, while index_all() runs worker processes
+    _versions_by_index = None
 
     @classmethod
     def clear_cache(cls):
@@ -899,17 +1005,25 @@ class TextIndexer(object):
                     parse_errors.append(title)
                     logger.debug(f"Failed to parse ref - title: {title}")
                     return
-                vlist = cls.get_ref_version_list(r)
-                vpriorities = defaultdict(lambda: 0)
-                for i, v in enumerate(vlist):
-                    lang = v.language
-                    cls.version_priority_map[(title, v.versionTitle, lang)] = (vpriorities[lang], mini_toc.get("categories", []))
-                    vpriorities[lang] += 1
+                cls.version_priority_map.update(cls._version_priorities(r, mini_toc.get("categories", [])))
 
         traverse(toc)
         elapsed = datetime.now() - start_time
         logger.debug(f"Completed version priority map creation - total_versions: {len(cls.version_priority_map)}, parse_errors: {len(parse_errors)}, elapsed: {elapsed}")
 
+    @classmethod
+    def _version_priorities(cls, oref, categories):
+        """
+        :return: dict of (title, versionTitle, lang): (priority among the book's versions in lang, categories)
+        """
+        priorities = {}
+        vpriorities = defaultdict(lambda: 0)
+        for v in cls.get_ref_version_list(oref):
+            lang = v.language
+            priorities[(oref.index.title, v.versionTitle, lang)] = (vpriorities[lang], categories)
+            vpriorities[lang] += 1
+        return priorities
+
     @staticmethod
     def get_ref_version_list(oref, tries=0):
         try:
@@ -928,22 +1042,20 @@ class TextIndexer(object):
                 raise e
 
     @classmethod
-    def get_all_versions(cls, tries=0, versions=None, page=0):
-        if page == 0:
+    def get_all_versions(cls, tries=0, versions=None, start_after=None):
+        """
+        :return: list of all Versions, without their text, which `index_version()` loads one version at a time.
+        Versions are streamed in `_id` order, and after a dropped connection the stream resumes after the last one read.
+        """
+        if start_after is None:
             logger.debug("Starting to fetch all versions from database")
         versions = versions or []
+        vset = VersionSet()
         try:
-            version_limit = 10
-            temp_versions = []
-            first_run = True
-            while first_run or len(temp_versions) > 0:
-                temp_versions = VersionSet(limit=version_limit, page=page).array()
-                versions += temp_versions
-                page += 1
-                first_run = False
-                # Log progress every 100 pages
-                if page % PROGRESS_LOG_EVERY_N == 0:
-                    logger.debug(f"Fetching versions - page: {page}, total_so_far: {len(versions)}")
+            for version in vset.iter_stream(proj={"chapter": 0}, start_after=start_after):
+                versions.append(version)
+                if len(versions) % (PROGRESS_LOG_EVERY_N * 10) == 0:
+                    logger.debug(f"Fetching versions - total_so_far: {len(versions)}")
             logger.debug(f"Completed fetching all versions - total: {len(versions)}")
             return versions
         except pymongo.errors.AutoReconnect as e:
@@ -951,7 +1063,7 @@ class TextIndexer(object):
                 if tries % 10 == 0:
                     logger.warning(f"MongoDB AutoReconnect while fetching versions, retrying - attempt: {tries}, versions_so_far: {len(versions)}")
                 pytime.sleep(RETRY_SLEEP_SECONDS)
-                return cls.get_all_versions(tries+1, versions, page)
+                return cls.get_all_versions(tries+1, versions, vset.last_streamed_id or start_after)
             else:
                 logger.error(f"get_all_versions failed after max retries - attempts: {tries}, versions_retrieved: {len(versions)}")
                 raise e
@@ -964,11 +1076,20 @@ class TextIndexer(object):
         ]
 
     @classmethod
-    def index_all(cls, index_name, debug=False, for_es=True, action=None):
+    def index_all(cls, index_name, debug=False, for_es=True, action=None, processes=1, checkpoints=None):
+        """
+        Index every version, one (title, language) group of versions at a time.
+        :param processes: With more than one, groups are spread over a pool of forked worker processes, each of which
+        streams its bulk actions to Elasticsearch.  Only used when `for_es`.
+        :param checkpoints: :class:`ReindexCheckpoints`.  Groups it has recorded as complete are skipped, and each group
+        that is written completely is recorded.
+        """
         start_time = datetime.now()
         cls.index_name = index_name
+        cls._failed_versions = cls._failed_versions or []
+        cls._skipped_versions = cls._skipped_versions or []
         
-        logger.debug(f"TextIndexer.index_all starting - index_name: {index_name}, debug: {debug}, for_es: {for_es}")
+        logger.debug(f"TextIndexer.index_all starting - index_name: {index_name}, debug: {debug}, for_es: {for_es}, processes: {processes}")
         
         # Create priority map and terms dict
         cls.create_version_priority_map()
@@ -990,8 +1111,13 @@ class TextIndexer(object):
                 versions_by_index[key] += [v]
             else:
                 versions_by_index[key] = [v]
-        
+
         total_versions = len(versions)
+        if checkpoints is not None:
+            completed = checkpoints.completed()
+            versions_by_index = {k: vlist for k, vlist in versions_by_index.items() if k not in completed}
+            logger.info(f"Resuming from checkpoints - completed_indexes: {len(completed)}, remaining_indexes: {len(versions_by_index)}")
+
         total_indexes = len(versions_by_index)
         logger.debug(f"Beginning text indexing - total_versions: {total_versions}, total_indexes: {total_indexes}")
         logger.debug(f"Beginning index of {total_versions} versions.")
@@ -1000,76 +1126,139 @@ class TextIndexer(object):
         skipped = 0
         failed = 0
         versions = None  # release RAM
-        
-        for idx_count, (title, vlist) in enumerate(list(versions_by_index.items())):
-            if len(vlist) == 0:
-                continue
-            
+        shard_stats = {}
+
+        if processes > 1 and for_es:
+            cls._versions_by_index = versions_by_index  # inherited by the forked workers
+            pool = multiprocessing.get_context("fork").Pool(processes, initializer=_reindex_worker_init)
+            results = pool.imap_unordered(_reindex_worker, list(versions_by_index.keys()))
+        else:
+            pool = None
+            results = (cls._index_group(vlist, for_es=for_es, action=action) for vlist in versions_by_index.values())
+
+        try:
+            for idx_count, result in enumerate(results):
+                vcount += result["indexed"]
+                skipped += result["skipped"]
+                failed += result["failed"]
+                cls._failed_versions += result.get("failed_versions", [])
+                cls._skipped_versions += result.get("skipped_versions", [])
+                shard_stats.setdefault(result["shard"], ReindexShardStats(result["shard"])).add(result)
+                if checkpoints is not None and result["complete"]:
+                    checkpoints.mark_completed(*result["key"], versions=result["indexed"], segments=result["segments"], bytes=result["bytes"])
+
+                if idx_count % 100 == 0:
+                    elapsed_so_far = datetime.now() - start_time
+                    logger.info(f"TextIndexer progress: {idx_count}/{total_indexes} indexes ({100*idx_count//max(total_indexes, 1)}%), {vcount} versions indexed, elapsed: {elapsed_so_far}")
+                    for stats in shard_stats.values():
+                        logger.info(f"TextIndexer shard {stats}")
+        finally:
+            cls._versions_by_index = None
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        elapsed = datetime.now() - start_time
+        logger.info(f"TextIndexer.index_all completed - total_indexed: {vcount}, total_skipped: {skipped}, total_failed: {failed}, elapsed: {elapsed}")
+        for stats in shard_stats.values():
+            logger.info(f"TextIndexer shard {stats}")
+        return shard_stats
+
+    @classmethod
+    def _index_group(cls, vlist, for_es=True, action=None, flush=None):
+        """
+        Index the versions of one (title, language), which are in priority order.
+        :param flush: called with the versions whose actions are in `cls._bulk_actions` to write them, returning how
+        many of those versions failed.  Defaults to `_flush_bulk_actions()`.
+        :return: dict of counts.  "complete" is False if writing to Elasticsearch failed, in which case the group
+        should be indexed again.
+        """
+        start = pytime.perf_counter()
+        result = {"key": (vlist[0].title, vlist[0].language), "shard": os.getpid(), "indexed": 0, "skipped": 0,
+                  "failed": 0, "segments": 0, "bytes": 0, "seconds": 0.0, "complete": False}
+        flush = flush or cls._flush_bulk_actions
+
+        def fail_all(message, error_type):
+            result["failed"] += len(vlist)
+            for v in vlist:
+                cls._add_failed_version(v, message, error_type)
+            return result
+
+        try:
+            cls.curr_index = vlist[0].get_index()
+        except Exception as e:
+            return fail_all(f"Failed to get index: {str(e)}", type(e).__name__)
+
+        if cls.curr_index is None:
+            return fail_all('Index is None', 'ValidationError')
+
+        # Validate that index has a title
+        if not hasattr(cls.curr_index, 'title') or not cls.curr_index.title:
+            return fail_all('Index missing title', 'ValidationError')
+
+        if for_es:
+            cls._bulk_actions = []
             try:
-                cls.curr_index = vlist[0].get_index()
-            except Exception as e:
-                failed += len(vlist)
-                for v in vlist:
-                    cls._add_failed_version(v, f"Failed to get index: {str(e)}", type(e).__name__)
-                continue
-                
-            if cls.curr_index is None:
-                failed += len(vlist)
-                for v in vlist:
-                    cls._add_failed_version(v, 'Index is None', 'ValidationError')
+                cls.best_time_period = cls.curr_index.best_time_period()
+            except (ValueError, AttributeError) as e:
+                # best_time_period is required - mark all versions as failed
+                return fail_all(f"Failed to get best_time_period: {str(e)}", type(e).__name__)
+
+        in_flight_versions = []
+        for v in vlist:
+            # Validate critical fields
+            if not v.title or not v.versionTitle or not v.language:
+                result["failed"] += 1
+                cls._add_failed_version(v, 'Missing critical field (title, versionTitle, or language)', 'ValidationError')
                 continue
-            
-            # Validate that index has a title
-            if not hasattr(cls.curr_index, 'title') or not cls.curr_index.title:
-                failed += len(vlist)
-                for v in vlist:
-                    cls._add_failed_version(v, 'Index missing title', 'ValidationError')
+
+            if cls.excluded_from_search(v):
+                result["skipped"] += 1
+                cls._add_skipped_version(v, 'excluded_from_search')
                 continue
-                
-            if for_es:
-                cls._bulk_actions = []
-                try:
-                    cls.best_time_period = cls.curr_index.best_time_period()
-                except (ValueError, AttributeError) as e:
-                    # best_time_period is required - mark all versions as failed
-                    failed += len(vlist)
-                    for v in vlist:
-                        cls._add_failed_version(v, f"Failed to get best_time_period: {str(e)}", type(e).__name__)
-                    continue
-
-            in_flight_versions = []
-            for v in vlist:
-                # Validate critical fields
-                if not v.title or not v.versionTitle or not v.language:
-                    failed += 1
-                    cls._add_failed_version(v, 'Missing critical field (title, versionTitle, or language)', 'ValidationError')
-                    continue
 
-                if cls.excluded_from_search(v):
-                    skipped += 1
-                    cls._add_skipped_version(v, 'excluded_from_search')
-                    continue
+            try:
+                cls.index_version(v, action=action)
+                result["indexed"] += 1
+                in_flight_versions.append(v)
+            except Exception as e:
+                result["failed"] += 1
+                cls._add_failed_version(v, str(e), type(e).__name__)
+
+        rolled_back = 0
+        if for_es:
+            result["segments"] = len(cls._bulk_actions)
+            result["bytes"] = sum(len(json.dumps(a.get("_source", {}), ensure_ascii=False).encode("utf-8")) for a in cls._bulk_actions)
+            rolled_back = flush(in_flight_versions)
+            result["indexed"] -= rolled_back
+            result["failed"] += rolled_back
+        result["complete"] = rolled_back == 0
+        result["seconds"] = pytime.perf_counter() - start
+        return result
 
-                try:
-                    cls.index_version(v, action=action)
-                    vcount += 1
-                    in_flight_versions.append(v)
-                except Exception as e:
-                    failed += 1
-                    cls._add_failed_version(v, str(e), type(e).__name__)
-
-            if for_es:
-                rolled_back = cls._flush_bulk_actions(in_flight_versions)
-                if rolled_back:
-                    vcount -= rolled_back
-                    failed += rolled_back
-
-            if idx_count % 100 == 0:
-                elapsed_so_far = datetime.now() - start_time
-                logger.info(f"TextIndexer progress: {idx_count}/{total_indexes} indexes ({100*idx_count//total_indexes}%), {vcount} versions indexed, elapsed: {elapsed_so_far}")
+    @classmethod
+    def _stream_bulk_actions(cls, in_flight_versions):
+        """
+        Like `_flush_bulk_actions()`, but writes in chunks with up to SEARCH_REINDEX_IN_FLIGHT_REQUESTS requests in
+        flight at once.  If any document fails, all of `in_flight_versions` are recorded as failed.
 
-        elapsed = datetime.now() - start_time
-        logger.info(f"TextIndexer.index_all completed - total_indexed: {vcount}, total_skipped: {skipped}, total_failed: {failed}, elapsed: {elapsed}")
+        Returns the number of versions reclassified as failed.
+        """
+        if not cls._bulk_actions:
+            return 0
+        errors = []
+        for ok, info in parallel_bulk(_indexer_es_client, cls._bulk_actions, thread_count=SEARCH_REINDEX_IN_FLIGHT_REQUESTS,
+                                      queue_size=SEARCH_REINDEX_IN_FLIGHT_REQUESTS, raise_on_error=False,
+                                      raise_on_exception=False, request_timeout=120):
+            if not ok:
+                errors.append(info)
+        cls._bulk_actions = []
+        if not errors:
+            return 0
+        logger.warning(f"Bulk indexing failed for {len(errors)} documents of {cls.curr_index.title}, e.g. {errors[0]}")
+        for v in in_flight_versions:
+            cls._add_failed_version(v, f"Bulk write failed for {len(errors)} documents", "BulkIndexError")
+        return len(in_flight_versions)
 
     @classmethod
     def index_version(cls, version, tries=0, action=None):
@@ -1085,6 +1274,9 @@ class TextIndexer(object):
             if not cls.curr_index or not hasattr(cls.curr_index, 'get_title') or not hasattr(cls.curr_index, 'schema'):
                 cls._add_failed_version(version, 'Index missing required attributes (get_title or schema)', 'ValidationError')
                 return
+            if getattr(version, "chapter", None) is None:
+                # Versions from get_all_versions() come without their text
+                version = Version().load({"_id": version._id})
             version.walk_thru_contents(action, heTref=cls.curr_index.get_title('he'), schema=cls.curr_index.schema, terms_dict=cls.terms_dict)
         except pymongo.errors.AutoReconnect as e:
             # Adding this because there is a mongo call for dictionary words in walk_thru_contents()
@@ -1126,6 +1318,81 @@ class TextIndexer(object):
         id = make_text_doc_id(tref, version_title, lang)
         es_client.index(index=index_name, document=doc, id=id)
 
+    @classmethod
+    def index_changes(cls, index_name, changes):
+        """
+        Brings `index_name` up to date with :class:`TextChanges`.  Documents are rebuilt only for the edited segments
+        (or every segment of a version whose metadata changed), and deleted for segments that are now empty.
+        :return: (number of documents written, number of documents deleted, list of errors)
+        """
+        cls.index_name = index_name
+        cls.version_priority_map = {}
+        cls._bulk_actions = []
+        deleted = 0
+        errors = []
+
+        for title, vtitle, lang in changes.versions_to_delete:
+            try:
+                delete_version(library.get_index(title), vtitle, lang)
+            except BookNameError:
+                # The book is gone; its documents were removed with it
+                pass
+
+        if changes.versions_to_reindex and getattr(cls, "terms_dict", None) is None:
+            cls.create_terms_dict()
+        for title, vtitle, lang in changes.versions_to_reindex:
+            version = Version().load({"title": title, "versionTitle": vtitle, "language": lang})
+            if version is None or not cls._prepare_version(version):
+                continue
+            cls.index_version(version)
+
+        for (title, vtitle, lang), trefs in changes.segments.items():
+            version = Version().load({"title": title, "versionTitle": vtitle, "language": lang}, proj={"chapter": 0})
+            if version is None or not cls._prepare_version(version):
+                continue
+            priority, categories = cls.version_priority_map[(title, vtitle, lang)]
+            for tref in sorted(trefs):
+                oref = Ref(tref)
+                content = TextChunk(oref, lang, vtitle=vtitle).ja().flatten_to_string()
+                doc = cls.make_text_index_document(tref, oref.he_normal(), vtitle, lang, priority, content, categories,
+                                                   getattr(version, 'versionTitleInHebrew', None),
+                                                   getattr(version, 'languageFamilyName', None), getattr(version, 'isPrimary', False))
+                doc_id = make_text_doc_id(tref, vtitle, lang)
+                if doc:
+                    cls._bulk_actions.append({"_index": index_name, "_id": doc_id, "_source": doc})
+                else:
+                    cls._bulk_actions.append({"_op_type": "delete", "_index": index_name, "_id": doc_id})
+
+        written = sum(1 for a in cls._bulk_actions if a.get("_op_type") != "delete")
+        deleted += len(cls._bulk_actions) - written
+        if cls._bulk_actions:
+            _, bulk_errors = bulk(_indexer_es_client, cls._bulk_actions, raise_on_error=False, request_timeout=120)
+            # Deleting a document that was never indexed isn't an error
+            errors = [e for e in bulk_errors if e.get("delete", {}).get("status") != 404]
+        cls._bulk_actions = []
+        return written, deleted, errors
+
+    @classmethod
+    def _prepare_version(cls, version):
+        """
+        Sets the index, time period and version priorities used to build the documents of `version`
+        :return: False if the version can't be indexed
+        """
+        try:
+            cls.curr_index = version.get_index()
+        except BookNameError:
+            return False
+        if cls.excluded_from_search(version):
+            return False
+        try:
+            cls.best_time_period = cls.curr_index.best_time_period()
+        except ValueError:
+            cls.best_time_period = None
+        key = (version.title, version.versionTitle, version.language)
+        if key not in cls.version_priority_map:
+            cls.version_priority_map.update(cls._version_priorities(Ref(cls.curr_index.title), cls.curr_index.categories))
+        return key in cls.version_priority_map
+
     @classmethod
     def _cache_action(cls, segment_str, tref, heTref, version):
         # Index this document as a whole
@@ -1243,6 +1510,30 @@ class TextIndexer(object):
         }
 
 
+def _reindex_worker_init():
+    # Each worker opens its own Elasticsearch client rather than sharing the parent's.
+    # The Mongo client, whose `db` is imported by name throughout the models, can't be replaced the same way.  It is
+    # inherited from the parent, and PyMongo resets its connection pools and sessions the first time a forked child
+    # uses it, so the workers still open their own Mongo connections.  That is what its "opened before fork" warning
+    # is about, so it's silenced here.
+    global _indexer_es_client
+    _indexer_es_client = get_elasticsearch_client_for_indexer()
+    warnings.filterwarnings("ignore", message="MongoClient opened before fork")
+
+
+def _reindex_worker(key):
+    """
+    Indexes one (title, language) group of versions in a worker process of `TextIndexer.index_all()`.
+    Failed and skipped versions are returned to the parent with the counts.
+    """
+    TextIndexer._failed_versions = []
+    TextIndexer._skipped_versions = []
+    result = TextIndexer._index_group(TextIndexer._versions_by_index[key], flush=TextIndexer._stream_bulk_actions)
+    result["failed_versions"] = TextIndexer._failed_versions
+    result["skipped_versions"] = TextIndexer._skipped_versions
+    return result
+
+
 def index_sheets_by_timestamp(timestamp):
     """
     :param timestamp str: index all sheets modified after `timestamp` (in isoformat)
@@ -2074,6 +2365,53 @@ def add_recent_to_queue(ndays):
         add_ref_to_index_queue(ref[0], ref[1], ref[2])
 
 
+# History dates come from the clocks of the servers that made the edits, so changes are read again from this far
+# behind the watermark.  Reindexing a segment twice is harmless.
+TEXT_CHANGES_OVERLAP = timedelta(minutes=5)
+
+
+def get_search_watermark(name):
+    """
+    :return: datetime up to which changes have been indexed into the `name` index, or None
+    """
+    watermark = db.search_watermarks.find_one({"_id": name})
+    return watermark["date"] if watermark else None
+
+
+def set_search_watermark(name, date):
+    db.search_watermarks.update_one({"_id": name}, {"$set": {"date": date}}, upsert=True)
+
+
+def index_text_changes(since=None):
+    """
+    Reindex the segments whose text changed since the text watermark, as recorded in the history collection, and
+    move the watermark forward if they were all indexed.  A full reindex sets the watermark to the time it started.
+    :param since: datetime to read changes from instead of the watermark
+    """
+    since = since or get_search_watermark('text')
+    if since is None:
+        # Nothing to catch up from; the next run picks up edits made from now on
+        set_search_watermark('text', datetime.now())
+        logger.warning("No text watermark - starting incremental text indexing from now")
+        return {"versions": 0, "written": 0, "deleted": 0, "errors": []}
+
+    index_name = get_new_and_current_index_names('text').get('current')
+    changes = TextChanges()
+    query = {"rev_type": {"$in": TextChanges.REV_TYPES}, "date": {"$gt": since - TEXT_CHANGES_OVERLAP}}
+    proj = {"rev_type": 1, "date": 1, "ref": 1, "title": 1, "version": 1, "language": 1, "old.versionTitle": 1}
+    for record in HistorySet(query).iter_stream(proj=proj, raw=True):
+        changes.add(record)
+
+    written, deleted, errors = TextIndexer.index_changes(index_name, changes)
+    if errors:
+        # The watermark stays put, so the next run retries the changes that failed
+        logger.error(f"Errors indexing text changes - count: {len(errors)}, first: {errors[0]}")
+    elif changes.latest and changes.latest > since:
+        set_search_watermark('text', changes.latest)
+    logger.info(f"Indexed text changes since {since} - versions: {len(changes)}, written: {written}, deleted: {deleted}, errors: {len(errors)}")
+    return {"versions": len(changes), "written": written, "deleted": deleted, "errors": errors}
+
+
 def get_new_and_current_index_names(type, debug=False):
     base_index_name_dict = {
         'text': SEARCH_INDEX_NAME_TEXT,
@@ -2210,6 +2548,7 @@ def index_all_of_type(type, skip=0, debug=False):
 
     # Perform the actual indexing
     logger.debug(f"Beginning indexing operation - type: {type}, index_name: {index_names_dict.get('new')}")
+    indexing_start = datetime.now()
     index_all_of_type_by_index_name(type, index_names_dict.get('new'), skip, debug)
 
     # Switch aliases
@@ -2226,6 +2565,9 @@ def index_all_of_type(type, skip=0, debug=False):
     # Create new alias
     index_client.put_alias(index=index_names_dict.get('new'), name=index_names_dict.get('alias'))
     logger.debug(f"Successfully created alias for new index - alias: {index_names_dict.get('alias')}, new_index: {index_names_dict.get('new')}")
+    if type == 'text' and not debug:
+        # Edits made during the reindex may have been missed, so index_text_changes() catches up from its start
+        set_search_watermark('text', indexing_start)
 
     # Cleanup old index
     if index_names_dict.get('new') != index_names_dict.get('current'):
@@ -2241,7 +2583,8 @@ def index_all_of_type_by_index_name(type, index_name, skip=0, debug=False, force
     
     :param type: Type of index ('text' or 'sheet')
     :param index_name: Name of the index
-    :param skip: Number of documents to skip (for resuming)
+    :param skip: Number of documents to skip (for resuming).  Texts resume after the books recorded in the index's
+        ReindexCheckpoints, which a run with skip=0 clears.
     :param debug: Debug mode
     :param force_recreate: If True, will recreate index even if it has documents
     """
@@ -2269,8 +2612,11 @@ def index_all_of_type_by_index_name(type, index_name, skip=0, debug=False, force
     if type == 'text':
         logger.debug("Clearing TextIndexer cache")
         TextIndexer.clear_cache()
+        checkpoints = ReindexCheckpoints(index_name)
+        if skip == 0:
+            checkpoints.clear()
         logger.debug("Starting TextIndexer.index_all")
-        TextIndexer.index_all(index_name, debug=debug)
+        TextIndexer.index_all(index_name, debug=debug, processes=SEARCH_REINDEX_PROCESSES, checkpoints=checkpoints)
         logger.debug("Completed TextIndexer.index_all")
     elif type == 'sheet':
         logger.debug("Starting sheet indexing")
@@ -137,6 +137,7 @@ MIDDLEWARE = [
     'sefaria.system.multiserver.coordinator.MultiServerEventListenerMiddleware',
     'django_structlog.middlewares.RequestMiddleware',
     *(['sefaria.system.middleware.MaxRSSMiddleware'] if os.environ.get('ENABLE_MAXRSS_MIDDLEWARE') else []),
+    *(['sefaria.system.middleware.QueryStatsMiddleware'] if os.environ.get('ENABLE_QUERY_STATS_MIDDLEWARE') else []),
     #'easy_timezones.middleware.EasyTimezoneMiddleware',
     #'django.middleware.cache.UpdateCacheMiddleware',
     #'django.middleware.cache.FetchFromCacheMiddleware',
@@ -358,6 +359,44 @@ SEARCH_INDEX_NAME_TOPIC = 'topic'
 SEARCH_INDEX_NAME_BOOK = 'book'
 SEARCH_INDEX_NAME_CATEGORY = 'category'
 
+# Host-wide table of parsed Refs, shared by all processes through a memory-mapped file.  None disables it.
+# See sefaria/system/mmap_table.py.  Defaulted here for the same reason as the index names above.
+SHARED_REF_CACHE_PATH = None
+SHARED_REF_CACHE_SLOTS = 131072
+
+# Snapshot of the initialized library (title maps, TOC, autocompleters), written by the first process to initialize
+# and loaded by later ones while it is current.  See Library.dump_snapshot().  None disables it.
+LIBRARY_SNAPSHOT_PATH = None
+
+# Directory of the autocompleters as memory mapped tries, written by the first process to build them and mapped by
+# the others, which share its pages.  Rebuilt when the library's last_cached changes.
+# See Library.dump_auto_completer_store().  None disables it.
+AUTOCOMPLETER_STORE_PATH = None
+
+# How often each web worker checks the sampling profiler's remote config entry.  0 disables it.
+# See sefaria/system/sampling_profiler.py
+SAMPLING_PROFILER_POLL_SECONDS = 30
+
+# Worker processes used by a full text reindex, and the bulk requests each may have in flight to Elasticsearch at once.
+# See TextIndexer.index_all() in sefaria/search.py
+SEARCH_REINDEX_PROCESSES = 1
+SEARCH_REINDEX_IN_FLIGHT_REQUESTS = 2
+
+# Worker processes running the stages of export_all() at once, and the compression of exported texts and links:
+# None, "gzip" or "zstd".  See sefaria/export.py
+SEFARIA_EXPORT_PROCESSES = 1
+SEFARIA_EXPORT_COMPRESSION = None
+
+# Users whose public data (name, profile url, image) each process keeps, and the seconds it and the shared cache keep
+# it for.  See PublicUserDataCache in sefaria/model/user_profile.py
+PUBLIC_USER_DATA_CACHE_SIZE = 20000
+PUBLIC_USER_DATA_CACHE_TIMEOUT = 60 * 60
+
+# Seconds each process holds linker hits on webpages before writing them together, and the most webpages it holds
+# hits for.  See WebPageHitBuffer in sefaria/model/webpage.py
+WEBPAGE_HIT_FLUSH_INTERVAL = 60
+WEBPAGE_HIT_BUFFER_SIZE = 1000
+
 # Grab environment specific settings from a file which
 # is left out of the repo.
 if os.getenv("CI_RUN"):
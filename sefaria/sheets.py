@@ -25,7 +25,7 @@ import sefaria.model.abstract as abstract
 from sefaria.system.database import db
 from sefaria.model.notification import Notification, NotificationSet
 from sefaria.model.following import FollowersSet
-from sefaria.model.user_profile import UserProfile, annotate_user_list, public_user_data, user_link
+from sefaria.model.user_profile import UserProfile, annotate_user_list, public_user_data, public_user_data_bulk, user_link
 from sefaria.model.collection import Collection, CollectionSet
 from sefaria.model.topic import TopicSet, Topic, RefTopicLink, RefTopicLinkSet
 from sefaria.utils.util import strip_tags, string_overlap, titlecase
@@ -200,6 +200,9 @@ def sheet_list(query=None, sort=None, skip=0, limit=None):
     sheets = db.sheets.find(query, projection).sort(sort).skip(skip)
     if limit:
         sheets = sheets.limit(limit)
+    sheets = list(sheets)
+    # Loads the owners for sheet_to_dict() together
+    public_user_data_bulk([s["owner"] for s in sheets])
 
     return [sheet_to_dict(s) for s in sheets]
 
@@ -916,6 +919,52 @@ def calculate_combined_score(
         return sheets
 
 
+def _annotate_sheets_for_ref(oref, segment_refs, sheets):
+    """
+    Gathers what get_sheets_for_ref() shows of each of `sheets` besides the sheet itself, with one query for each kind
+    of data across all the sheets, rather than queries per sheet:
+    the data of owners, assigners and "via" owners, the TOCs of displayed collections and the anchor refs.
+    Sets "assignerName", "assignerProfileUrl", "viaOwnerName", "viaOwnerProfileUrl" and "collectionTOC" on the sheets.
+    :return: list of (owner data, anchor ref list, anchor ref expanded list), one for each sheet
+    """
+    user_ids = list({s["owner"] for s in sheets})
+    django_user_profiles = User.objects.filter(id__in=user_ids).values('email','first_name','last_name','id')
+    user_profiles = {item['id']: item for item in django_user_profiles}
+    mongo_user_profiles = list(db.profiles.find({"id": {"$in": user_ids}},{"id":1,"slug":1,"profile_pic_url_small":1}))
+    mongo_user_profiles = {item['id']: item for item in mongo_user_profiles}
+    for profile in user_profiles:
+        try:
+            user_profiles[profile]["slug"] = mongo_user_profiles[profile]["slug"]
+        except:
+            user_profiles[profile]["slug"] = "/"
+
+        try:
+            user_profiles[profile]["profile_pic_url_small"] = mongo_user_profiles[profile].get("profile_pic_url_small", '')
+        except:
+            user_profiles[profile]["profile_pic_url_small"] = ""
+
+    other_users = public_user_data_bulk([s[k] for s in sheets for k in ("assigner_id", "viaOwner") if k in s])
+
+    collection_slugs = list({s["displayedCollection"] for s in sheets if "displayedCollection" in s})
+    collection_tocs = {c.slug: getattr(c, "toc", None) for c in CollectionSet({"slug": {"$in": collection_slugs}}, proj={"slug": 1, "toc": 1})} if collection_slugs else {}
+
+    anchor_refs = oref.get_all_anchor_refs_for_documents(segment_refs, [(s.get("includedRefs", []), s.get("expandedRefs", [])) for s in sheets])
+
+    annotations = []
+    for sheet, (anchor_ref_list, anchor_ref_expanded_list) in zip(sheets, anchor_refs):
+        ownerData = user_profiles.get(sheet["owner"], {'first_name': 'Ploni', 'last_name': 'Almoni', 'email': 'test@sefaria.org', 'slug': 'Ploni-Almoni', 'id': None, 'profile_pic_url_small': ''})
+        if "assigner_id" in sheet:
+            sheet["assignerName"] = other_users[sheet["assigner_id"]]["name"]
+            sheet["assignerProfileUrl"] = other_users[sheet["assigner_id"]]["profileUrl"]
+        if "viaOwner" in sheet:
+            sheet["viaOwnerName"] = other_users[sheet["viaOwner"]]["name"]
+            sheet["viaOwnerProfileUrl"] = other_users[sheet["viaOwner"]]["profileUrl"]
+        if "displayedCollection" in sheet:
+            sheet["collectionTOC"] = collection_tocs.get(sheet["displayedCollection"])
+        annotations.append((ownerData, anchor_ref_list, anchor_ref_expanded_list))
+    return annotations
+
+
 def get_sheets_for_ref(tref, uid=None, in_collection=None):
     """
     Returns a list of sheets that include ref,
@@ -943,39 +992,10 @@ def get_sheets_for_ref(tref, uid=None, in_collection=None):
     sheetsObj.hint("expandedRefs_1")
     sheets = [s for s in sheetsObj]
     sheets = calculate_combined_score(sheets, str(oref))
-    user_ids = list({s["owner"] for s in sheets})
-    django_user_profiles = User.objects.filter(id__in=user_ids).values('email','first_name','last_name','id')
-    user_profiles = {item['id']: item for item in django_user_profiles}
-    mongo_user_profiles = list(db.profiles.find({"id": {"$in": user_ids}},{"id":1,"slug":1,"profile_pic_url_small":1}))
-    mongo_user_profiles = {item['id']: item for item in mongo_user_profiles}
-    for profile in user_profiles:
-        try:
-            user_profiles[profile]["slug"] = mongo_user_profiles[profile]["slug"]
-        except:
-            user_profiles[profile]["slug"] = "/"
-
-        try:
-            user_profiles[profile]["profile_pic_url_small"] = mongo_user_profiles[profile].get("profile_pic_url_small", '')
-        except:
-            user_profiles[profile]["profile_pic_url_small"] = ""
+    annotations = _annotate_sheets_for_ref(oref, segment_refs, sheets)
 
     results = []
-    for sheet in sheets:
-        anchor_ref_list, anchor_ref_expanded_list = oref.get_all_anchor_refs(segment_refs, sheet.get("includedRefs", []), sheet.get("expandedRefs", []))
-        ownerData = user_profiles.get(sheet["owner"], {'first_name': 'Ploni', 'last_name': 'Almoni', 'email': 'test@sefaria.org', 'slug': 'Ploni-Almoni', 'id': None, 'profile_pic_url_small': ''})
-
-        if "assigner_id" in sheet:
-            asignerData = public_user_data(sheet["assigner_id"])
-            sheet["assignerName"] = asignerData["name"]
-            sheet["assignerProfileUrl"] = asignerData["profileUrl"]
-        if "viaOwner" in sheet:
-            viaOwnerData = public_user_data(sheet["viaOwner"])
-            sheet["viaOwnerName"] = viaOwnerData["name"]
-            sheet["viaOwnerProfileUrl"] = viaOwnerData["profileUrl"]
-
-        if "displayedCollection" in sheet:
-            collection = Collection().load({"slug": sheet["displayedCollection"]})
-            sheet["collectionTOC"] = getattr(collection, "toc", None)
+    for sheet, (ownerData, anchor_ref_list, anchor_ref_expanded_list) in zip(sheets, annotations):
         topics = add_langs_to_topics(sheet.get("topics", []))
         for anchor_ref, anchor_ref_expanded in zip(anchor_ref_list, anchor_ref_expanded_list):
             sheet_data = {
@@ -154,6 +154,23 @@ def set_shared_cache_elem(key, value, timeout=None):
     return set_cache_elem(key, value, timeout, cache_type=SHARED_DATA_CACHE_ALIAS)
 
 
+def get_shared_cache_elems(keys):
+    """
+    Retrieve several elements from the shared cache, in one round trip where the backend supports it.
+
+    Returns:
+        dict: {key: value} of the keys that were found.
+    """
+    return get_cache_factory(SHARED_DATA_CACHE_ALIAS).get_many(keys)
+
+
+def set_shared_cache_elems(data, timeout=None):
+    """
+    Set several elements, given as {key: value}, in the shared cache.
+    """
+    return get_cache_factory(SHARED_DATA_CACHE_ALIAS).set_many(data, timeout)
+
+
 def delete_cache_elem(key, cache_type=None):
     cache_instance = get_cache_factory(cache_type)
     if isinstance(key, (list, tuple)):
@@ -9,6 +9,7 @@ import urllib.parse
 from pymongo.errors import OperationFailure
 
 from sefaria.settings import *
+from sefaria.system import query_stats
 
 
 class QueryCounter(monitoring.CommandListener):
@@ -36,6 +37,21 @@ class QueryCounter(monitoring.CommandListener):
         cls.queries = []
         cls.tracked_commands = tracked_commands
 
+
+class QueryStatsListener(monitoring.CommandListener):
+    """
+    Feeds every command into `sefaria.system.query_stats`, which records it only inside a `record_queries()` block
+    """
+    def started(self, event):
+        query_stats.query_started(event.command_name, event.command)
+
+    def succeeded(self, event):
+        query_stats.query_finished(event.duration_micros)
+
+    def failed(self, event):
+        query_stats.query_finished(event.duration_micros)
+
+
 def check_db_exists(db_name):
     dbnames = client.list_database_names()
     return db_name in dbnames
@@ -57,7 +73,7 @@ else:
     TEST_DB = SEFARIA_DB
     
     #If we have jsut a single instance mongo (such as for development) the MONGO_HOST param should contain jsut the host string e.g "localhost")
-    _event_listeners = [QueryCounter()] if hasattr(sys, '_called_from_test') else []
+    _event_listeners = [QueryStatsListener()] + ([QueryCounter()] if hasattr(sys, '_called_from_test') else [])
 
     if MONGO_REPLICASET_NAME is None:
         if SEFARIA_DB_USER and SEFARIA_DB_PASSWORD:
@@ -127,6 +143,7 @@ def ensure_indices(active_db=None):
         ('history', ["title"],{}),
         ('index', ["title"],{}),
         ('index_queue', [[("lang", pymongo.ASCENDING), ("version", pymongo.ASCENDING), ("ref", pymongo.ASCENDING)]],{'unique': True}),
+        ('search_reindex_checkpoints', [[("index", pymongo.ASCENDING), ("title", pymongo.ASCENDING), ("lang", pymongo.ASCENDING)]],{'unique': True}),
         ('index', ["categories.0"], {}),
         ('index', ["order.0"], {}),
         ('index', ["order.1"], {}),
@@ -136,6 +153,7 @@ def ensure_indices(active_db=None):
         ('links', ["refs.1"],{}),
         ('links', ["expandedRefs0"],{}),
         ('links', ["expandedRefs1"],{}),
+        ('links', [[("orderIntervals.title", pymongo.ASCENDING), ("orderIntervals.start", pymongo.ASCENDING), ("orderIntervals.end", pymongo.ASCENDING)]],{}),
         ('links', ["source_text_oid"],{}),
         ('links', ["is_first_comment"],{}),
         ('links', ["inline_citation"],{}),
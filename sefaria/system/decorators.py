@@ -6,6 +6,7 @@ from django.shortcuts import render
 
 from sefaria.client.util import jsonResponse
 import sefaria.system.exceptions as exps
+from sefaria.system.query_stats import record_queries
 import sefaria.settings
 
 import collections
@@ -124,6 +125,31 @@ def conditional_graceful_exception(logLevel: str = "exception", exception_type:
     return argumented_decorator
 
 
+def query_budget(max_queries, methods=("GET",)):
+    """
+    Declares the most Mongo commands a view should issue per request.
+    Requests over budget are logged with the repeated query shapes that contributed to them.
+    Tests enforce the budget with `sefaria.utils.testing_utils.assert_within_query_budget()`
+
+    :param max_queries: int
+    :param methods: HTTP methods the budget applies to
+    """
+    def argumented_decorator(func):
+        @wraps(func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                return func(request, *args, **kwargs)
+            with record_queries() as stats:
+                response = func(request, *args, **kwargs)
+            if stats.count > max_queries:
+                logger.warning("mongo_query_budget_exceeded", view=func.__name__, path=request.path, query_budget=max_queries,
+                               repeated_queries=stats.repeated_queries(), **stats.summary())
+            return response
+        wrapper.query_budget = max_queries
+        return wrapper
+    return argumented_decorator
+
+
 class memoized(object):
     """Decorator. Caches a function's return value each time it is called.
     If called later with the same arguments, the cached value is returned
@@ -21,6 +21,7 @@ from sefaria.utils.util import short_to_long_lang_code, get_lang_codes_for_terri
 from sefaria.utils.views_utils import add_query_param
 from sefaria.utils.domains_and_languages import current_domain_lang, get_redirect_domain_for_language, needs_domain_switch, get_cookie_domain, get_hostname_without_port
 from sefaria.system.cache import get_shared_cache_elem, set_shared_cache_elem
+from sefaria.system.query_stats import record_queries
 from django.utils.deprecation import MiddlewareMixin
 from urllib.parse import quote, urljoin
 from sefaria.constants.model import LIBRARY_MODULE
@@ -400,6 +401,7 @@ class ProfileMiddleware(MiddlewareMixin):
     and you'll see the profiling results in your browser.
     It's set up to only be available in django's debug mode,
     but you really shouldn't add this middleware to any production configuration.
+    To profile under production load, use the sampling profiler at /admin/profiler/ (sefaria/profiler.py).
     * Only tested on Linux
     """
     def process_request(self, request):
@@ -449,6 +451,27 @@ class MaxRSSMiddleware:
         return response
 
 
+class QueryStatsMiddleware:
+    """
+    Records the Mongo commands issued while handling each request and binds their count, total time and
+    breakdown by collection to structlog so they appear in the request_finished log.
+    Query shapes issued repeatedly within the request (the N+1 pattern) are logged as `repeated_mongo_query`
+    with the stack that issued them.  See `sefaria.system.query_stats`
+
+    Like MaxRSSMiddleware, must be placed after django_structlog's RequestMiddleware in MIDDLEWARE.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with record_queries() as stats:
+            response = self.get_response(request)
+        logger.bind(**stats.summary())
+        for repeated in stats.repeated_queries():
+            logger.warning("repeated_mongo_query", path=request.path, **repeated)
+        return response
+
+
 class ModuleMiddleware(MiddlewareURLMixin):
     excluded_url_prefixes = {
         '/linker.js',
@@ -0,0 +1,306 @@
+"""
+mmap_table.py
+
+A small fixed-size hash table stored in a memory-mapped file, so that every process on a host
+(gunicorn workers, celery workers) can share entries that are expensive to compute but cheap to store.
+
+Keys are strings, values are short byte strings.  Each entry also records a "group" (e.g. an index title),
+so that all entries belonging to a group can be invalidated together.  The table header carries a `stamp`
+(e.g. `library.last_cached`); a process whose stamp doesn't match the table's either resets the table
+(if its stamp is newer) or stays away from it (if its stamp is older).
+
+Readers don't take a lock.  Every slot carries a checksum of its contents, so a read that races a write
+is detected and treated as a miss.  Writers serialize on a POSIX record lock on the backing file (which,
+unlike flock, is not shared between a parent and its forked children).
+"""
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import zlib
+
+import structlog
+logger = structlog.get_logger(__name__)
+
+
+class SharedMmapTable(object):
+    MAGIC = b"SMTB"
+    VERSION = 1
+
+    # magic, version, slot_count, slot_size, stamp, stores, evictions, invalidations
+    HEADER = struct.Struct("<4sIIIdQQQ")
+    HEADER_SIZE = 64
+
+    # key hash, group hash, checksum, key length, value length
+    SLOT_HEADER = struct.Struct("<QIIHH")
+
+    EMPTY = 0
+    TOMBSTONE = 1
+    MAX_PROBE = 8
+
+    def __init__(self, path, slot_count=65536, slot_size=256):
+        """
+        :param path: Location of the backing file, to which the table's shape is appended, so that processes configured
+        with different shapes (e.g. during a rolling deploy) use separate files.  Use a tmpfs location (e.g. /dev/shm) in production.
+        :param slot_count: Number of entries the table can hold
+        :param slot_size: Size in bytes of each entry.  Entries whose key and value don't fit are not stored.
+        """
+        self.path = path
+        self.slot_count = slot_count
+        self.slot_size = slot_size
+        self.file_path = "{}.v{}.{}x{}".format(path, self.VERSION, slot_count, slot_size)
+        self.max_entry_size = slot_size - self.SLOT_HEADER.size
+        self._thread_lock = threading.Lock()
+        self._fd = None
+        self._mm = None
+
+        # Counters local to this process.  Shared counters are kept in the table header.  See `stats()`
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+        self._open()
+
+    def _open(self):
+        """
+        Maps the backing file, initializing it if it's new.  A file that other processes may have mapped is never
+        resized or rewritten in place, which would crash them (SIGBUS) or have them read garbage.  A file of the wrong
+        size or header is replaced with a new one instead, and those processes keep the old one until they reopen.
+        """
+        size = self.HEADER_SIZE + self.slot_count * self.slot_size
+        while True:
+            self._fd = os.open(self.file_path, os.O_RDWR | os.O_CREAT, 0o644)
+            with self._write_lock():
+                if os.fstat(self._fd).st_ino == os.stat(self.file_path).st_ino:
+                    current_size = os.fstat(self._fd).st_size
+                    if current_size == 0:
+                        # Just created, so nobody has mapped it yet
+                        logger.info("Initializing shared table", path=self.file_path, slot_count=self.slot_count, slot_size=self.slot_size)
+                        self._initialize(self._fd, size)
+                    elif current_size != size or not self._header_matches(os.pread(self._fd, self.HEADER.size, 0)):
+                        logger.info("Replacing shared table", path=self.file_path, slot_count=self.slot_count, slot_size=self.slot_size)
+                        self._replace_file(size)
+                    else:
+                        self._mm = mmap.mmap(self._fd, size, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+                        return
+            # The file was replaced, by us or by another process while we waited for the lock.  Open the new one.
+            os.close(self._fd)
+
+    def _initialize(self, fd, size):
+        os.ftruncate(fd, size)
+        os.pwrite(fd, self.HEADER.pack(self.MAGIC, self.VERSION, self.slot_count, self.slot_size, 0.0, 0, 0, 0), 0)
+
+    def _replace_file(self, size):
+        tmp_path = "{}.{}.tmp".format(self.file_path, os.getpid())
+        fd = os.open(tmp_path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            self._initialize(fd, size)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, self.file_path)
+
+    def _header_matches(self, header):
+        if len(header) < self.HEADER.size:
+            return False
+        magic, version, slot_count, slot_size = self.HEADER.unpack(header)[:4]
+        return magic == self.MAGIC and version == self.VERSION and slot_count == self.slot_count and slot_size == self.slot_size
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    class _WriteLock(object):
+        def __init__(self, table):
+            self.table = table
+
+        def __enter__(self):
+            self.table._thread_lock.acquire()
+            fcntl.lockf(self.table._fd, fcntl.LOCK_EX)
+
+        def __exit__(self, *args):
+            fcntl.lockf(self.table._fd, fcntl.LOCK_UN)
+            self.table._thread_lock.release()
+
+    def _write_lock(self):
+        return self._WriteLock(self)
+
+    @staticmethod
+    def _hash(s):
+        """
+        A hash that is stable across processes (unlike the builtin `hash()`) and never collides with the EMPTY or TOMBSTONE markers.
+        """
+        h = int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little")
+        return h if h > SharedMmapTable.TOMBSTONE else h + 2
+
+    @staticmethod
+    def _group_hash(group):
+        return zlib.crc32(group.encode("utf-8")) if group else 0
+
+    def _slot_offset(self, i):
+        return self.HEADER_SIZE + i * self.slot_size
+
+    def _probe(self, key_hash):
+        start = key_hash % self.slot_count
+        for i in range(self.MAX_PROBE):
+            yield (start + i) % self.slot_count
+
+    """ Header """
+    def _read_header(self):
+        return self.HEADER.unpack_from(self._mm, 0)
+
+    @property
+    def stamp(self):
+        return self._read_header()[4]
+
+    def _write_counters(self, stamp=None, stores=0, evictions=0, invalidations=0):
+        magic, version, slot_count, slot_size, old_stamp, old_stores, old_evictions, old_invalidations = self._read_header()
+        self.HEADER.pack_into(self._mm, 0, magic, version, slot_count, slot_size,
+                              old_stamp if stamp is None else stamp,
+                              old_stores + stores, old_evictions + evictions, old_invalidations + invalidations)
+
+    def check_stamp(self, stamp):
+        """
+        Compare `stamp` with the table's stamp.  If `stamp` is newer, the table is cleared and takes on the new stamp.
+        :return bool: True if the table can be used by a process holding `stamp`
+        """
+        current = self.stamp
+        if current == stamp:
+            return True
+        if stamp is None or stamp < current:
+            self.stale += 1
+            return False
+        with self._write_lock():
+            if self.stamp < stamp:
+                self._clear(stamp)
+        return self.stamp == stamp
+
+    def _clear(self, stamp):
+        chunk = b"\x00" * (self.slot_size * 1024)
+        end = self.HEADER_SIZE + self.slot_count * self.slot_size
+        for offset in range(self.HEADER_SIZE, end, len(chunk)):
+            n = min(len(chunk), end - offset)
+            self._mm[offset:offset + n] = chunk[:n]
+        self._write_counters(stamp=stamp)
+
+    def clear(self, stamp=None):
+        with self._write_lock():
+            self._clear(self.stamp if stamp is None else stamp)
+
+    """ Entries """
+    def _read_slot(self, i):
+        offset = self._slot_offset(i)
+        key_hash, group_hash, checksum, key_len, value_len = self.SLOT_HEADER.unpack_from(self._mm, offset)
+        if key_hash <= self.TOMBSTONE or key_len + value_len > self.max_entry_size:
+            return key_hash, group_hash, None, None
+        body_start = offset + self.SLOT_HEADER.size
+        body = self._mm[body_start:body_start + key_len + value_len]
+        if zlib.crc32(body) != checksum:
+            return key_hash, group_hash, None, None
+        return key_hash, group_hash, body[:key_len], body[key_len:]
+
+    def get(self, key):
+        """
+        :param str key:
+        :return bytes: The value stored for `key`, or None
+        """
+        key_hash = self._hash(key)
+        key_bytes = key.encode("utf-8")
+        for i in self._probe(key_hash):
+            slot_hash, _, slot_key, value = self._read_slot(i)
+            if slot_hash == self.EMPTY:
+                break
+            if slot_hash == key_hash and slot_key == key_bytes:
+                self.hits += 1
+                return value
+        self.misses += 1
+        return None
+
+    def set(self, key, value, group=None):
+        """
+        :param str key:
+        :param bytes value:
+        :param str group: Entries can be invalidated together by group.  See `invalidate_group()`
+        :return bool: True if the entry was stored
+        """
+        key_bytes = key.encode("utf-8")
+        if len(key_bytes) + len(value) > self.max_entry_size:
+            return False
+        key_hash = self._hash(key)
+        body = key_bytes + value
+
+        with self._write_lock():
+            target = None
+            evicting = False
+            for i in self._probe(key_hash):
+                slot_hash, _, slot_key, _ = self._read_slot(i)
+                if slot_hash == key_hash and slot_key == key_bytes:
+                    target = i
+                    break
+                if slot_hash <= self.TOMBSTONE and target is None:
+                    target = i
+                    if slot_hash == self.EMPTY:
+                        break
+            if target is None:
+                # All candidate slots are taken.  Evict the entry in the home slot.
+                target = key_hash % self.slot_count
+                evicting = True
+
+            offset = self._slot_offset(target)
+            # Mark the slot empty while the body is being written, so readers don't match a half-written entry
+            self.SLOT_HEADER.pack_into(self._mm, offset, self.TOMBSTONE, 0, 0, 0, 0)
+            body_start = offset + self.SLOT_HEADER.size
+            self._mm[body_start:body_start + len(body)] = body
+            self.SLOT_HEADER.pack_into(self._mm, offset, key_hash, self._group_hash(group), zlib.crc32(body), len(key_bytes), len(value))
+            self._write_counters(stores=1, evictions=int(evicting))
+        return True
+
+    def invalidate_group(self, group):
+        """
+        Remove every entry stored with `group`
+        :return int: Number of entries removed
+        """
+        group_hash = self._group_hash(group)
+        removed = 0
+        with self._write_lock():
+            for i in range(self.slot_count):
+                offset = self._slot_offset(i)
+                slot_hash, slot_group_hash = struct.unpack_from("<QI", self._mm, offset)
+                if slot_hash > self.TOMBSTONE and slot_group_hash == group_hash:
+                    self.SLOT_HEADER.pack_into(self._mm, offset, self.TOMBSTONE, 0, 0, 0, 0)
+                    removed += 1
+            self._write_counters(invalidations=removed)
+        return removed
+
+    def occupancy(self):
+        """
+        :return int: Number of live entries.  Walks the whole table, so don't call on a hot path.
+        """
+        return sum(1 for i in range(self.slot_count) if struct.unpack_from("<Q", self._mm, self._slot_offset(i))[0] > self.TOMBSTONE)
+
+    def stats(self, with_occupancy=False):
+        """
+        `hits`, `misses` and `stale` (lookups skipped because this process's stamp is older than the table's) are counted per process.
+        `stores`, `evictions` and `invalidations` are counted across all processes sharing the table.
+        """
+        stamp, stores, evictions, invalidations = self._read_header()[4:]
+        d = {
+            "path": self.file_path,
+            "slot_count": self.slot_count,
+            "slot_size": self.slot_size,
+            "stamp": stamp,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "stores": stores,
+            "evictions": evictions,
+            "invalidations": invalidations,
+        }
+        if with_occupancy:
+            d["occupancy"] = self.occupancy()
+        return d
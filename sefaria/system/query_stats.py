@@ -0,0 +1,149 @@
+"""
+query_stats.py
+
+Per-request statistics on the Mongo commands a process issues: how many, how long they took, which collections they hit,
+and which query shapes were repeated (the N+1 pattern, e.g. one `find` per item of a list).
+
+Commands are fed in by `sefaria.system.database.QueryStatsListener`, which is registered on the Mongo client.
+Commands are only recorded inside a `record_queries()` block.  See `sefaria.system.middleware.QueryStatsMiddleware`
+and `sefaria.system.decorators.query_budget`.
+
+    with record_queries() as stats:
+        TextChunk(Ref("Genesis 1"), "en")
+    print(stats.report())
+"""
+import contextvars
+import json
+import os
+import traceback
+from collections import Counter
+from contextlib import contextmanager
+
+_active_stats = contextvars.ContextVar("mongo_query_stats", default=None)
+
+# Frames from these directories are left out of the stacks recorded for repeated queries
+_SKIPPED_FRAME_PATHS = (os.sep + "pymongo" + os.sep, os.path.abspath(__file__), os.path.join("sefaria", "system", "database.py"))
+
+
+def _shape(value):
+    if isinstance(value, dict):
+        return {k: _shape(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        shapes = []
+        for v in value:
+            s = _shape(v)
+            if s not in shapes:
+                shapes.append(s)
+        return shapes
+    return "?"
+
+
+def query_shape(command_name, command):
+    """
+    The command with every literal value replaced by "?", so that queries which differ only by their values have the same shape
+    :return: str
+    """
+    if command_name in ("update", "delete"):
+        statements = command.get(command_name + "s") or [{}]
+        query = statements[0].get("q")
+    else:
+        query = next((command[k] for k in ("filter", "pipeline", "query") if k in command), None)
+    return "{} {} {}".format(command_name, command.get(command_name), json.dumps(_shape(query), sort_keys=True))
+
+
+def _caller_stack(limit):
+    frames = [f for f in traceback.extract_stack()[:-1] if not any(p in f.filename for p in _SKIPPED_FRAME_PATHS)]
+    return "".join(traceback.format_list(frames[-limit:]))
+
+
+class QueryStats(object):
+    # A query shape issued this many times in one request is reported as repeated
+    REPEATED_QUERY_THRESHOLD = 10
+    # Number of frames kept in the stack recorded for a repeated query
+    STACK_LIMIT = 12
+    # Commands that legitimately repeat (e.g. fetching further batches of one cursor) aren't checked for repeats
+    UNSHAPED_COMMANDS = {"getMore", "killCursors", "endSessions", "insert"}
+
+    def __init__(self, parent=None, repeated_query_threshold=None):
+        self.parent = parent
+        self.repeated_query_threshold = repeated_query_threshold or self.REPEATED_QUERY_THRESHOLD
+        self.count = 0
+        self.time_ms = 0.0
+        self.collections = Counter()
+        self.shapes = Counter()
+        self.stacks = {}
+
+    def record_started(self, command_name, collection, shape):
+        self.count += 1
+        if isinstance(collection, str):
+            self.collections[collection] += 1
+        if shape is None:
+            return
+        self.shapes[shape] += 1
+        if self.shapes[shape] == self.repeated_query_threshold:
+            self.stacks[shape] = _caller_stack(self.STACK_LIMIT)
+
+    def record_finished(self, duration_micros):
+        self.time_ms += duration_micros / 1000.0
+
+    def repeated_queries(self):
+        """
+        :return: list of dicts with the `query` shape, the number of times it was issued and the `stack` that issued it, most repeated first
+        """
+        return [{"query": shape, "count": n, "stack": self.stacks.get(shape)}
+                for shape, n in self.shapes.most_common() if n >= self.repeated_query_threshold]
+
+    def summary(self):
+        """
+        :return: dict of fields for the request log
+        """
+        return {
+            "mongo_queries": self.count,
+            "mongo_time_ms": round(self.time_ms, 1),
+            "mongo_collections": dict(self.collections),
+            "mongo_repeated_queries": sum(1 for n in self.shapes.values() if n >= self.repeated_query_threshold),
+        }
+
+    def report(self):
+        """
+        :return: str, human readable account of the recorded commands, for test failures
+        """
+        lines = ["{} Mongo commands in {:.1f} ms".format(self.count, self.time_ms)]
+        lines += ["  {}: {}".format(collection, n) for collection, n in self.collections.most_common()]
+        for repeated in self.repeated_queries():
+            lines.append("Repeated {} times: {}".format(repeated["count"], repeated["query"]))
+            if repeated["stack"]:
+                lines.append(repeated["stack"])
+        return "\n".join(lines)
+
+
+@contextmanager
+def record_queries(repeated_query_threshold=None):
+    """
+    Records the Mongo commands issued in this context.  Blocks can be nested.  Commands are recorded in every enclosing block.
+    :return: :class:`QueryStats`
+    """
+    stats = QueryStats(parent=_active_stats.get(), repeated_query_threshold=repeated_query_threshold)
+    token = _active_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _active_stats.reset(token)
+
+
+def query_started(command_name, command):
+    stats = _active_stats.get()
+    if stats is None:
+        return
+    collection = command.get(command_name)
+    shape = None if command_name in QueryStats.UNSHAPED_COMMANDS else query_shape(command_name, command)
+    while stats is not None:
+        stats.record_started(command_name, collection, shape)
+        stats = stats.parent
+
+
+def query_finished(duration_micros):
+    stats = _active_stats.get()
+    while stats is not None:
+        stats.record_finished(duration_micros)
+        stats = stats.parent
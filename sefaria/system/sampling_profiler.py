@@ -0,0 +1,190 @@
+"""
+sampling_profiler.py
+
+A statistical profiler that is cheap enough to leave on under production load.
+
+A background thread wakes every `interval` seconds, reads the current stack of every other thread in the process
+with `sys._current_frames()` and counts it.  Nothing is hooked into the profiled code, so its overhead is the cost
+of one walk over the live stacks per interval, independent of how much work the threads do.  Stacks are aggregated
+across requests and exported in the collapsed format read by flamegraph.pl and speedscope:
+
+    reader.views:texts_api;sefaria.model.text:TextFamily.__init__;... 42
+
+Sampling is started in each worker by `poll_remote_config()` when the `SAMPLING_PROFILER_KEY` remote config entry
+asks for it, or on demand with `profiler.start()`.  See `sefaria.profiler.profiler_view`.
+"""
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+import structlog
+logger = structlog.get_logger(__name__)
+
+
+class SamplingProfiler(object):
+    DEFAULT_INTERVAL = 0.01
+    # Unique stacks kept.  Samples of further stacks are counted under TRUNCATED.
+    MAX_STACKS = 50000
+    TRUNCATED = "[truncated]"
+    # A thread whose innermost frame is one of these is waiting for work, not doing any.  Its samples are dropped.
+    IDLE_FUNCTIONS = {("threading", "wait"), ("threading", "_wait_for_tstate_lock"), ("selectors", "select"), ("selectors", "poll"), ("socket", "accept"),
+                      ("queue", "get"), ("concurrent.futures.thread", "_worker"), (__name__, "poll")}
+
+    def __init__(self):
+        self.counts = Counter()
+        self.samples = 0
+        self.interval = self.DEFAULT_INTERVAL
+        self.started_at = None
+        self.until = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, duration=None, interval=None):
+        """
+        Start sampling in a background thread.  Samples are added to those already collected.  See `reset()`
+        :param duration: Seconds to sample for.  If None, sample until `stop()`
+        :param interval: Seconds between samples
+        :return bool: False if already running
+        """
+        with self._lock:
+            if self.is_running():
+                return False
+            self.interval = interval or self.DEFAULT_INTERVAL
+            self.started_at = time.time()
+            self.until = self.started_at + duration if duration else None
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+            self._thread.start()
+        logger.info("Started sampling profiler", pid=os.getpid(), interval=self.interval, until=self.until)
+        return True
+
+    def stop(self):
+        thread = self._thread
+        self._stop.set()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def join(self, timeout=None):
+        """
+        Wait for a run started with a `duration` to finish
+        """
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def reset(self):
+        with self._lock:
+            self.counts = Counter()
+            self.samples = 0
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if self.until is not None and time.time() >= self.until:
+                break
+            self.sample()
+        logger.info("Stopped sampling profiler", pid=os.getpid(), samples=self.samples)
+
+    def sample(self):
+        """
+        Count the current stack of every thread but this one
+        """
+        own = threading.get_ident()
+        stacks = [self.collapse(frame) for ident, frame in sys._current_frames().items() if ident != own]
+        with self._lock:
+            self.samples += 1
+            for stack in stacks:
+                if stack is None:
+                    continue
+                if stack not in self.counts and len(self.counts) >= self.MAX_STACKS:
+                    stack = self.TRUNCATED
+                self.counts[stack] += 1
+
+    @classmethod
+    def collapse(cls, frame):
+        """
+        :return: str, the stack of `frame`, outermost frame first, as `module:function` joined by semicolons.  None for idle threads.
+        """
+        if (frame.f_globals.get("__name__"), frame.f_code.co_name) in cls.IDLE_FUNCTIONS:
+            return None
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append("{}:{}".format(frame.f_globals.get("__name__", "?"), getattr(code, "co_qualname", code.co_name)))
+            frame = frame.f_back
+        names.reverse()
+        return ";".join(names)
+
+    def collapsed(self):
+        """
+        :return: str, one line per unique stack with its sample count, most sampled first
+        """
+        with self._lock:
+            items = self.counts.most_common()
+        return "".join("{} {}\n".format(stack, n) for stack, n in items)
+
+    def status(self):
+        return {
+            "pid": os.getpid(),
+            "running": self.is_running(),
+            "interval": self.interval,
+            "started_at": self.started_at,
+            "until": self.until,
+            "samples": self.samples,
+            "stacks": len(self.counts),
+        }
+
+
+profiler = SamplingProfiler()
+# True while `profiler` runs because of the remote config entry, rather than on demand
+_started_by_config = False
+
+
+def apply_config(config, worker_id=None):
+    """
+    Start or stop `profiler` to follow a `SAMPLING_PROFILER_KEY` remote config value, e.g.
+        {"until": 1760000000, "interval_ms": 10, "worker_fraction": 0.25}
+    `until` is a unix timestamp.  Sampling runs until then in the given fraction of workers (all, by default).
+    :param config: dict, or None if the entry is missing or inactive
+    :param worker_id: Decides whether this worker is in the fraction.  Defaults to the pid.
+    """
+    global _started_by_config
+    until = (config or {}).get("until")
+    if not until or until <= time.time() or random.Random(worker_id or os.getpid()).random() >= config.get("worker_fraction", 1):
+        if _started_by_config and profiler.is_running():
+            profiler.stop()
+        _started_by_config = False
+        return
+    if _started_by_config and profiler.is_running():
+        profiler.until = until
+    elif profiler.start(duration=until - time.time(), interval=config.get("interval_ms", 10) / 1000.0):
+        _started_by_config = True
+
+
+def poll_remote_config(poll_seconds=30):
+    """
+    Start a background thread that applies the `SAMPLING_PROFILER_KEY` remote config entry every `poll_seconds`.
+    The entry is read from the database rather than `remoteConfigCache`, which is only reloaded in the process that saved the entry.
+    Call once in each worker.  See `reader.startup.after_fork()`
+    """
+    def poll():
+        from django.db import connection
+        from remote_config.keys import SAMPLING_PROFILER_KEY
+        from remote_config.models import RemoteConfigEntry
+        while True:
+            try:
+                entry = RemoteConfigEntry.objects.filter(key=SAMPLING_PROFILER_KEY, is_active=True).first()
+                apply_config(entry.parse_value() if entry else None)
+            except Exception as e:
+                logger.warning("Failed to apply sampling profiler config", error=str(e))
+            finally:
+                connection.close()
+            time.sleep(poll_seconds)
+
+    threading.Thread(target=poll, name="sampling-profiler-config", daemon=True).start()
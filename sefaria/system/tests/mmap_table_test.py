@@ -0,0 +1,87 @@
+import os
+
+import pytest
+
+from sefaria.system.mmap_table import SharedMmapTable
+
+
+@pytest.fixture
+def table(tmp_path):
+    t = SharedMmapTable(str(tmp_path / "table"), slot_count=16, slot_size=64)
+    t.check_stamp(100.0)
+    yield t
+    t.close()
+
+
+def test_get_and_set(table):
+    assert table.get("Genesis 1:1") is None
+    assert table.set("Genesis 1:1", b"value")
+    assert table.get("Genesis 1:1") == b"value"
+    assert table.set("Genesis 1:1", b"other")
+    assert table.get("Genesis 1:1") == b"other"
+    stats = table.stats(with_occupancy=True)
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["occupancy"] == 1
+
+
+def test_oversized_entries_are_not_stored(table):
+    assert not table.set("key", b"x" * 64)
+    assert table.get("key") is None
+
+
+def test_eviction_is_counted(table):
+    for i in range(40):
+        table.set("key {}".format(i), b"v")
+    stats = table.stats(with_occupancy=True)
+    assert stats["occupancy"] == 16
+    assert stats["evictions"] == 24
+    assert table.get("key 39") == b"v"
+
+
+def test_invalidate_group(table):
+    table.set("Genesis 1:1", b"1", group="Genesis")
+    table.set("Genesis 1:2", b"2", group="Genesis")
+    table.set("Exodus 1:1", b"3", group="Exodus")
+    assert table.invalidate_group("Genesis") == 2
+    assert table.get("Genesis 1:1") is None
+    assert table.get("Genesis 1:2") is None
+    assert table.get("Exodus 1:1") == b"3"
+    # a tombstone doesn't end the probe sequence
+    table.set("Genesis 1:1", b"4", group="Genesis")
+    assert table.get("Genesis 1:1") == b"4"
+
+
+def test_shared_between_handles_and_stamps(table, tmp_path):
+    table.set("Genesis 1:1", b"1")
+    other = SharedMmapTable(str(tmp_path / "table"), slot_count=16, slot_size=64)
+    assert other.get("Genesis 1:1") == b"1"
+
+    # an older stamp can't use the table, a newer one clears it
+    assert not other.check_stamp(50.0)
+    assert other.check_stamp(200.0)
+    assert table.get("Genesis 1:1") is None
+    assert not table.check_stamp(100.0)
+    other.close()
+
+
+def test_shape_change_uses_another_file(table, tmp_path):
+    table.set("Genesis 1:1", b"1")
+    other = SharedMmapTable(str(tmp_path / "table"), slot_count=32, slot_size=64)
+    assert other.file_path != table.file_path
+    assert other.get("Genesis 1:1") is None
+    # The table with the old shape is untouched
+    assert table.get("Genesis 1:1") == b"1"
+    other.close()
+
+
+def test_bad_file_is_replaced_not_rewritten(table, tmp_path):
+    table.set("Genesis 1:1", b"1")
+    with open(table.file_path, "r+b") as f:
+        f.write(b"XXXX")
+    other = SharedMmapTable(str(tmp_path / "table"), slot_count=16, slot_size=64)
+    assert other.get("Genesis 1:1") is None
+    assert os.fstat(other._fd).st_ino != os.fstat(table._fd).st_ino
+    # A process that has the old file mapped can still read it
+    assert table.get("Genesis 1:1") == b"1"
+    other.close()
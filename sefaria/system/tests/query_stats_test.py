@@ -0,0 +1,47 @@
+from sefaria.system import query_stats
+from sefaria.system.query_stats import QueryStats, query_shape, record_queries
+
+
+def find(collection, filter):
+    query_stats.query_started("find", {"find": collection, "filter": filter, "limit": 1})
+    query_stats.query_finished(500)
+
+
+def test_query_shape():
+    assert query_shape("find", {"find": "texts", "filter": {"title": "Genesis"}}) == \
+        query_shape("find", {"find": "texts", "filter": {"title": "Exodus"}})
+    assert query_shape("find", {"find": "texts", "filter": {"title": {"$in": ["Genesis", "Exodus"]}}}) == \
+        query_shape("find", {"find": "texts", "filter": {"title": {"$in": ["Leviticus"]}}})
+    assert query_shape("find", {"find": "texts", "filter": {"title": "Genesis"}}) != \
+        query_shape("find", {"find": "index", "filter": {"title": "Genesis"}})
+    assert query_shape("update", {"update": "texts", "updates": [{"q": {"_id": 1}, "u": {"$set": {"a": 1}}}]}) == \
+        query_shape("update", {"update": "texts", "updates": [{"q": {"_id": 2}, "u": {"$set": {"a": 2}}}]})
+
+
+def test_record_queries():
+    find("texts", {"title": "Genesis"})  # Not recorded outside of a block
+    with record_queries(repeated_query_threshold=3) as outer:
+        find("index", {"title": "Genesis"})
+        with record_queries(repeated_query_threshold=3) as inner:
+            for i in range(3):
+                find("texts", {"title": str(i)})
+    assert outer.count == 4
+    assert inner.count == 3
+    assert outer.collections == {"index": 1, "texts": 3}
+    assert outer.summary() == {"mongo_queries": 4, "mongo_time_ms": 2.0, "mongo_collections": {"index": 1, "texts": 3}, "mongo_repeated_queries": 1}
+
+    repeated = inner.repeated_queries()
+    assert len(repeated) == 1
+    assert repeated[0]["count"] == 3
+    assert repeated[0]["query"].startswith("find texts")
+    assert "test_record_queries" in repeated[0]["stack"]
+    assert "Repeated 3 times" in inner.report()
+
+
+def test_unshaped_commands():
+    with record_queries(repeated_query_threshold=2) as stats:
+        for i in range(3):
+            query_stats.query_started("getMore", {"getMore": 1234, "collection": "texts"})
+    assert stats.count == 3
+    assert stats.repeated_queries() == []
+    assert QueryStats.REPEATED_QUERY_THRESHOLD > 2
@@ -0,0 +1,56 @@
+import threading
+import time
+
+from sefaria.system import sampling_profiler
+from sefaria.system.sampling_profiler import SamplingProfiler
+
+
+def busy_loop(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sample_and_collapse():
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_loop, args=(stop,))
+    worker.start()
+    try:
+        profiler = SamplingProfiler()
+        for _ in range(20):
+            profiler.sample()
+    finally:
+        stop.set()
+        worker.join()
+
+    assert profiler.samples == 20
+    busy = [stack for stack in profiler.counts if "busy_loop" in stack]
+    assert busy
+    assert busy[0].startswith("threading:Thread._bootstrap")
+    for line in profiler.collapsed().splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0
+        assert " " not in stack
+
+
+def test_start_for_duration():
+    profiler = SamplingProfiler()
+    assert profiler.start(duration=0.1, interval=0.005)
+    assert not profiler.start()
+    profiler.join(timeout=5)
+    assert not profiler.is_running()
+    assert profiler.samples > 0
+    profiler.reset()
+    assert profiler.samples == 0 and not profiler.counts
+
+
+def test_apply_config():
+    profiler = sampling_profiler.profiler
+    try:
+        sampling_profiler.apply_config({"until": time.time() + 60, "interval_ms": 5})
+        assert profiler.is_running()
+        sampling_profiler.apply_config({"until": time.time() + 60, "worker_fraction": 0}, worker_id=1)
+        assert not profiler.is_running()
+        sampling_profiler.apply_config(None)
+        assert not profiler.is_running()
+    finally:
+        profiler.stop()
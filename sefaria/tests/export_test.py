@@ -0,0 +1,141 @@
+import gzip
+import hashlib
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from sefaria import export
+from sefaria.export import ExportManifest, write_export_file, link_ref_book, segment_order_id
+from sefaria.model import Ref
+
+
+@pytest.fixture
+def export_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(export, "SEFARIA_EXPORT_PATH", str(tmp_path))
+    return tmp_path
+
+
+def write(path, content="text"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+    return path
+
+
+class Test_write_export_file(object):
+
+    @pytest.mark.parametrize("compression,suffix,read", [
+        (None, "", lambda path: open(path, "rb").read()),
+        ("gzip", ".gz", lambda path: gzip.open(path).read()),
+    ])
+    def test_write(self, tmp_path, compression, suffix, read):
+        path, checksum = write_export_file(str(tmp_path / "json" / "Genesis.json"), ["{", '"a": "בראשית"', "}"], compression)
+        assert path == str(tmp_path / "json" / "Genesis.json") + suffix
+        content = '{"a": "בראשית"}'.encode("utf-8")
+        assert read(path) == content
+        assert checksum == hashlib.sha256(content).hexdigest()
+        assert os.listdir(str(tmp_path / "json")) == [os.path.basename(path)]
+
+    def test_zstd(self, tmp_path):
+        zstandard = pytest.importorskip("zstandard")
+        path, _ = write_export_file(str(tmp_path / "Genesis.txt"), ["line 1\n", "line 2\n"], "zstd")
+        assert path.endswith(".txt.zst")
+        with open(path, "rb") as f:
+            assert zstandard.ZstdDecompressor().stream_reader(f).read() == b"line 1\nline 2\n"
+
+    def test_failed_write_leaves_no_file(self, tmp_path):
+        def chunks():
+            yield "partial"
+            raise IOError("disk full")
+        with pytest.raises(IOError):
+            write_export_file(str(tmp_path / "Genesis.txt"), chunks())
+        assert os.listdir(str(tmp_path)) == []
+
+
+class Test_ExportManifest(object):
+    fingerprint = [["5f1"], "index hash", None]
+
+    def test_unchanged(self, export_path):
+        path = write(str(export_path / "json" / "Genesis.json"))
+        manifest = ExportManifest("texts")
+        key = ExportManifest.key("Genesis", "en", "Tanakh")
+        exported_at = datetime(2026, 1, 1)
+        manifest.record(key, self.fingerprint, exported_at, {path: "sha"})
+        manifest.save()
+
+        manifest = ExportManifest("texts")
+        assert manifest.since() == exported_at
+        assert manifest.unchanged(key, self.fingerprint)
+        assert manifest.unchanged(key, self.fingerprint, changed_at=exported_at - timedelta(days=1))
+        assert not manifest.unchanged(key, [["5f2"], "index hash", None])
+        assert not manifest.unchanged(key, self.fingerprint, changed_at=exported_at + timedelta(minutes=1))
+        assert not manifest.unchanged(ExportManifest.key("Exodus", "en", "Tanakh"), self.fingerprint)
+        os.remove(path)
+        assert not manifest.unchanged(key, self.fingerprint)
+
+    def test_compression_change_exports_again(self, export_path):
+        path = write(str(export_path / "json" / "Genesis.json"))
+        manifest = ExportManifest("texts")
+        key = ExportManifest.key("Genesis", "en", "Tanakh")
+        manifest.record(key, self.fingerprint, datetime.now(), {path: "sha"})
+        assert not manifest.unchanged(key, [["5f1"], "index hash", "gzip"])
+
+        # The files written with the new compression replace the old ones
+        gz_path = write(path + ".gz")
+        manifest.record(key, [["5f1"], "index hash", "gzip"], datetime.now(), {gz_path: "sha"})
+        assert not os.path.exists(path) and os.path.exists(gz_path)
+
+    def test_remove_unseen(self, export_path):
+        kept = write(str(export_path / "json" / "Genesis.json"))
+        removed = write(str(export_path / "json" / "Deleted.json"))
+        manifest = ExportManifest("texts")
+        manifest.record("Genesis|en|Tanakh", self.fingerprint, datetime.now(), {kept: "sha"})
+        manifest.record("Deleted|en|Tanakh", self.fingerprint, datetime.now(), {removed: "sha"})
+        manifest.save()
+
+        manifest = ExportManifest("texts")
+        assert manifest.unchanged("Genesis|en|Tanakh", self.fingerprint)
+        manifest.remove_unseen()
+        manifest.save()
+        assert os.path.exists(kept) and not os.path.exists(removed)
+        assert set(ExportManifest("texts").entries) == {"Genesis|en|Tanakh"}
+
+
+class Test_link_ref_book(object):
+
+    @pytest.mark.parametrize("tref", ["Genesis 1:2", "Genesis 1:2-3:4", "Genesis 3-5", "Genesis 3"])
+    def test_seen_title_isnt_parsed(self, tref):
+        # The cached value stands in for one that parsing would have given
+        books = {"Genesis": ("cached", "cached", "cached")}
+        assert link_ref_book(tref, books) == ("cached", "cached", "cached")
+
+    def test_talmud_address(self):
+        books = {"Shabbat": ("cached", "cached", "cached")}
+        assert link_ref_book("Shabbat 2a:3-2b:4", books) == ("cached", "cached", "cached")
+
+    def test_parsed_and_remembered(self):
+        books = {}
+        assert link_ref_book("Rashi on Genesis 1:1:2", books) == ("Rashi on Genesis", "Rashi on Genesis", "Tanakh")
+        assert books == {"Rashi on Genesis": ("Rashi on Genesis", "Rashi on Genesis", "Tanakh")}
+
+    def test_complex_node(self):
+        books = {}
+        book, index_title, category = link_ref_book("Pesach Haggadah, Kadesh 1", books)
+        assert (index_title, category) == ("Pesach Haggadah", "Liturgy")
+        assert link_ref_book("Pesach Haggadah, Kadesh 2", books) == (book, index_title, category)
+
+
+@pytest.mark.parametrize("tref", [
+    "Genesis 1:1", "Genesis 50:26", "Psalms 119:176",
+    "Shabbat 2a:1", "Shabbat 31a:6", "Shabbat 157b:3",
+    "Rashi on Genesis 1:1:1", "Mishneh Torah, Prayer and the Priestly Blessing 1:1",
+    "Pesach Haggadah, Kadesh 1", "Pesach Haggadah, Magid, Ha Lachma Anya 2",
+    "Mishnah Berakhot 9:5", "Berakhot 2a:1",
+])
+def test_segment_order_id(tref):
+    assert segment_order_id(tref, {}) == Ref(tref).order_id()
+    # The second segment of a node seen before is built from its order id
+    nodes = {}
+    segment_order_id(tref, nodes)
+    assert segment_order_id(tref, nodes) == Ref(tref).order_id()
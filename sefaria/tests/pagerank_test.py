@@ -0,0 +1,55 @@
+import random
+
+import numpy as np
+
+from sefaria.pagerank import LinkGraph, pagerank_vector
+
+
+def reference_pagerank(graph, s=0.85, tolerance=0.00001, maxiter=100):
+    # The loop-based computation pagerank_vector() replaced
+    n = len(graph)
+    in_links = {j: [] for j in range(n)}
+    out_weight = [0.0] * n
+    for source, target, weight in zip(graph._sources, graph._targets, graph._weights):
+        in_links[target].append((source, weight))
+        out_weight[source] += weight
+    p = [1.0 / n] * n
+    iteration, change = 1, 2
+    while change > tolerance and iteration < maxiter:
+        dangling_sum = sum(p[j] for j in range(n) if out_weight[j] == 0)
+        v = [s * sum(p[k] * w / out_weight[k] for k, w in in_links[j]) + s * dangling_sum / n + (1 - s) / n for j in range(n)]
+        total = sum(v)
+        v = [x / total for x in v]
+        change = sum(abs(a - b) for a, b in zip(p, v))
+        p = v
+        iteration += 1
+    return p
+
+
+def test_matches_reference():
+    rand = random.Random(5)
+    graph = LinkGraph()
+    for i in range(200):
+        graph.add_node("ref {}".format(i))
+    for _ in range(600):
+        graph.add_edge("ref {}".format(rand.randrange(150)), "ref {}".format(rand.randrange(200)), rand.choice([1.0, 0.5, 2.0]))
+    p, report = pagerank_vector(graph.matrix())
+    assert report.converged
+    assert report.nodes == 200 and report.edges <= 600
+    assert abs(p.sum() - 1) < 1e-9
+    assert np.allclose(p, reference_pagerank(graph), atol=1e-9)
+
+
+def test_from_in_links():
+    graph = LinkGraph.from_in_links([("a", {"b": 0.7}), ("b", {"c": 0.1}), ("c", {})])
+    assert graph.nodes == ["a", "b", "c"]
+    matrix = graph.matrix()
+    assert matrix[0, 1] == 0.7 and matrix[1, 2] == 0.1
+    p, _ = pagerank_vector(matrix)
+    ranks = dict(zip(graph.nodes, p))
+    assert ranks["a"] > ranks["b"] > ranks["c"]
+
+
+def test_empty():
+    p, report = pagerank_vector(LinkGraph().matrix())
+    assert len(p) == 0 and report.converged
@@ -5,6 +5,7 @@ from elastic_transport import ApiError, ConnectionTimeout
 
 import sefaria.search
 from sefaria.search import (
+    TextChanges,
     TextIndexer,
     _authored_index_titles,
     _build_authored_titles_map,
@@ -97,6 +98,86 @@ def test_index_all_continues_past_bulk_connection_timeout(monkeypatch):
     assert fail["error_type"] == "ConnectionTimeout"
 
 
+class _FakeCheckpoints:
+    def __init__(self, completed):
+        self._completed = set(completed)
+        self.marked = []
+
+    def completed(self):
+        return set(self._completed)
+
+    def mark_completed(self, title, lang, **stats):
+        self.marked.append((title, lang, stats))
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_index_all_resumes_from_checkpoints(monkeypatch, processes):
+    all_versions = [_FakeVersion(title, "v1", "en") for title in ("BookA", "BookB", "BookC")]
+
+    TextIndexer._failed_versions = []
+    TextIndexer._skipped_versions = []
+    TextIndexer._bulk_actions = []
+    monkeypatch.setattr(TextIndexer, "create_version_priority_map", classmethod(lambda cls: None))
+    monkeypatch.setattr(TextIndexer, "create_terms_dict", classmethod(lambda cls: None))
+    monkeypatch.setattr(TextIndexer, "get_all_versions", classmethod(lambda cls: list(all_versions)))
+    TextIndexer.version_priority_map = {
+        (v.title, v.versionTitle, v.language): (i, None)
+        for i, v in enumerate(all_versions)
+    }
+    monkeypatch.setattr(TextIndexer, "excluded_from_search", classmethod(lambda cls, v: False))
+    monkeypatch.setattr("sefaria.search.Ref.clear_cache", lambda: None)
+
+    def fake_index_version(cls, version, tries=0, action=None):
+        assert version.title != "BookA", "BookA was checkpointed and should be skipped"
+        cls._bulk_actions += [{"_id": f"{version.title} {i}", "_source": {"exact": "abcd"}} for i in range(3)]
+    monkeypatch.setattr(TextIndexer, "index_version", classmethod(fake_index_version))
+
+    # BookC's writes fail, so it isn't checkpointed
+    def recording_parallel_bulk(es_client, actions, **kwargs):
+        assert kwargs["thread_count"] == kwargs["queue_size"]
+        for action in actions:
+            yield action["_id"].startswith("BookB"), {"index": {"_id": action["_id"]}}
+
+    def fake_flush(cls, in_flight_versions):
+        cls._bulk_actions = []
+        if in_flight_versions[0].title == "BookB":
+            return 0
+        for v in in_flight_versions:
+            cls._add_failed_version(v, "Bulk write failed", "BulkIndexError")
+        return len(in_flight_versions)
+    monkeypatch.setattr(TextIndexer, "_flush_bulk_actions", classmethod(fake_flush))
+    monkeypatch.setattr("sefaria.search.parallel_bulk", recording_parallel_bulk)
+
+    checkpoints = _FakeCheckpoints({("BookA", "en")})
+    shard_stats = TextIndexer.index_all(index_name="text-b", processes=processes, checkpoints=checkpoints)
+
+    assert [(title, lang) for title, lang, _ in checkpoints.marked] == [("BookB", "en")]
+    assert checkpoints.marked[0][2]["segments"] == 3
+    assert [f["title"] for f in TextIndexer._failed_versions] == ["BookC"]
+    assert sum(s.indexes for s in shard_stats.values()) == 2
+    assert sum(s.segments for s in shard_stats.values()) == 6
+    assert sum(s.bytes for s in shard_stats.values()) == 6 * len('{"exact": "abcd"}')
+
+
+def test_text_changes_coalesce_per_version():
+    from datetime import datetime
+    changes = TextChanges()
+    changes.add({"rev_type": "edit text", "ref": "Genesis 1:1", "version": "v1", "language": "en", "date": datetime(2024, 1, 1)})
+    changes.add({"rev_type": "edit text", "ref": "Genesis 1:1", "version": "v1", "language": "en", "date": datetime(2024, 1, 3)})
+    changes.add({"rev_type": "add text", "ref": "Genesis 2:1-2", "version": "v1", "language": "en", "date": datetime(2024, 1, 2)})
+    changes.add({"rev_type": "edit text", "ref": "Exodus 1:1", "version": "gone", "language": "en", "date": datetime(2024, 1, 2)})
+    changes.add({"rev_type": "delete text", "title": "Exodus", "version": "gone", "language": "en", "date": datetime(2024, 1, 2)})
+    changes.add({"rev_type": "edit version_metadata", "title": "Leviticus", "version": "new", "language": "he",
+                 "old": {"versionTitle": "old"}, "date": datetime(2024, 1, 2)})
+    changes.add({"rev_type": "edit text", "ref": "Not A Book 1:1", "version": "v1", "language": "en", "date": datetime(2024, 1, 2)})
+
+    assert changes.segments == {("Genesis", "v1", "en"): {"Genesis 1:1", "Genesis 2:1", "Genesis 2:2"}}
+    assert changes.versions_to_delete == {("Exodus", "gone", "en"), ("Leviticus", "old", "he")}
+    assert changes.versions_to_reindex == {("Leviticus", "new", "he")}
+    assert changes.latest == datetime(2024, 1, 3)
+    assert len(changes) == 4
+
+
 class _FakeAuthoredIndex:
     """An Index as seen by the authored_titles denormalization: primary titles + EN variants."""
     def __init__(self, title_en, title_he=None, variants_en=None, authors=None):
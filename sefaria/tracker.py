@@ -219,7 +219,7 @@ def count_and_index(oref, lang, vtitle, to_count=1):
 
     # count available segments of text
     if to_count:
-        count_segments(oref.index)
+        count_segments(oref.index, changed_ref=oref)
     
     if SEARCH_INDEX_ON_SAVE:
         model.IndexQueue({
@@ -230,11 +230,14 @@ def count_and_index(oref, lang, vtitle, to_count=1):
         }).save()
 
 
-def count_segments(index, skip_toc_refresh=False):
+def count_segments(index, skip_toc_refresh=False, changed_ref=None):
+    """
+    changed_ref: if given, the Ref of the only text that changed, so that only its sections are recounted
+    """
     from sefaria.settings import MULTISERVER_ENABLED
     from sefaria.system.multiserver.coordinator import server_coordinator
 
-    model.library.recount_index_in_toc(index, skip_toc_refresh=skip_toc_refresh)
+    model.library.recount_index_in_toc(index, skip_toc_refresh=skip_toc_refresh, changed_ref=changed_ref)
     if MULTISERVER_ENABLED and not skip_toc_refresh:
         # When deferring, the caller is responsible for triggering one global
         # `library.rebuild_toc` at the end of the batch (which itself publishes a
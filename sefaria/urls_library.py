@@ -9,6 +9,7 @@ from sefaria.urls_shared import shared_patterns, maintenance_patterns
 from sefaria.settings import DOWN_FOR_MAINTENANCE
 import remote_config.views as remote_config_views
 from sefaria.heapdump import heapdump_view
+from sefaria.profiler import profiler_view
 
 admin.autodiscover()
 handler500 = 'reader.views.custom_server_error'
@@ -90,6 +91,7 @@ urlpatterns = [
 # Operational tooling
 urlpatterns += [
     path('admin/heapdump/', heapdump_view, name="heapdump"),
+    path('admin/profiler/', profiler_view, name="profiler"),
     re_path(r'^api/remote-config/?$', remote_config_views.remote_config_values, name="remote_config_api")
 ]
 
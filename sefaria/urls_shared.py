@@ -11,6 +11,7 @@ import sefaria.gauth.views as gauth_views
 import guides.views as guides_views
 import powered_by.views as powered_by_views
 from sefaria.heapdump import heapdump_view
+from sefaria.profiler import profiler_view
 from sefaria.site.urls import site_urlpatterns
 from django.contrib.staticfiles.urls import staticfiles_urlpatterns
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
@@ -270,6 +271,7 @@ shared_patterns = [
     re_path(r'^admin/cache/stats', sefaria_views.cache_stats),
     re_path(r'^admin/memory/summary', sefaria_views.memory_summary),
     re_path(r'^admin/heapdump/$', heapdump_view, name="heapdump"),
+    re_path(r'^admin/profiler/$', profiler_view, name="profiler"),
     re_path(r'^admin/cache/dump', sefaria_views.cache_dump),
     re_path(r'^admin/run/tests', sefaria_views.run_tests),
     re_path(r'^admin/export/all', sefaria_views.export_all),
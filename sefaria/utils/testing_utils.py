@@ -1,4 +1,9 @@
+from urllib.parse import urlparse
+
+from django.urls import resolve
+
 import sefaria.model as model
+from sefaria.system.query_stats import record_queries
 
 
 """ SOME UTILS """
@@ -50,3 +55,19 @@ def verify_title_existence_in_toc(title, expected_toc_location=None, toc=None):
 
 def verify_existence_across_tocs(title, expected_toc_location=None):
     verify_title_existence_in_toc(title, expected_toc_location, toc=model.library.get_toc())
+
+
+def assert_within_query_budget(client, path, budget=None, **kwargs):
+    """
+    GETs `path` with a Django test client and fails if the view issued more Mongo commands than its budget
+    :param budget: Defaults to the budget declared on the view with `@query_budget`
+    :param kwargs: passed to `client.get()`
+    :return: the response
+    """
+    if budget is None:
+        budget = getattr(resolve(urlparse(path).path).func, "query_budget", None)
+        assert budget is not None, "The view for {} doesn't declare a query budget".format(path)
+    with record_queries() as stats:
+        response = client.get(path, **kwargs)
+    assert stats.count <= budget, "{} is over its budget of {} Mongo commands. {}".format(path, budget, stats.report())
+    return response
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+import random
+import re
+
+from sefaria.utils.title_scanner import TitleScanner
+
+
+TITLES = ["Genesis", "Gen", "Gen.", "Rashi on Genesis", "Rashi", "Shabbat", "Shab", "Mishnah Shabbat", "שבת", "משנה שבת", "ב"]
+
+
+def titles_regex(titles):
+    # Same pattern as Library._titles_regex_string()
+    alternation = "|".join(sorted(map(re.escape, titles), key=lambda t: (-len(t), t)))
+    return re.compile(r"(?P<title>" + alternation + r")($|[:., <]+)")
+
+
+def test_matches():
+    scanner = TitleScanner(TITLES)
+    s = "See Genesis 1:1, Rashi on Genesis 2, Gen. 3 and Genesisx 4, and Shabbat."
+    assert scanner.titles_in(s) == ["Genesis", "Rashi on Genesis", "Gen.", "Shabbat"]
+    assert [(m.start, m.end) for m in scanner.finditer("Shabbat 2a")] == [(0, 7)]
+    assert scanner.titles_in("(משנה שבת א:ב)") == ["משנה שבת"]
+    assert scanner.titles_in("") == []
+    assert TitleScanner([]).titles_in("Genesis 1") == []
+
+
+def test_same_as_regex():
+    scanner = TitleScanner(TITLES)
+    reg = titles_regex(TITLES)
+    pieces = TITLES + ["x", "1", " ", ".", ":", ",", "<", "(", ")"]
+    rand = random.Random(3)
+    for _ in range(2000):
+        s = "".join(rand.choice(pieces) for _ in range(rand.randint(0, 12)))
+        expected = [(m.group("title"), m.start()) for m in reg.finditer(s)]
+        assert [(m.title, m.start) for m in scanner.finditer(s)] == expected, s
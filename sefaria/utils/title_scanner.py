@@ -0,0 +1,70 @@
+"""
+title_scanner.py: finds every known title in a string in one pass over the string
+
+`Library.all_titles_regex()` is an alternation of every title in the library.  Matching it costs time that grows with
+the number of titles, and compiling it takes seconds and hundreds of MB.  A TitleScanner holds the same titles in an
+Aho-Corasick automaton, which reports every title occurrence in time linear in the length of the string.
+
+The matches are the same as those of `Library.all_titles_regex()`:
+  * A title only matches when followed by the end of the string or by one of `:., <`
+  * Where several titles start at the same position, the longest one wins
+  * Matches don't overlap.  A match consumes its title and the run of delimiters after it.
+"""
+from collections import namedtuple
+
+import ahocorasick
+
+
+TitleMatch = namedtuple("TitleMatch", ["title", "start", "end"])
+
+
+class TitleScanner(object):
+    DELIMITERS = frozenset(":., <")
+
+    def __init__(self, titles):
+        """
+        :param titles: iterable of str
+        """
+        self._automaton = ahocorasick.Automaton()
+        for title in titles:
+            if title:
+                self._automaton.add_word(title, len(title))
+        self._automaton.make_automaton()
+
+    def __len__(self):
+        return len(self._automaton)
+
+    def finditer(self, s):
+        """
+        :param str s:
+        :return: generator of :class:`TitleMatch`, in order of position.  `end` is the end of the title, not including the delimiters after it.
+        """
+        if not len(self._automaton):
+            return
+        length = len(s)
+        delimiters = self.DELIMITERS
+
+        # Longest title ending before a delimiter, by start position
+        candidates = {}
+        for last, title_length in self._automaton.iter(s):
+            end = last + 1
+            if end == length or s[end] in delimiters:
+                start = end - title_length
+                if candidates.get(start, -1) < end:
+                    candidates[start] = end
+
+        pos = 0
+        for start in sorted(candidates):
+            if start < pos:
+                continue
+            end = candidates[start]
+            yield TitleMatch(s[start:end], start, end)
+            pos = end
+            while pos < length and s[pos] in delimiters:
+                pos += 1
+
+    def titles_in(self, s):
+        """
+        :return: list of the titles found in `s`, in order, with repeats
+        """
+        return [m.title for m in self.finditer(s)]